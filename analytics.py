@@ -0,0 +1,91 @@
+import json
+import os
+
+
+class SalesRollups:
+    """Running sales totals, so reports never re-read the transaction history.
+
+    days:     "YYYY-MM-DD" -> [transactions, revenue, units]
+    hours:    "HH" -> [transactions, revenue]
+    methods:  payment method -> [transactions, revenue]
+    products: product id -> [name, units, revenue]
+
+    position records how much of the history has been added (a byte
+    offset into the JSON journal or the last SQLite transaction rowid),
+    so the totals can be brought up to date by adding only what follows.
+    """
+
+    def __init__(self):
+        self.position = 0
+        self.transactions = 0
+        self.revenue = 0.0
+        self.units = 0
+        self.days = {}
+        self.hours = {}
+        self.methods = {}
+        self.products = {}
+
+    def add(self, transaction):
+        """Fold one transaction into the totals"""
+        total = float(transaction.get("total") or 0)
+        timestamp = transaction.get("timestamp", "")
+        units = 0
+        for line in transaction.get("items", []):
+            qty = line.get("qty", 0)
+            units += qty
+            product = self.products.get(line["id"])
+            if product is None:
+                product = self.products[line["id"]] = [line.get("name", ""), 0, 0.0]
+            # keep the latest name in case the product was renamed
+            product[0] = line.get("name", product[0])
+            product[1] += qty
+            product[2] += float(line.get("price") or 0) * qty
+
+        self.transactions += 1
+        self.revenue += total
+        self.units += units
+
+        day = self.days.setdefault(timestamp[:10], [0, 0.0, 0])
+        day[0] += 1
+        day[1] += total
+        day[2] += units
+        hour = self.hours.setdefault(timestamp[11:13], [0, 0.0])
+        hour[0] += 1
+        hour[1] += total
+        method = self.methods.setdefault(transaction.get("method", ""), [0, 0.0])
+        method[0] += 1
+        method[1] += total
+
+    def top_products(self, by="units", limit=20):
+        """[(product id, name, units, revenue)], best sellers first"""
+        column = 1 if by == "units" else 2
+        ranked = sorted(self.products.items(), key=lambda entry: entry[1][column], reverse=True)
+        return [(product_id, name, units, revenue) for product_id, (name, units, revenue) in ranked[:limit]]
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in
+                ("position", "transactions", "revenue", "units", "days", "hours", "methods", "products")}
+
+    @classmethod
+    def from_dict(cls, data):
+        rollups = cls()
+        for name, value in data.items():
+            setattr(rollups, name, value)
+        return rollups
+
+
+def load_rollups(path):
+    """Saved rollups, or empty ones (to be built from the full history) if there are none"""
+    try:
+        with open(path, 'r') as f:
+            return SalesRollups.from_dict(json.load(f))
+    except (FileNotFoundError, ValueError):
+        return SalesRollups()
+
+
+def save_rollups(path, rollups):
+    """Write rollups atomically; whoever loads them next catches up from their position"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(rollups.to_dict(), f, separators=(",", ":"))
+    os.replace(tmp_path, path)
@@ -0,0 +1,129 @@
+"""Cold-start benchmark: JSON inventory vs. binary snapshot, alone and as the admin view starts.
+
+Usage: python benchmarks/bench_snapshot.py [item_count]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import Catalog
+from columns import stock_stats
+from storage import JsonStorage
+
+
+def make_inventory(count):
+    rng = random.Random(42)
+    categories = ["Electronics", "Accessories", "Hardware"]
+    items = []
+    for i in range(count):
+        quantity = rng.randint(0, 200)
+        items.append({
+            "id": f"P{i:07d}",
+            "name": f"Product {i} {rng.choice(['Bolt', 'Cable', 'Drill', 'Hammer', 'Switch'])}",
+            "category": rng.choice(categories),
+            "quantity": quantity,
+            "price": round(rng.uniform(1, 5000), 2),
+            "status": "Out of Stock" if quantity == 0 else "Low Stock" if quantity <= 10 else "In Stock"
+        })
+    return items
+
+
+def timed(fn, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "inventory_data.json")
+        snap_path = os.path.join(tmp, "inventory_data.snap")
+        with open(json_path, "w") as f:
+            json.dump({"inventory": make_inventory(count), "suppliers": []}, f, indent=2)
+
+        def json_start():
+            with open(json_path) as f:
+                data = json.load(f)
+            return Catalog(data["inventory"])
+
+        def snapshot_start():
+            store = JsonStorage(json_path, journal=_NullJournal(), snapshot_path=snap_path)
+            inventory, _ = store.load()
+            # what a view touches right after start: one screen of rows
+            first_page = [row for _, row in zip(range(50), inventory)]
+            return inventory, first_page
+
+        def first_lookup():
+            inventory, _ = JsonStorage(json_path, journal=_NullJournal(), snapshot_path=snap_path).load()
+            start = time.perf_counter()
+            inventory.get(f"P{count // 2:07d}")
+            return time.perf_counter() - start
+
+        def view_start(snapshot_path):
+            """What the admin view does before its first paint: load, counters, dashboard rows"""
+            store = JsonStorage(json_path, journal=_NullJournal(), snapshot_path=snapshot_path)
+            phases = {}
+            started = time.perf_counter()
+            inventory, _ = store.load()
+            phases["load"] = time.perf_counter() - started
+            stock_stats(inventory)
+            phases["counters"] = time.perf_counter() - started - sum(phases.values())
+            # the dashboard table indexes the catalog and reads one screen of rows
+            rows = inventory.rows()
+            [rows[i] for i in range(min(50, len(rows)))]
+            phases["rows"] = time.perf_counter() - started - sum(phases.values())
+            # the store's own copy has to be there before the first save
+            store.apply_changes([("save_item", dict(inventory.get("P0000000"), price=1.0))])
+            phases["first save"] = time.perf_counter() - started - sum(phases.values())
+            return phases
+
+        # first load converts the JSON file into a snapshot
+        JsonStorage(json_path, journal=_NullJournal(), snapshot_path=snap_path).load()
+
+        json_time, _ = timed(json_start)
+        snap_time, (inventory, _) = timed(snapshot_start)
+        lookup_time = min(first_lookup() for _ in range(3))
+        assert len(inventory) == count
+
+        print(f"items:              {count}")
+        print(f"json size:          {os.path.getsize(json_path) / 1e6:.1f} MB")
+        print(f"snapshot size:      {os.path.getsize(snap_path) / 1e6:.1f} MB")
+
+        # the headline: everything the admin view does before it can paint, not just the load
+        totals = {}
+        print("admin view start, ms:")
+        for label, snapshot_path in (("json", None), ("snapshot", snap_path)):
+            phases = view_start(snapshot_path)
+            totals[label] = sum(phases.values())
+            print(f"  {label + ':':<10}" + "  ".join(f"{name} {elapsed * 1000:.0f}" for name, elapsed in phases.items())
+                  + f"  total {totals[label] * 1000:.0f}")
+        print(f"view start speedup: {totals['json'] / totals['snapshot']:.1f}x")
+
+        print("load alone:")
+        print(f"  json.load + index:  {json_time * 1000:.1f} ms")
+        print(f"  snapshot start:     {snap_time * 1000:.1f} ms")
+        print(f"  speedup:            {json_time / snap_time:.1f}x")
+        print(f"  first id lookup:    {lookup_time * 1000:.1f} ms (builds the id index)")
+
+
+class _NullJournal:
+    def iter_records(self):
+        return iter(())
+
+    def close(self):
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Inventory valuation: per-item Python loop vs. running totals vs. NumPy columns.
+
+Usage: python benchmarks/bench_stats.py [item_count]
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_snapshot import make_inventory, timed
+from catalog import StockStats
+from columns import ColumnarStats, np
+
+
+def loop_valuation(items):
+    """What the Total Inventory Value report used to do on every run"""
+    total_value = 0.0
+    total_units = 0
+    categories = {}
+    counts = {}
+    for item in items:
+        try:
+            value = float(item.get('quantity', 0)) * float(item.get('price', 0))
+        except Exception:
+            value = 0.0
+        total_value += value
+        total_units += item.get('quantity', 0)
+        cat = item.get('category', 'Uncategorized')
+        categories[cat] = categories.get(cat, 0) + value
+        counts[item.get('status')] = counts.get(item.get('status'), 0) + 1
+    return total_value, total_units, categories, counts
+
+
+def read_all(stats):
+    return stats.value, stats.units, stats.categories, stats.counts
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    if np is None:
+        sys.exit("NumPy is not installed")
+    items = make_inventory(count)
+    rng = random.Random(7)
+    edits = [dict(items[rng.randrange(count)], quantity=rng.randint(0, 200)) for _ in range(1000)]
+
+    loop_time, expected = timed(lambda: loop_valuation(items), repeat=3)
+    running_build, running = timed(lambda: StockStats(items), repeat=1)
+    columnar_build, columnar = timed(lambda: ColumnarStats(items), repeat=1)
+    running_read, _ = timed(lambda: read_all(running))
+
+    def columnar_read():
+        columnar._totals = None
+        return read_all(columnar)
+
+    vector_time, result = timed(columnar_read)
+
+    def edit_then_read(stats, batch):
+        # the change feed applies a batch of rows, then refreshes the cards once
+        for start in range(0, len(edits), batch):
+            for item in edits[start:start + batch]:
+                stats.update(item)
+            read_all(stats)
+
+    running_each, _ = timed(lambda: edit_then_read(running, 1), repeat=1)
+    columnar_each, _ = timed(lambda: edit_then_read(columnar, 1), repeat=1)
+    running_batched, _ = timed(lambda: edit_then_read(running, 100), repeat=1)
+    columnar_batched, _ = timed(lambda: edit_then_read(columnar, 100), repeat=1)
+
+    print(f"items:                      {count}")
+    print(f"python loop valuation:      {loop_time * 1000:.1f} ms")
+    print(f"numpy vectorized valuation: {vector_time * 1000:.1f} ms  ({loop_time / vector_time:.0f}x)")
+    print(f"running totals read:        {running_read * 1e6:.1f} us")
+    print(f"build StockStats:           {running_build * 1000:.1f} ms")
+    print(f"build ColumnarStats:        {columnar_build * 1000:.1f} ms")
+    print(f"1000 edits, read after each, running:   {running_each * 1000:.1f} ms")
+    print(f"1000 edits, read after each, columnar:  {columnar_each * 1000:.1f} ms")
+    print(f"1000 edits, read per 100, running:      {running_batched * 1000:.1f} ms")
+    print(f"1000 edits, read per 100, columnar:     {columnar_batched * 1000:.1f} ms")
+
+    assert abs(result[0] - expected[0]) <= 1e-6 * expected[0]
+    assert result[1] == expected[1]
+
+
+if __name__ == "__main__":
+    main()
@@ -1,74 +1,134 @@
 import customtkinter as ctk
 from datetime import datetime
-import json
-import os
 import tkinter.messagebox as messagebox
+from catalog import Catalog
+from feed import INVENTORY_POLL_MS, read_changes
+from storage import open_storage, stock_status, StockError
+from search import SearchPipeline, TrigramIndex, match_record
+from table import VirtualCards
+from timing import span
 
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
 
-class CashierApp(ctk.CTk):
-    def __init__(self):
-        super().__init__()
 
-        self.protocol("WM_DELETE_WINDOW", self.logout)
+class CashierApp(ctk.CTkFrame):
+    """Cashier view, shown inside the application's single root window.
 
-        self.after_ids = []
+    Logging out only hides the view and empties the cart; resume() shows it
+    again for the next shift with the inventory and store still loaded.
+    """
 
-        self.title("HardTrack - Cashier Panel")
-        self.geometry("1920x1080")
+    window_title = "HardTrack - Cashier Panel"
+    window_size = "1920x1080"
 
-        self.inventory_file = "inventory_data.json"
-        self.transaction_file = "transactions.json"
+    def __init__(self, master, on_logout=None):
+        super().__init__(master, fg_color="transparent")
+        self.on_logout = on_logout
 
-        self.cart = []
-        self.inventory_data = []
+        # cart lines keyed by product id, their row widgets, and running totals
+        self.cart = {}
+        self.cart_rows = {}
+        self.cart_units = 0
+        self.cart_subtotal = 0.0
+        self.inventory_data = Catalog()
+        self.inventory_version = 0
+        # ids of the products currently listed
+        self.shown_products = set()
 
-        self.load_inventory()
+        with span("cashier", "load"):
+            self.storage = open_storage()
+            self.load_inventory()
+        self.search_index = TrigramIndex(lambda: self.inventory_data)
 
         self.grid_rowconfigure(0, weight=1)
         self.grid_columnconfigure(0, weight=1)
 
-        self.create_ui()
+        with span("cashier", "widgets"):
+            self.create_ui()
+        self.search_index.start_build(self)
 
-    def logout(self):
-        # Recursively cancel after() calls from buttons and frames
-        def cancel_callbacks(widget):
-            try:
-                widget.after_cancel(widget)
-            except:
-                pass
-            for child in widget.winfo_children():
-                cancel_callbacks(child)
-
-        try:
-            cancel_callbacks(self)
-        except:
-            pass
-
-        try:
-            self.quit()
-        except:
-            pass
+        self.poll_after_id = self.after(INVENTORY_POLL_MS, self.poll_inventory_changes)
 
+    def logout(self):
+        """End the shift: flush the sales to disk and hide the view, keeping it loaded for the next cashier"""
+        if self.poll_after_id is not None:
+            self.after_cancel(self.poll_after_id)
+            self.poll_after_id = None
+        self.reset_cart()
         try:
-            self.destroy()
-        except:
-            pass
+            # the journal batches its fsyncs; the next cashier starts from what is on disk
+            self.storage.sync()
+        except Exception as e:
+            messagebox.showerror("Save Error", f"Could not flush the sales to disk.\n\n{e}")
+        self.pack_forget()
+        if self.on_logout is not None:
+            self.on_logout()
+
+    def resume(self):
+        """Start a new shift on a view that was logged out"""
+        self.time_label.configure(text=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        # catches up on everything sold or edited while the view was hidden
+        self.poll_inventory_changes()
+
+    def close(self):
+        """Release the store for good (application exit)"""
+        if self.poll_after_id is not None:
+            self.after_cancel(self.poll_after_id)
+            self.poll_after_id = None
+        self.storage.close()
+        self.destroy()
 
     def load_inventory(self):
-        if os.path.exists(self.inventory_file):
-            try:
-                with open(self.inventory_file, 'r') as f:
-                    data = json.load(f)
-                self.inventory_data = data.get("inventory", [])
-            except:
-                self.load_default_inventory()
-        else:
+        try:
+            self.inventory_data, _ = self.storage.load()
+            self.inventory_version = self.storage.version
+        except Exception as e:
+            messagebox.showerror("Load Error", f"Could not load inventory data; the files were left untouched.\n\n{e}")
             self.load_default_inventory()
 
+    def poll_inventory_changes(self):
+        """Pick up price, product and stock changes made on other terminals"""
+        changes = read_changes(self.storage, self.inventory_version)
+
+        if changes is not None:
+            self.apply_inventory_changes(*changes)
+
+        self.poll_after_id = self.after(INVENTORY_POLL_MS, self.poll_inventory_changes)
+
+    def apply_inventory_changes(self, version, changed, deleted):
+        """Merge changed rows into the catalog and refresh the product list once"""
+        if deleted is None:
+            # the store sent a full resync
+            current = {row['id'] for row in changed}
+            deleted = [item_id for item_id in self.inventory_data.ids() if item_id not in current]
+
+        items = []
+        for row in changed:
+            item = self.inventory_data.get(row['id'])
+            if item is None:
+                if 'name' not in row:
+                    # stock update for a product we never saw; the next resync brings it in
+                    continue
+                item = row
+                self.inventory_data.add(item)
+            else:
+                # update in place so existing card callbacks see the new values
+                item.update(row)
+            self.search_index.add(item)
+            if item['id'] in self.cart:
+                self.cart[item['id']]['max_qty'] = item['quantity']
+            items.append(item)
+
+        for item_id in deleted:
+            self.inventory_data.remove(item_id)
+            self.search_index.remove(item_id)
+        self.refresh_products(items, deleted)
+
+        self.inventory_version = version
+
     def load_default_inventory(self):
-        self.inventory_data = []
+        self.inventory_data = Catalog()
 
     def create_ui(self):
         main_frame = ctk.CTkFrame(self, fg_color="#0f0f0f")
@@ -100,13 +160,13 @@ class CashierApp(ctk.CTk):
         )
         title.pack(side="left", padx=20, pady=20)
 
-        time_label = ctk.CTkLabel(
+        self.time_label = ctk.CTkLabel(
             header,
             text=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
             font=("Arial", 12),
             text_color="#808080"
         )
-        time_label.pack(side="right", padx=20, pady=20)
+        self.time_label.pack(side="right", padx=20, pady=20)
 
         logout_btn = ctk.CTkButton(
             header,
@@ -153,66 +213,56 @@ class CashierApp(ctk.CTk):
         )
         search_entry.pack(side="left", padx=5)
 
-        self.search_var.trace("w", lambda *args: self.update_products_display())
+        self.search_var.trace("w", lambda *args: self.product_search.schedule(self.search_var.get()))
 
-        self.products_scroll = ctk.CTkScrollableFrame(
+        self.products_list = VirtualCards(
             products_frame,
-            fg_color="#1a1a1a",
-            corner_radius=10
+            self.product_title,
+            self.product_details,
+            "Add",
+            self.add_to_cart
+        )
+        self.products_list.grid(row=2, column=0, sticky="nsew")
+
+        self.product_search = SearchPipeline(
+            self,
+            lambda: self.inventory_data,
+            match_record,
+            self.show_products,
+            index=self.search_index
         )
-        self.products_scroll.grid(row=2, column=0, sticky="nsew")
-        self.products_scroll.grid_columnconfigure(0, weight=1)
 
         self.update_products_display()
 
     def update_products_display(self):
-        for widget in self.products_scroll.winfo_children():
-            widget.destroy()
-
-        search_text = self.search_var.get().lower()
-
-        for item in self.inventory_data:
-            if search_text and search_text not in item['id'].lower() and search_text not in item['name'].lower():
-                continue
-            if item.get('status') == 'Out of Stock':
-                continue
-            self.create_product_card(self.products_scroll, item)
-
-    def create_product_card(self, parent, item):
-        card = ctk.CTkFrame(parent, fg_color="#252525", corner_radius=8)
-        card.pack(fill="x", padx=5, pady=5)
-        card.grid_columnconfigure(0, weight=1)
-
-        info_frame = ctk.CTkFrame(card, fg_color="transparent")
-        info_frame.pack(side="left", fill="both", expand=True, padx=15, pady=12)
-
-        name_label = ctk.CTkLabel(
-            info_frame,
-            text=f"🛍️ {item['name']} ({item['id']})",
-            font=("Arial", 13, "bold"),
-            text_color="#ffffff"
-        )
-        name_label.pack(anchor="w", pady=(0, 5))
+        """Re-run the search against the current inventory"""
+        self.product_search.refresh()
+
+    def show_products(self, matches):
+        """Show the in-stock products among the search matches; the cards are reused, not rebuilt"""
+        shown = [item for item in matches if item.get('status') != 'Out of Stock']
+        self.shown_products = {item['id'] for item in shown}
+        self.products_list.set_data(shown)
+
+    def product_visible(self, item):
+        search_text = self.search_var.get().strip().lower()
+        if search_text and not match_record(item, search_text):
+            return False
+        return item.get('status') != 'Out of Stock'
+
+    def refresh_products(self, items, deleted=()):
+        """Show changes to some products, re-filtering only if one appears or disappears"""
+        if any(item_id in self.shown_products for item_id in deleted) or any(
+                self.product_visible(item) != (item['id'] in self.shown_products) for item in items):
+            self.update_products_display()
+        else:
+            self.products_list.refresh()
 
-        details_label = ctk.CTkLabel(
-            info_frame,
-            text=f"{item['category']} | Available: {item['quantity']} | Price: ₱{item['price']:.2f}",
-            font=("Arial", 11),
-            text_color="#808080"
-        )
-        details_label.pack(anchor="w")
+    def product_title(self, item):
+        return f"🛍️ {item['name']} ({item['id']})"
 
-        add_btn = ctk.CTkButton(
-            card,
-            text="Add",
-            font=("Arial", 12, "bold"),
-            width=80,
-            height=35,
-            fg_color="#00a8ff",
-            hover_color="#0088cc",
-            command=lambda: self.add_to_cart(item)
-        )
-        add_btn.pack(side="right", padx=15, pady=12)
+    def product_details(self, item):
+        return f"{item['category']} | Available: {item['quantity']} | Price: ₱{item['price']:.2f}"
 
     def create_cart_section(self, parent):
         cart_frame = ctk.CTkFrame(parent, fg_color="#1a1a1a", corner_radius=12, width=300)
@@ -243,6 +293,14 @@ class CashierApp(ctk.CTk):
         )
         self.cart_scroll.pack(fill="both", expand=True, padx=15, pady=(0, 15))
 
+        self.cart_empty_label = ctk.CTkLabel(
+            self.cart_scroll,
+            text="Cart is empty",
+            font=("Arial", 12),
+            text_color="#808080"
+        )
+        self.cart_empty_label.pack(pady=30)
+
         divider = ctk.CTkFrame(cart_frame, height=2, fg_color="#404040")
         divider.pack(fill="x", padx=15, pady=(0, 10))
 
@@ -324,40 +382,60 @@ class CashierApp(ctk.CTk):
         checkout_btn.pack(fill="x")
 
     def add_to_cart(self, item):
-        for cart_item in self.cart:
-            if cart_item['id'] == item['id']:
-                if cart_item['qty'] < item['quantity']:
-                    cart_item['qty'] += 1
-                else:
-                    messagebox.showwarning("Stock Limit", f"Only {item['quantity']} available!")
-                self.update_cart_display()
-                return
+        cart_item = self.cart.get(item['id'])
+        if cart_item is not None:
+            if cart_item['qty'] < item['quantity']:
+                self.set_cart_qty(cart_item, cart_item['qty'] + 1)
+            else:
+                messagebox.showwarning("Stock Limit", f"Only {item['quantity']} available!")
+            return
 
-        self.cart.append({
+        cart_item = self.cart[item['id']] = {
             'id': item['id'],
             'name': item['name'],
             'price': item['price'],
-            'qty': 1,
+            'qty': 0,
             'max_qty': item['quantity']
-        })
-        self.update_cart_display()
-
-    def update_cart_display(self):
-        for widget in self.cart_scroll.winfo_children():
-            widget.destroy()
-
-        if not self.cart:
-            empty = ctk.CTkLabel(
-                self.cart_scroll,
-                text="Cart is empty",
-                font=("Arial", 12),
-                text_color="#808080"
-            )
-            empty.pack(pady=30)
-        else:
-            for cart_item in self.cart:
-                self.create_cart_item(self.cart_scroll, cart_item)
+        }
+        if len(self.cart) == 1:
+            self.cart_empty_label.pack_forget()
+        self.create_cart_item(self.cart_scroll, cart_item)
+        self.set_cart_qty(cart_item, 1)
+
+    def apply_stock_levels(self, levels):
+        """Update local stock from the quantities the store reported"""
+        items = []
+        for item_id, quantity in levels.items():
+            inv_item = self.inventory_data.get(item_id)
+            if inv_item is not None:
+                inv_item['quantity'] = quantity
+                inv_item['status'] = stock_status(quantity)
+                items.append(inv_item)
+        self.refresh_products(items)
+
+    def set_cart_qty(self, cart_item, qty):
+        """Change one line's quantity, updating only its row and the running totals"""
+        delta = qty - cart_item['qty']
+        cart_item['qty'] = qty
+        self.cart_units += delta
+        self.cart_subtotal += cart_item['price'] * delta
+
+        row = self.cart_rows[cart_item['id']]
+        row['info'].configure(text=self.cart_line_text(cart_item))
+        row['qty'].configure(text=str(qty))
+        self.update_totals()
 
+    def cart_line_text(self, cart_item):
+        return f"{cart_item['name']}\n₱{cart_item['price']:.2f} × {cart_item['qty']} = ₱{cart_item['price'] * cart_item['qty']:.2f}"
+
+    def reset_cart(self):
+        for row in self.cart_rows.values():
+            row['frame'].destroy()
+        self.cart = {}
+        self.cart_rows = {}
+        self.cart_units = 0
+        self.cart_subtotal = 0.0
+        self.cart_empty_label.pack(pady=30)
         self.update_totals()
 
     def create_cart_item(self, parent, cart_item):
@@ -367,7 +445,7 @@ class CashierApp(ctk.CTk):
 
         info_label = ctk.CTkLabel(
             item_frame,
-            text=f"{cart_item['name']}\n₱{cart_item['price']:.2f} × {cart_item['qty']} = ₱{cart_item['price'] * cart_item['qty']:.2f}",
+            text=self.cart_line_text(cart_item),
             font=("Arial", 10),
             text_color="#ffffff",
             justify="left"
@@ -422,34 +500,41 @@ class CashierApp(ctk.CTk):
         )
         del_btn.pack(side="left", padx=2)
 
+        self.cart_rows[cart_item['id']] = {'frame': item_frame, 'info': info_label, 'qty': qty_display}
+
     def increase_qty(self, cart_item):
         if cart_item['qty'] < cart_item['max_qty']:
-            cart_item['qty'] += 1
-            self.update_cart_display()
+            self.set_cart_qty(cart_item, cart_item['qty'] + 1)
         else:
             messagebox.showwarning("Stock Limit", f"Only {cart_item['max_qty']} available!")
 
     def decrease_qty(self, cart_item):
         if cart_item['qty'] > 1:
-            cart_item['qty'] -= 1
+            self.set_cart_qty(cart_item, cart_item['qty'] - 1)
         else:
             self.remove_from_cart(cart_item)
-        self.update_cart_display()
 
     def remove_from_cart(self, cart_item):
-        self.cart = [item for item in self.cart if item['id'] != cart_item['id']]
-        self.update_cart_display()
+        if self.cart.pop(cart_item['id'], None) is None:
+            return
+        if not self.cart:
+            # also clears any rounding left in the running totals
+            self.reset_cart()
+            return
+        self.cart_units -= cart_item['qty']
+        self.cart_subtotal -= cart_item['price'] * cart_item['qty']
+        self.cart_rows.pop(cart_item['id'])['frame'].destroy()
+        self.update_totals()
 
     def clear_cart(self):
         if messagebox.askyesno("Clear Cart", "Remove all items from cart?"):
-            self.cart = []
-            self.update_cart_display()
+            self.reset_cart()
 
     def update_totals(self):
-        subtotal = sum(item['price'] * item['qty'] for item in self.cart)
+        subtotal = self.cart_subtotal
         tax = subtotal * 0.12
         total = subtotal + tax
-        total_items = sum(item['qty'] for item in self.cart)
+        total_items = self.cart_units
 
         self.items_label.configure(text=f"Items: {total_items}")
         self.subtotal_val.configure(text=f"₱{subtotal:.2f}")
@@ -490,7 +575,7 @@ class CashierApp(ctk.CTk):
         divider = ctk.CTkFrame(checkout_win, height=2, fg_color="#404040")
         divider.pack(fill="x", padx=50, pady=20)
 
-        total = sum(item['price'] * item['qty'] for item in self.cart) * 1.12
+        total = sum(item['price'] * item['qty'] for item in self.cart.values()) * 1.12
 
         amount_label = ctk.CTkLabel(
             checkout_win,
@@ -504,23 +589,35 @@ class CashierApp(ctk.CTk):
             transaction = {
                 'id': datetime.now().strftime('%Y%m%d%H%M%S'),
                 'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'items': self.cart.copy(),
+                'items': [dict(cart_item) for cart_item in self.cart.values()],
                 'subtotal': total / 1.12,
                 'tax': total - (total / 1.12),
                 'total': total,
                 'method': payment_var.get()
             }
 
-            self.save_transaction(transaction)
-
-            for cart_item in self.cart:
-                for inv_item in self.inventory_data:
-                    if inv_item['id'] == cart_item['id']:
-                        inv_item['quantity'] -= cart_item['qty']
+            try:
+                remaining = self.storage.record_sale(transaction)
+            except StockError as e:
+                # another terminal sold these first; show the real stock and let the cashier adjust
+                self.apply_stock_levels(e.shortages)
+                for item_id, available in e.shortages.items():
+                    if item_id in self.cart:
+                        self.cart[item_id]['max_qty'] = available
+                messagebox.showerror(
+                    "Stock Changed",
+                    "Not enough stock left for:\n" +
+                    "\n".join(f"{item_id} (available: {qty})" for item_id, qty in e.shortages.items()),
+                    parent=checkout_win
+                )
+                checkout_win.destroy()
+                return
+            except TimeoutError:
+                messagebox.showerror("Busy", "Inventory is busy on another terminal. Please try again.",
+                                     parent=checkout_win)
+                return
 
-            data = {"inventory": self.inventory_data, "suppliers": []}
-            with open(self.inventory_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            self.apply_stock_levels(remaining)
 
             messagebox.showinfo(
                 "Payment Successful",
@@ -529,8 +626,7 @@ class CashierApp(ctk.CTk):
                 f"Method: {payment_var.get()}"
             )
 
-            self.cart = []
-            self.update_cart_display()
+            self.reset_cart()
             checkout_win.destroy()
 
         confirm_btn = ctk.CTkButton(
@@ -553,20 +649,17 @@ class CashierApp(ctk.CTk):
         )
         cancel_btn.pack(padx=50, fill="x")
 
-    def save_transaction(self, transaction):
-        transactions = []
-        if os.path.exists(self.transaction_file):
-            try:
-                with open(self.transaction_file, 'r') as f:
-                    transactions = json.load(f)
-            except:
-                pass
-
-        transactions.append(transaction)
-        with open(self.transaction_file, 'w') as f:
-            json.dump(transactions, f, indent=2)
-
 
 if __name__ == "__main__":
-    app = CashierApp()
-    app.mainloop()
+    root = ctk.CTk()
+    root.title(CashierApp.window_title)
+    root.geometry(CashierApp.window_size)
+
+    def quit_app():
+        app.close()
+        root.destroy()
+
+    app = CashierApp(root, on_logout=quit_app)
+    app.pack(fill="both", expand=True)
+    root.protocol("WM_DELETE_WINDOW", app.logout)
+    root.mainloop()
@@ -0,0 +1,164 @@
+def stock_status(quantity):
+    """Status label for a stock level"""
+    try:
+        quantity = int(quantity)
+    except Exception:
+        quantity = 0
+    if quantity <= 0:
+        return "Out of Stock"
+    elif quantity <= 10:
+        return "Low Stock"
+    return "In Stock"
+
+
+def sort_value(value):
+    """Sort key that orders numbers numerically and text case-insensitively"""
+    if isinstance(value, (int, float)):
+        return (0, value, "")
+    return (1, 0, str(value if value is not None else "").lower())
+
+
+def query_rows(rows, offset=0, limit=None, sort_key=None, descending=False, predicate=None):
+    """One page of `rows` and how many rows passed `predicate` in total"""
+    if predicate is not None:
+        rows = [row for row in rows if predicate(row)]
+    elif not isinstance(rows, list):
+        rows = list(rows)
+    if sort_key is not None:
+        rows = sorted(rows, key=lambda row: sort_value(row.get(sort_key)), reverse=descending)
+    elif descending:
+        rows = rows[::-1]
+    end = None if limit is None else offset + limit
+    return rows[offset:end], len(rows)
+
+
+class Catalog:
+    """Records keyed by their "id", kept in insertion order.
+
+    Iterating yields the record dicts, so it can stand in for the plain
+    lists the views used before while giving O(1) lookups by id.
+    """
+
+    def __init__(self, rows=()):
+        self._rows = {}
+        for row in rows:
+            self._rows[row.get("id")] = row
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __iter__(self):
+        return iter(self._rows.values())
+
+    def __contains__(self, item_id):
+        return item_id in self._rows
+
+    def get(self, item_id, default=None):
+        return self._rows.get(item_id, default)
+
+    def ids(self):
+        return self._rows.keys()
+
+    def add(self, row):
+        """Insert a record, replacing any existing one with the same id"""
+        self._rows[row.get("id")] = row
+
+    def remove(self, item_id):
+        """Drop a record by id; returns it, or None if it was not there"""
+        return self._rows.pop(item_id, None)
+
+    def to_list(self):
+        return list(self._rows.values())
+
+    def rows(self):
+        """The records as a sequence, for views that index them by position"""
+        return self.to_list()
+
+
+class StockStats:
+    """Status counts, units and value of a set of items, kept current per change.
+
+    update(item) after an item is added or edited and discard(id) after it
+    is deleted; each adjusts the totals by that one item's old and new
+    contribution instead of re-scanning the catalog.
+    """
+
+    def __init__(self, rows=()):
+        self.counts = {"In Stock": 0, "Low Stock": 0, "Out of Stock": 0}
+        self.units = 0
+        self.value = 0.0
+        # category -> [item count, value]
+        self.categories = {}
+        # id -> (status, units, value, category) last counted for that item
+        self._counted = {}
+        for row in rows:
+            self.update(row)
+
+    @classmethod
+    def from_columns(cls, ids, statuses, quantities, prices, categories):
+        """Totals over parallel lists of item fields, e.g. from SnapshotCatalog.columns()"""
+        stats = cls()
+        quantities = [quantity or 0 for quantity in quantities]
+        values = []
+        for quantity, price in zip(quantities, prices):
+            try:
+                values.append(float(quantity) * float(price or 0))
+            except (TypeError, ValueError):
+                values.append(0.0)
+        stats._counted = dict(zip(ids, zip(statuses, quantities, values, categories)))
+
+        for status in statuses:
+            stats.counts[status] = stats.counts.get(status, 0) + 1
+        # as in _adjust, quantities that are not numbers are left out of the units
+        stats.units = sum(quantity for quantity in quantities if isinstance(quantity, (int, float)))
+        stats.value = sum(values, 0.0)
+        for category, value in zip(categories, values):
+            totals = stats.categories.get(category)
+            if totals is None:
+                totals = stats.categories[category] = [0, 0.0]
+            totals[0] += 1
+            totals[1] += value
+        return stats
+
+    def __len__(self):
+        return len(self._counted)
+
+    def copy(self):
+        """A detached copy, safe to read on another thread while this one changes"""
+        stats = StockStats()
+        stats.counts = dict(self.counts)
+        stats.units = self.units
+        stats.value = self.value
+        stats.categories = {category: list(totals) for category, totals in self.categories.items()}
+        stats._counted = dict(self._counted)
+        return stats
+
+    def update(self, item):
+        self.discard(item.get("id"))
+        quantity = item.get("quantity", 0) or 0
+        try:
+            value = float(quantity) * float(item.get("price", 0) or 0)
+        except (TypeError, ValueError):
+            value = 0.0
+        entry = (item.get("status"), quantity, value, item.get("category", "Uncategorized"))
+        self._adjust(entry, 1)
+        self._counted[item.get("id")] = entry
+
+    def discard(self, item_id):
+        entry = self._counted.pop(item_id, None)
+        if entry is not None:
+            self._adjust(entry, -1)
+
+    def _adjust(self, entry, sign):
+        status, quantity, value, category = entry
+        self.counts[status] = self.counts.get(status, 0) + sign
+        try:
+            self.units += sign * quantity
+        except TypeError:
+            pass
+        self.value += sign * value
+        totals = self.categories.setdefault(category, [0, 0.0])
+        totals[0] += sign
+        totals[1] += sign * value
+        if totals[0] == 0:
+            del self.categories[category]
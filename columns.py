@@ -0,0 +1,196 @@
+import os
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from catalog import StockStats
+from snapshot import SnapshotCatalog
+
+
+def _number(value, convert):
+    try:
+        return convert(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class ColumnarStats:
+    """StockStats kept as NumPy columns: one slot per item.
+
+    Quantity, price and category/status codes live in parallel arrays, so
+    the totals are a few vectorized reductions instead of a Python loop.
+    Numbers are converted like StockStats does (float, 0 if malformed),
+    and since totals are recomputed from the columns, repeated edits
+    cannot accumulate rounding drift.
+    update(item) and discard(id) rewrite a single slot; the totals are
+    recomputed on the next read after a change.
+    """
+
+    def __init__(self, rows=()):
+        rows = rows if isinstance(rows, list) else list(rows)
+        self._allocate(len(rows))
+        self._load([row.get("id") for row in rows],
+                   [row.get("status") for row in rows],
+                   [row.get("quantity", 0) or 0 for row in rows],
+                   [row.get("price", 0) or 0 for row in rows],
+                   [row.get("category", "Uncategorized") for row in rows])
+
+    @classmethod
+    def from_columns(cls, ids, statuses, quantities, prices, categories):
+        """Columns filled from parallel lists of item fields, e.g. from SnapshotCatalog.columns()"""
+        stats = cls.__new__(cls)
+        stats._allocate(len(ids))
+        stats._load(ids, statuses, [quantity or 0 for quantity in quantities], [price or 0 for price in prices],
+                    categories)
+        return stats
+
+    def _allocate(self, count):
+        size = max(16, count)
+        self._quantity = np.zeros(size, dtype=np.float64)
+        self._price = np.zeros(size, dtype=np.float64)
+        self._category = np.zeros(size, dtype=np.int32)
+        self._status = np.zeros(size, dtype=np.int32)
+        self._alive = np.zeros(size, dtype=bool)
+        # id -> slot, and slots freed by deletes
+        self._slots = {}
+        self._free = []
+        self._end = 0
+        self._categories = {}
+        self._category_names = []
+        self._statuses = {}
+        self._status_names = []
+        self._totals = None
+
+    def _code(self, codes, names, value):
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(names)
+            names.append(value)
+        return code
+
+    def _load(self, ids, statuses, quantities, prices, categories):
+        count = len(ids)
+        try:
+            quantity = np.array(quantities, dtype=np.float64)
+            price = np.array(prices, dtype=np.float64)
+        except (TypeError, ValueError):
+            # a malformed number somewhere; convert one at a time
+            quantity = np.array([_number(value, float) for value in quantities], dtype=np.float64)
+            price = np.array([_number(value, float) for value in prices], dtype=np.float64)
+        self._quantity[:count] = quantity
+        self._price[:count] = price
+        self._category[:count] = [self._code(self._categories, self._category_names, category)
+                                  for category in categories]
+        self._status[:count] = [self._code(self._statuses, self._status_names, status) for status in statuses]
+        # the last row for an id wins, as with update()
+        self._slots = {item_id: slot for slot, item_id in enumerate(ids)}
+        if len(self._slots) == count:
+            self._alive[:count] = True
+        else:
+            self._alive[list(self._slots.values())] = True
+            self._free = [slot for slot in range(count) if not self._alive[slot]]
+        self._end = count
+
+    def __len__(self):
+        return len(self._slots)
+
+    def copy(self):
+        """A detached copy, safe to read on another thread while this one changes"""
+        stats = ColumnarStats()
+        for name in ("_quantity", "_price", "_category", "_status", "_alive"):
+            setattr(stats, name, getattr(self, name).copy())
+        stats._slots = dict(self._slots)
+        stats._free = list(self._free)
+        stats._end = self._end
+        stats._categories = dict(self._categories)
+        stats._category_names = list(self._category_names)
+        stats._statuses = dict(self._statuses)
+        stats._status_names = list(self._status_names)
+        return stats
+
+    def update(self, item):
+        item_id = item.get("id")
+        slot = self._slots.get(item_id)
+        if slot is None:
+            slot = self._free.pop() if self._free else self._grow()
+            self._slots[item_id] = slot
+        self._quantity[slot] = _number(item.get("quantity"), float)
+        self._price[slot] = _number(item.get("price"), float)
+        self._category[slot] = self._code(self._categories, self._category_names,
+                                          item.get("category", "Uncategorized"))
+        self._status[slot] = self._code(self._statuses, self._status_names, item.get("status"))
+        self._alive[slot] = True
+        self._totals = None
+
+    def discard(self, item_id):
+        slot = self._slots.pop(item_id, None)
+        if slot is not None:
+            self._alive[slot] = False
+            self._free.append(slot)
+            self._totals = None
+
+    def _grow(self):
+        if self._end == len(self._alive):
+            size = 2 * self._end
+            for name in ("_quantity", "_price", "_category", "_status", "_alive"):
+                column = getattr(self, name)
+                grown = np.zeros(size, dtype=column.dtype)
+                grown[:self._end] = column[:self._end]
+                setattr(self, name, grown)
+        self._end += 1
+        return self._end - 1
+
+    def _compute(self):
+        if self._totals is None:
+            end = self._end
+            alive = self._alive[:end]
+            quantity = self._quantity[:end][alive]
+            values = quantity * self._price[:end][alive]
+            category = self._category[:end][alive]
+            status_counts = np.bincount(self._status[:end][alive], minlength=len(self._status_names))
+            category_counts = np.bincount(category, minlength=len(self._category_names))
+            category_values = np.bincount(category, weights=values, minlength=len(self._category_names))
+
+            counts = {"In Stock": 0, "Low Stock": 0, "Out of Stock": 0}
+            for code, name in enumerate(self._status_names):
+                if status_counts[code] or name in counts:
+                    counts[name] = int(status_counts[code])
+            categories = {name: [int(category_counts[code]), float(category_values[code])]
+                          for code, name in enumerate(self._category_names) if category_counts[code]}
+            units = float(quantity.sum())
+            # whole units read back as an int, as StockStats' running sum does
+            self._totals = (counts, int(units) if units.is_integer() else units, float(values.sum()), categories)
+        return self._totals
+
+    @property
+    def counts(self):
+        return self._compute()[0]
+
+    @property
+    def units(self):
+        return self._compute()[1]
+
+    @property
+    def value(self):
+        return self._compute()[2]
+
+    @property
+    def categories(self):
+        return self._compute()[3]
+
+
+def stock_stats(rows=()):
+    """Dashboard counters: ColumnarStats with HARDTRACK_COLUMNAR=1 and NumPy installed, else StockStats.
+
+    StockStats answers every read in O(1) from running totals, which wins
+    when the totals are read after each edit; the columns win on build time
+    and exactness. See benchmarks/bench_stats.py.
+    """
+    columnar = np is not None and os.environ.get("HARDTRACK_COLUMNAR") == "1"
+    if isinstance(rows, SnapshotCatalog):
+        # straight from the snapshot columns instead of a dict per row
+        columns = rows.columns()
+        return ColumnarStats.from_columns(*columns) if columnar else StockStats.from_columns(*columns)
+    return ColumnarStats(rows) if columnar else StockStats(rows)
@@ -0,0 +1,117 @@
+import csv
+import json
+import os
+import threading
+
+from storage import ITEM_COLUMNS, SUPPLIER_COLUMNS
+
+# records written per bulk write
+EXPORT_CHUNK_ROWS = 5000
+
+# write buffer of the export file
+EXPORT_BUFFER_BYTES = 1024 * 1024
+
+# how often the Tk thread checks on a running export
+EXPORT_POLL_MS = 200
+
+# one CSV row per transaction line, with the transaction's fields repeated
+TRANSACTION_COLUMNS = ("transaction_id", "timestamp", "method", "subtotal", "tax", "total",
+                       "product_id", "name", "price", "qty")
+
+FORMATS = {"CSV": ".csv", "JSONL": ".jsonl"}
+
+
+def record_rows(record, columns):
+    return [[record.get(column, "") for column in columns]]
+
+
+def transaction_rows(transaction, columns=TRANSACTION_COLUMNS):
+    head = [transaction.get("id", ""), transaction.get("timestamp", ""), transaction.get("method", ""),
+            transaction.get("subtotal", ""), transaction.get("tax", ""), transaction.get("total", "")]
+    return [head + [line.get("id", ""), line.get("name", ""), line.get("price", ""), line.get("qty", "")]
+            for line in transaction.get("items", [])]
+
+
+# export name -> (CSV columns, record -> CSV rows)
+EXPORTS = {
+    "Inventory": (ITEM_COLUMNS, record_rows),
+    "Suppliers": (SUPPLIER_COLUMNS, record_rows),
+    "Transactions": (TRANSACTION_COLUMNS, transaction_rows),
+}
+
+
+class ExportJob:
+    """Streams records to a CSV or JSONL file on a background thread.
+
+    records is any iterable of dicts and is consumed on the worker thread,
+    EXPORT_CHUNK_ROWS at a time, so a generator over the transaction
+    journal never has to be held in memory. The file is written under a
+    temporary name and only renamed into place once complete.
+
+    written, total (None if unknown), error and done can be read from the
+    Tk thread while the export runs.
+    """
+
+    def __init__(self, name, records, path, fmt, total=None):
+        self.columns, self.to_rows = EXPORTS[name]
+        self.records = records
+        self.path = path
+        self.fmt = fmt
+        self.total = total
+        self.written = 0
+        self.error = None
+        self.done = False
+        self.cancelled = False
+        self._thread = threading.Thread(target=self._run, name="export", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self.cancelled = True
+
+    def _run(self):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', newline='', encoding='utf-8', buffering=EXPORT_BUFFER_BYTES) as f:
+                if self.fmt == "CSV":
+                    self._write_csv(f)
+                else:
+                    self._write_jsonl(f)
+            if self.cancelled:
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, self.path)
+        except Exception as e:
+            self.error = e
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        finally:
+            self.done = True
+
+    def _chunks(self):
+        chunk = []
+        for record in self.records:
+            chunk.append(record)
+            if len(chunk) == EXPORT_CHUNK_ROWS:
+                yield chunk
+                if self.cancelled:
+                    return
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _write_csv(self, f):
+        writer = csv.writer(f)
+        writer.writerow(self.columns)
+        columns, to_rows = self.columns, self.to_rows
+        for chunk in self._chunks():
+            writer.writerows(row for record in chunk for row in to_rows(record, columns))
+            self.written += len(chunk)
+
+    def _write_jsonl(self, f):
+        for chunk in self._chunks():
+            f.write("".join(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+                            for record in chunk))
+            self.written += len(chunk)
@@ -0,0 +1,15 @@
+# how often the views pick up sales and edits made on other terminals
+INVENTORY_POLL_MS = 2000
+
+
+def read_changes(storage, version):
+    """storage.changes_since(version) for a poll tick on the Tk thread.
+
+    Never waits for the store lock. Returns None when nothing changed, and
+    also when the store is busy or unreadable right now; the next tick
+    simply asks again.
+    """
+    try:
+        return storage.changes_since(version, timeout=0)
+    except Exception:
+        return None
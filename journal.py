@@ -0,0 +1,261 @@
+import json
+import os
+import struct
+import time
+
+JOURNAL_FILE = "transactions.jsonl"
+LEGACY_FILE = "transactions.json"
+
+# records per index block
+INDEX_BLOCK = 512
+
+# block start offset, end offset, earliest and latest timestamp in the block
+INDEX_ENTRY = struct.Struct("<QQ19s19s")
+
+
+class TransactionJournal:
+    """Append-only transaction log, one JSON record per line"""
+
+    def __init__(self, path=JOURNAL_FILE, legacy_path=LEGACY_FILE, sync_every=8, sync_interval=2.0):
+        self.path = path
+        self.index_path = os.path.splitext(path)[0] + ".idx"
+        self.legacy_path = legacy_path
+        # fsync is batched: every `sync_every` records or `sync_interval` seconds
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+        self.migrate_legacy()
+
+    def migrate_legacy(self):
+        """Convert the old transactions.json array into the journal (runs once)"""
+        if os.path.exists(self.path) or not os.path.exists(self.legacy_path):
+            return
+
+        try:
+            with open(self.legacy_path, 'r') as f:
+                records = json.load(f)
+        except ValueError:
+            # leave an unreadable legacy file untouched for manual recovery
+            return
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            for record in records:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+        # keep the original around as a backup, but stop reading it
+        os.replace(self.legacy_path, self.legacy_path + ".migrated")
+
+    def append(self, record):
+        """Append one transaction record"""
+        if self._file is None:
+            self._file = open(self.path, 'a')
+            if self._file.tell() and not self._ends_with_newline():
+                # start after a torn line instead of gluing onto it
+                self._file.write("\n")
+
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+        self._unsynced += 1
+
+        now = time.monotonic()
+        if self._unsynced >= self.sync_every or now - self._last_sync >= self.sync_interval:
+            self.sync()
+
+    def _ends_with_newline(self):
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def last_lsn(self):
+        """Store commit number of the newest journaled record (0 if none carry one)"""
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, 'rb') as f:
+            end = f.seek(0, os.SEEK_END)
+            block = 4096
+            while True:
+                start = max(0, end - block)
+                f.seek(start)
+                lines = f.read(end - start).splitlines()
+                # the first line may be cut off unless we read from the start
+                for line in reversed(lines if start == 0 else lines[1:]):
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    return record.get("lsn", 0)
+                if start == 0:
+                    return 0
+                block *= 4
+
+    def sync(self):
+        """Force buffered records to disk"""
+        if self._file is not None and self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def __iter__(self):
+        return self.iter_records()
+
+    def iter_records(self, start=None, end=None, method=None, product_id=None):
+        """Stream records back one at a time, optionally filtered.
+
+        start/end bound the timestamp ("YYYY-MM-DD HH:MM:SS" strings or
+        prefixes such as "2024-05-01"; end is inclusive of its prefix),
+        method matches the payment method and product_id keeps
+        transactions with a line for that product. Only one line is held in
+        memory at a time, and the timestamp index lets a date range skip
+        whole blocks of the file.
+        """
+        if not os.path.exists(self.path):
+            return
+        if end is not None:
+            # "2024-05-31" should include everything on that day
+            end = end + "\uffff"
+
+        # cheap byte checks before paying for json.loads on every line
+        needles = []
+        if method is not None:
+            needles.append(b'"method":' + json.dumps(method).encode("utf-8"))
+        if product_id is not None:
+            needles.append(b'"id":' + json.dumps(product_id).encode("utf-8"))
+
+        with open(self.path, 'rb') as f:
+            for offset, stop in self._ranges(start, end):
+                f.seek(offset)
+                while stop is None or offset < stop:
+                    line = f.readline()
+                    if not line:
+                        break
+                    offset += len(line)
+                    if not line.strip() or not all(n in line for n in needles):
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # torn line from an interrupted write
+                        continue
+                    if self._matches(record, start, end, method, product_id):
+                        yield record
+
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def iter_from(self, offset):
+        """(end offset, record) for each complete line after byte `offset`.
+
+        record is None for a line that cannot be parsed; a line still being
+        written is left for the next call.
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                try:
+                    record = json.loads(line) if line.strip() else None
+                except ValueError:
+                    record = None
+                yield offset, record
+
+    @staticmethod
+    def _matches(record, start, end, method, product_id):
+        timestamp = record.get("timestamp", "")
+        if start is not None and timestamp < start:
+            return False
+        if end is not None and timestamp > end:
+            return False
+        if method is not None and record.get("method") != method:
+            return False
+        if product_id is not None and not any(line.get("id") == product_id for line in record.get("items", [])):
+            return False
+        return True
+
+    def _ranges(self, start, end):
+        """(offset, stop) spans of the file that can hold records in [start, end]"""
+        if start is None and end is None:
+            yield 0, None
+            return
+        entries = self.update_index()
+        for block_start, block_end, earliest, latest in entries:
+            if (start is None or latest >= start) and (end is None or earliest <= end):
+                yield block_start, block_end
+        # records after the last full block are not indexed yet
+        yield (entries[-1][1] if entries else 0), None
+
+    def _read_index(self):
+        try:
+            with open(self.index_path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        entries = []
+        for i in range(len(data) // INDEX_ENTRY.size):
+            block_start, block_end, earliest, latest = INDEX_ENTRY.unpack_from(data, i * INDEX_ENTRY.size)
+            entries.append((block_start, block_end,
+                            earliest.rstrip(b"\0").decode("utf-8", "replace"),
+                            latest.rstrip(b"\0").decode("utf-8", "replace")))
+        return entries
+
+    def update_index(self):
+        """Index any full blocks appended since the last call; returns the entries"""
+        entries = self._read_index()
+        size = os.path.getsize(self.path)
+        if entries and entries[-1][1] > size:
+            # the journal was replaced; start over
+            entries = []
+        offset = entries[-1][1] if entries else 0
+        added = []
+
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            block_start, count, earliest, latest = offset, 0, None, None
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # a line still being written; index it next time
+                    break
+                offset += len(line)
+                try:
+                    timestamp = json.loads(line).get("timestamp", "")
+                except ValueError:
+                    timestamp = None
+                if timestamp is not None:
+                    timestamp = timestamp[:19]
+                    earliest = timestamp if earliest is None else min(earliest, timestamp)
+                    latest = timestamp if latest is None else max(latest, timestamp)
+                count += 1
+                if count == INDEX_BLOCK:
+                    added.append((block_start, offset, earliest or "", latest or ""))
+                    block_start, count, earliest, latest = offset, 0, None, None
+
+        if added:
+            entries += added
+            tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                for block_start, block_end, earliest, latest in entries:
+                    f.write(INDEX_ENTRY.pack(block_start, block_end,
+                                             earliest.encode("utf-8"), latest.encode("utf-8")))
+            os.replace(tmp_path, self.index_path)
+        return entries
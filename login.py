@@ -1,74 +1,125 @@
+import timing
+
 import customtkinter as ctk
 from tkinter import messagebox
-from main import InventoryDashboard
-from cashier import CashierApp
 import json
 import os
 
+timing.record("login", "import", timing.STARTED)
+
+# the role views (main, cashier) are imported on first login, not at startup
+ctk.set_appearance_mode("dark")
+ctk.set_default_color_theme("blue")
+
 USERS_FILE = "users.json" 
 
+DEFAULT_ADMIN = {
+    "password": "admin123",
+    "role": "Admin",
+    "question": "What is your mother's maiden name?",
+    "answer": "bocalbos"
+}
+
+# In-process copy of users.json, valid while the file's (mtime, size) is unchanged
+_users_cache = {}
+_users_stamp = None
+_checked_stamp = None
+
+
+def _file_stamp():
+    try:
+        st = os.stat(USERS_FILE)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _read_users():
+    """Return the cached users, re-reading the file only if it changed on disk"""
+    global _users_cache, _users_stamp
+    stamp = _file_stamp()
+    if stamp is None:
+        _users_cache, _users_stamp = {}, None
+    elif stamp != _users_stamp:
+        with open(USERS_FILE, "r") as f:
+            _users_cache = json.load(f)
+        _users_stamp = stamp
+    return _users_cache
+
 
 def ensure_users_file():
-    """Create users.json with default admin if missing."""
-    if not os.path.exists(USERS_FILE):
-        default_users = {
-            "admin": {
-                "password": "admin123",
-                "role": "Admin",
-                "question": "What is your mother's maiden name?",
-                "answer": "bocalbos"
-            }
-        }
-        with open(USERS_FILE, "w") as f:
-            json.dump(default_users, f, indent=4)
+    """Create users.json with default admin if missing, repairing the admin entry."""
+    global _checked_stamp
+    users = _read_users()
+    if _users_stamp is not None and _users_stamp == _checked_stamp:
+        return
+
+    admin = users.get("admin")
+    if admin is None:
+        fixed = dict(DEFAULT_ADMIN)
     else:
-        with open(USERS_FILE, "r") as f:
-            users = json.load(f)
-
-        if "admin" in users:
-            users["admin"]["answer"] = "bocalbos"
-            users["admin"]["question"] = "What is your mother's maiden name?"
-            users["admin"]["role"] = "Admin"
-            if "password" not in users["admin"]:
-                users["admin"]["password"] = "admin123"
-        else:
-            users["admin"] = {
-                "password": "admin123",
-                "role": "Admin",
-                "question": "What is your mother's maiden name?",
-                "answer": "bocalbos"
-            }
-
-        with open(USERS_FILE, "w") as f:
-            json.dump(users, f, indent=4)
+        fixed = dict(admin)
+        fixed["answer"] = DEFAULT_ADMIN["answer"]
+        fixed["question"] = DEFAULT_ADMIN["question"]
+        fixed["role"] = DEFAULT_ADMIN["role"]
+        fixed.setdefault("password", DEFAULT_ADMIN["password"])
+
+    if fixed != admin or _users_stamp is None:
+        users = dict(users)
+        users["admin"] = fixed
+        save_users(users)
+    _checked_stamp = _users_stamp
 
 
 def load_users():
     ensure_users_file()
-    with open(USERS_FILE, "r") as f:
-        return json.load(f)
+    return _read_users()
 
 
 def save_users(users_dict):
-    with open(USERS_FILE, "w") as f:
+    global _users_cache, _users_stamp
+    tmp_path = USERS_FILE + ".tmp"
+    with open(tmp_path, "w") as f:
         json.dump(users_dict, f, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, USERS_FILE)
+    _users_cache, _users_stamp = users_dict, _file_stamp()
 
 
+def get_user(username):
+    """Return a copy of one user's record, or None"""
+    user = load_users().get(username)
+    return dict(user) if user is not None else None
+
+
+def upsert_user(username, record):
+    """Create or replace a user; the file is only written if the record changed"""
+    users = load_users()
+    if users.get(username) == record:
+        return
+    users = dict(users)
+    users[username] = dict(record)
+    save_users(users)
+
+
+# the one root window; the login screen and the role views take turns inside it
+widgets_started = timing.now()
 window = ctk.CTk()
-window.title("HardTrack Login")
-window.geometry("400x470")
-window.resizable(False, False)
+login_view = ctk.CTkFrame(window, fg_color="transparent")
+# the cashier view is kept between shifts so the next login is instant
+cashier_view = None
 
-label = ctk.CTkLabel(window, text="Welcome!", font=("Arial", 25, "bold"))
+label = ctk.CTkLabel(login_view, text="Welcome!", font=("Arial", 25, "bold"))
 label.pack(pady=(40, 30))
 
-ctk.CTkLabel(window, text="Enter Username", font=("Arial", 18, "bold")).pack(anchor="w", padx=10)
-username_entry = ctk.CTkEntry(window, width=380, height=35, corner_radius=10,
+ctk.CTkLabel(login_view, text="Enter Username", font=("Arial", 18, "bold")).pack(anchor="w", padx=10)
+username_entry = ctk.CTkEntry(login_view, width=380, height=35, corner_radius=10,
                               placeholder_text="Type your username")
 username_entry.pack(anchor="w", padx=10, pady=(5, 20))
 
-ctk.CTkLabel(window, text="Enter Password", font=("Arial", 18, "bold")).pack(anchor="w", padx=10)
-pass_entry = ctk.CTkEntry(window, width=380, height=35, corner_radius=10,
+ctk.CTkLabel(login_view, text="Enter Password", font=("Arial", 18, "bold")).pack(anchor="w", padx=10)
+pass_entry = ctk.CTkEntry(login_view, width=380, height=35, corner_radius=10,
                           placeholder_text="Type your password", show="*")
 pass_entry.pack(anchor="w", padx=10, pady=(5, 10))
 
@@ -79,7 +130,7 @@ def toggle_password():
     pass_entry.configure(show="" if show_pass_var.get() else "*")
 
 
-pass_frame = ctk.CTkFrame(window, fg_color="transparent")
+pass_frame = ctk.CTkFrame(login_view, fg_color="transparent")
 pass_frame.pack(anchor="w", padx=10, pady=(0, 20), fill="x")
 
 ctk.CTkCheckBox(pass_frame, text="Show Password",
@@ -132,8 +183,7 @@ def forgot_password_flow():
             messagebox.showerror("Error", "Passwords do not match.")
             return
 
-        users = load_users()
-        stored = users.get(username)
+        stored = get_user(username)
 
         if not stored:
             messagebox.showerror("Error", "User not found (unexpected).")
@@ -143,8 +193,8 @@ def forgot_password_flow():
             messagebox.showerror("Error", "Incorrect answer.")
             return
 
-        users[username]["password"] = new_pass
-        save_users(users)
+        stored["password"] = new_pass
+        upsert_user(username, stored)
         messagebox.showinfo("Success", "Password reset successfully!")
         fp.destroy()
 
@@ -156,8 +206,8 @@ def forgot_password_flow():
             messagebox.showerror("Error", "Please enter your username.")
             return
 
-        users = load_users()
-        if username not in users:
+        user = get_user(username)
+        if user is None:
             messagebox.showerror("Error", "Username not found.")
             return
 
@@ -165,7 +215,7 @@ def forgot_password_flow():
         find_btn.configure(state="disabled")
 
         # show security question
-        q = users[username].get("question", "")
+        q = user.get("question", "")
         question_label.configure(text=f"Security question: {q}")
         question_label.pack(padx=20, pady=(10, 4))
 
@@ -206,8 +256,7 @@ def login():
         messagebox.showerror("Error", "Please enter username and password.")
         return
 
-    users = load_users()
-    user = users.get(username)
+    user = get_user(username)
 
     if not user or user.get("password") != password:
         messagebox.showerror("Error", "Invalid login credentials!")
@@ -216,19 +265,11 @@ def login():
     role = user.get("role", "User")
     messagebox.showinfo("Success", f"{role} Logged In!")
 
-    if role == "Admin":
-        window.destroy()
-        app = InventoryDashboard()
-        app.mainloop()
-
-    elif role == "Cashier":
-        window.withdraw()
-        app = CashierApp()
-        app.mainloop()
-        window.deiconify()
+    if role in ("Admin", "Cashier"):
+        show_role_view(role)
 
 
-ctk.CTkButton(window, text="Login", height=40, corner_radius=10,
+ctk.CTkButton(login_view, text="Login", height=40, corner_radius=10,
               command=login).pack(fill="x", padx=10, pady=(10, 10))
 
 
@@ -313,19 +354,16 @@ def open_register_window():
             messagebox.showerror("Error", "Passwords do not match.")
             return
 
-        users = load_users()
-        if username in users:
+        if get_user(username) is not None:
             messagebox.showerror("Error", "Username already exists!")
             return
 
-        users[username] = {
+        upsert_user(username, {
             "password": password,
             "question": question,
             "answer": answer,
             "role": role
-        }
-
-        save_users(users)
+        })
         messagebox.showinfo("Success", "User Registered Successfully!")
         reg.destroy()
 
@@ -333,7 +371,7 @@ def open_register_window():
                   command=save_user).pack(pady=8)
 
 
-ctk.CTkButton(window, text="Register New User", height=40, corner_radius=10,
+ctk.CTkButton(login_view, text="Register New User", height=40, corner_radius=10,
               command=open_register_window).pack(fill="x", padx=10, pady=(0, 20))
 
 
@@ -342,18 +380,15 @@ def cashier_login():
         messagebox.showerror("Error", "Enter cashier credentials.")
         return
 
-    users = load_users()
-    u = users.get(cashier_user.get().strip())
+    u = get_user(cashier_user.get().strip())
 
     if not u or u.get("password") != cashier_pass.get().strip() or u.get("role") != "Cashier":
         messagebox.showerror("Error", "Invalid cashier credentials!")
         return
 
     messagebox.showinfo("Success", "Cashier Logged in!")
-    window.withdraw()
-    app = CashierApp()
-    app.mainloop()
-    window.deiconify()
+    cashier_user.winfo_toplevel().destroy()
+    show_role_view("Cashier")
 
 
 def admin_login():
@@ -361,17 +396,15 @@ def admin_login():
         messagebox.showerror("Error", "Enter admin credentials.")
         return
 
-    users = load_users()
-    u = users.get(admin_user.get().strip())
+    u = get_user(admin_user.get().strip())
 
     if not u or u.get("password") != admin_pass.get().strip() or u.get("role") != "Admin":
         messagebox.showerror("Error", "Invalid admin credentials!")
         return
 
     messagebox.showinfo("Success", "Admin logged in!")
-    window.destroy()
-    app = InventoryDashboard()
-    app.mainloop()
+    admin_user.winfo_toplevel().destroy()
+    show_role_view("Admin")
 
 
 def forgot_admin_password_flow():
@@ -390,8 +423,7 @@ def forgot_admin_password_flow():
     ctk.CTkLabel(fp, text="Admin Password Reset",
                  font=("Arial", 18, "bold")).pack(pady=12)
 
-    users = load_users()
-    admin_data = users.get("admin")
+    admin_data = get_user("admin")
 
     ctk.CTkLabel(
         fp,
@@ -440,7 +472,7 @@ def forgot_admin_password_flow():
             return
 
         admin_data["password"] = new_pass
-        save_users(users)
+        upsert_user("admin", admin_data)
         messagebox.showinfo("Success", "Admin password updated!")
         fp.destroy()
 
@@ -590,7 +622,7 @@ def open_cashier_window():
 
 
 admin_label = ctk.CTkLabel(
-    window,
+    login_view,
     text="Login as Admin?",
     font=("Arial", 13, "underline"),
     cursor="hand2"
@@ -598,5 +630,55 @@ admin_label = ctk.CTkLabel(
 admin_label.pack(anchor="w", padx=145, pady=(0, 14))
 admin_label.bind("<Button-1>", lambda e: open_admin_window())
 
+
+def show_login():
+    """Put the login screen back in the root window"""
+    window.title("HardTrack Login")
+    window.geometry("400x470")
+    window.resizable(False, False)
+    window.protocol("WM_DELETE_WINDOW", quit_app)
+    pass_entry.delete(0, "end")
+    login_view.pack(fill="both", expand=True)
+
+
+def show_role_view(role):
+    """Swap the login screen for the Admin or Cashier view"""
+    global cashier_view
+    started = timing.now()
+    resumed = False
+    if role == "Admin":
+        name = "admin"
+        with timing.span(name, "import"):
+            from main import InventoryDashboard
+        view = InventoryDashboard(window, on_logout=show_login)
+    elif cashier_view is None:
+        name = "cashier"
+        with timing.span(name, "import"):
+            from cashier import CashierApp
+        view = cashier_view = CashierApp(window, on_logout=show_login)
+    else:
+        name = "cashier"
+        resumed = True
+        view = cashier_view
+        view.resume()
+
+    login_view.pack_forget()
+    window.title(view.window_title)
+    window.geometry(view.window_size)
+    window.resizable(True, True)
+    window.protocol("WM_DELETE_WINDOW", view.logout)
+    view.pack(fill="both", expand=True)
+    timing.first_paint(view, name, started, resumed=resumed)
+
+
+def quit_app():
+    if cashier_view is not None:
+        cashier_view.close()
+    window.destroy()
+
+
 ensure_users_file()
+timing.record("login", "widgets", widgets_started)
+show_login()
+timing.first_paint(window, "login", timing.STARTED)
 window.mainloop()
\ No newline at end of file
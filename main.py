@@ -1,75 +1,88 @@
+import os
 import customtkinter as ctk
 from tkinter import ttk
 import tkinter.messagebox as messagebox
+from tkinter import filedialog
 from datetime import datetime
-import json
-import os
+from catalog import Catalog
+from columns import stock_stats
+from export import EXPORT_POLL_MS, EXPORTS, FORMATS, ExportJob
+from feed import INVENTORY_POLL_MS, read_changes
+from reports import REPORTS, SALES_REPORTS, Counted, ReportStream, ReportWorker
+from search import SEARCH_DELAY_MS
+from storage import ConflictError, open_storage, stock_status
+from table import Pager, VirtualTable
+from timing import first_paint, now, record, span
+from writer import WriteBehind
+
+# sort menu label -> field, for the paged tables
+INVENTORY_SORT_KEYS = {"Date Added": None, "ID": "id", "Name": "name", "Category": "category",
+                       "Quantity": "quantity", "Price": "price", "Status": "status"}
+SUPPLIER_SORT_KEYS = {"Date Added": None, "ID": "id", "Name": "name", "Contact": "contact", "Email": "email", "Status": "status"}
 
 # Set appearance mode
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
 
 
-class InventoryDashboard(ctk.CTk):
-    def __init__(self):
-        super().__init__()
+class InventoryDashboard(ctk.CTkFrame):
+    """Admin view, shown inside the application's single root window"""
 
-        self.title("HardTrack")
-        self.geometry("1240x700")
+    window_title = "HardTrack"
+    window_size = "1240x700"
+
+    def __init__(self, master, on_logout=None):
+        super().__init__(master, fg_color="transparent")
+        # called after logout, so the host can show the login screen again
+        self.on_logout = on_logout
 
         self.grid_rowconfigure(0, weight=1)
         self.grid_columnconfigure(1, weight=1)
 
-        self.data_file = "inventory_data.json"
-        self.load_data()
-
-        self.create_sidebar()
-        self.create_main_content()
+        with span("admin", "load"):
+            self.storage = open_storage()
+            self.load_data()
+        # dashboard counters, kept current by update_status and the delete handler
+        self.stats = stock_stats(self.inventory_data)
+        # saves run off the Tk thread; see poll_pending_writes
+        self.writer = WriteBehind(self.storage)
+        self.pending_after_id = None
+        # a page was shown while edits were queued; fetch it again once they land
+        self.requery_after_write = False
+        # created with the Reports section
+        self.report_stream = None
+        self.report_worker = None
+        # the data changed since the report on screen was generated
+        self.report_stale = False
+        self.export_job = None
+        self.export_after_id = None
+
+        with span("admin", "widgets"):
+            self.create_sidebar()
+            self.create_main_content()
+        self.poll_pending_writes()
+        self.feed_after_id = self.after(INVENTORY_POLL_MS, self.poll_inventory_changes)
 
     def load_data(self):
-        """Load data from JSON file or use default sample data"""
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r') as f:
-                    data = json.load(f)
-                    self.inventory_data = data.get("inventory", [])
-                    self.suppliers_data = data.get("suppliers", [])
-            except:
-                self.load_default_data()
-        else:
+        """Load data from the storage backend or use default sample data"""
+        self.inventory_version = 0
+        try:
+            self.inventory_data, self.suppliers_data = self.storage.load()
+            self.inventory_version = self.storage.version
+        except Exception as e:
+            # nothing is written until the store can be read again
+            messagebox.showerror("Load Error", f"Could not load inventory data; the files were left untouched.\n\n{e}")
             self.load_default_data()
 
-        # keep a master copy for searching
-        self.all_inventory_data = list(self.inventory_data)
-
     def load_default_data(self):
         """Load default sample data"""
-        self.inventory_data = []
-        self.suppliers_data = []
-        self.all_inventory_data = []
-
-    def save_data(self):
-        """Save data to JSON file"""
-        data = {
-            "inventory": self.inventory_data,
-            "suppliers": self.suppliers_data
-        }
-        with open(self.data_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        self.inventory_data = Catalog()
+        self.suppliers_data = Catalog()
 
     def update_status(self, item):
         """Auto-update status based on quantity"""
-        quantity = item.get("quantity", 0)
-        try:
-            quantity = int(quantity)
-        except Exception:
-            quantity = 0
-        if quantity == 0:
-            item["status"] = "Out of Stock"
-        elif quantity <= 10:
-            item["status"] = "Low Stock"
-        else:
-            item["status"] = "In Stock"
+        item["status"] = stock_status(item.get("quantity", 0))
+        self.stats.update(item)
 
     def create_sidebar(self):
         """Create left sidebar with navigation"""
@@ -125,8 +138,101 @@ class InventoryDashboard(ctk.CTk):
         version_label.pack()
 
     def logout(self):
-        self.quit()
+        if self.pending_after_id is not None:
+            self.after_cancel(self.pending_after_id)
+            self.pending_after_id = None
+        if self.feed_after_id is not None:
+            self.after_cancel(self.feed_after_id)
+            self.feed_after_id = None
+        if self.report_stream is not None:
+            self.report_stream.cancel()
+            self.report_worker.close()
+        if self.export_after_id is not None:
+            self.after_cancel(self.export_after_id)
+            self.export_after_id = None
+        if self.export_job is not None:
+            # a half-written export is discarded, never left in place of the file
+            self.export_job.cancel()
+        self.writer.close()
+        for error in self.writer.take_errors():
+            messagebox.showerror("Save Failed", f"Some changes could not be saved:\n{error}")
+        self.storage.close()
         self.destroy()
+        if self.on_logout is not None:
+            self.on_logout()
+
+    def poll_pending_writes(self):
+        """Refresh the save indicator and report failed background writes"""
+        pending = self.writer.pending()
+        if pending:
+            self.save_status_label.configure(text=f"💾 Saving {pending} change(s)...", text_color="#ffaa00")
+        else:
+            self.save_status_label.configure(text="✓ All changes saved", text_color="#808080")
+            if self.requery_after_write:
+                self.requery_after_write = False
+                if self.current_section in ("inventory", "suppliers"):
+                    self.refresh_section(self.current_section)
+
+        for error in self.writer.take_errors():
+            if isinstance(error, ConflictError):
+                # show what the store holds now; the rest of the batch was saved
+                self.apply_inventory_changes(self.inventory_version,
+                                             [row for row in error.current.values() if row is not None],
+                                             [item_id for item_id, row in error.current.items() if row is None])
+                messagebox.showwarning("Edit Not Saved", f"{error}\nThe current values are shown; "
+                                                         "edit the product again to change them.")
+            else:
+                messagebox.showerror("Save Failed", f"Some changes could not be saved:\n{error}")
+
+        self.pending_after_id = self.after(250, self.poll_pending_writes)
+
+    def poll_inventory_changes(self):
+        """Pick up sales and edits made on other terminals"""
+        changes = None
+        # wait for our own queued edits to land first so the feed cannot undo them on screen
+        if not self.writer.pending():
+            changes = read_changes(self.storage, self.inventory_version)
+
+        if changes is not None:
+            self.apply_inventory_changes(*changes)
+
+        self.feed_after_id = self.after(INVENTORY_POLL_MS, self.poll_inventory_changes)
+
+    def apply_inventory_changes(self, version, changed, deleted):
+        """Merge changed rows into the inventory and the counters"""
+        if deleted is None:
+            # the store sent a full resync
+            current = {row['id'] for row in changed}
+            deleted = [item_id for item_id in self.inventory_data.ids() if item_id not in current]
+
+        updated = False
+        for row in changed:
+            item = self.inventory_data.get(row['id'])
+            if item is None:
+                if 'name' not in row:
+                    continue
+                item = dict(row)
+                self.inventory_data.add(item)
+            elif all(item.get(field) == value for field, value in row.items()):
+                # e.g. our own edits coming back from the store
+                continue
+            else:
+                item.update(row)
+            self.stats.update(item)
+            updated = True
+
+        for item_id in deleted:
+            if self.inventory_data.remove(item_id) is not None:
+                self.stats.discard(item_id)
+                updated = True
+
+        self.inventory_version = version
+        if not updated:
+            return
+        self.mark_changed()
+        # the section on screen is refreshed now, the others when next shown
+        self.refresh_section(self.current_section)
+        self.section_versions[self.current_section] = self.data_version
 
     def create_main_content(self):
         """Create main content area"""
@@ -144,6 +250,12 @@ class InventoryDashboard(ctk.CTk):
         self.content_frame.grid_rowconfigure(0, weight=1)
         self.content_frame.grid_columnconfigure(0, weight=1)
 
+        # sections are built on first visit, then hidden and reused
+        self.section_frames = {}
+        self.section_versions = {}
+        self.current_section = None
+        self.data_version = 0
+
         # Show dashboard by default
         self.show_section("dashboard")
 
@@ -171,17 +283,22 @@ class InventoryDashboard(ctk.CTk):
         )
         time_label.pack(side="right", padx=20, pady=20)
 
+        # Background save indicator
+        self.save_status_label = ctk.CTkLabel(
+            header,
+            text="✓ All changes saved",
+            font=("Arial", 12),
+            text_color="#808080"
+        )
+        self.save_status_label.pack(side="right", padx=10, pady=20)
+
     def create_stats_cards(self, parent):
         """Create statistics cards"""
         cards_frame = ctk.CTkFrame(parent, fg_color="transparent")
         cards_frame.pack(fill="x", pady=(0, 20))
 
-        stats = [
-            ("Total Products", str(len(self.inventory_data)), "#00a8ff"),
-            ("In Stock", str(sum(1 for item in self.inventory_data if item.get('status') == 'In Stock')), "#00cc88"),
-            ("Low Stock", str(sum(1 for item in self.inventory_data if item.get('status') == 'Low Stock')), "#ffaa00"),
-            ("Out of Stock", str(sum(1 for item in self.inventory_data if item.get('status') == 'Out of Stock')), "#ff5555"),
-        ]
+        stats = self.stats_values()
+        self.stats_labels = {}
 
         for i, (label, value, color) in enumerate(stats):
             card = ctk.CTkFrame(cards_frame, fg_color="#1a1a1a", corner_radius=10)
@@ -194,6 +311,7 @@ class InventoryDashboard(ctk.CTk):
                 text_color=color
             )
             value_label.pack(pady=(15, 5), padx=20)
+            self.stats_labels[label] = value_label
 
             name_label = ctk.CTkLabel(
                 card,
@@ -203,8 +321,21 @@ class InventoryDashboard(ctk.CTk):
             )
             name_label.pack(pady=(0, 15), padx=20)
 
+    def stats_values(self):
+        counts = self.stats.counts
+        return [
+            ("Total Products", str(len(self.stats)), "#00a8ff"),
+            ("In Stock", str(counts.get('In Stock', 0)), "#00cc88"),
+            ("Low Stock", str(counts.get('Low Stock', 0)), "#ffaa00"),
+            ("Out of Stock", str(counts.get('Out of Stock', 0)), "#ff5555"),
+        ]
+
+    def update_stats_cards(self):
+        for label, value, color in self.stats_values():
+            self.stats_labels[label].configure(text=value)
+
     def create_inventory_table(self, parent, data, columns, show_status=True, editable=False):
-        """Create inventory table display with optional edit/delete buttons"""
+        """Create inventory table display with optional edit/delete buttons; returns the VirtualTable"""
         header_frame = ctk.CTkFrame(parent, fg_color="#1a1a1a")
         header_frame.pack(fill="x", pady=(0, 10))
 
@@ -225,30 +356,20 @@ class InventoryDashboard(ctk.CTk):
             )
             label.pack(side="left", padx=10, pady=10)
 
-        table_scroll = ctk.CTkScrollableFrame(
-            parent,
-            fg_color="#1a1a1a",
-            corner_radius=10
-        )
-        table_scroll.pack(fill="both", expand=True)
-
         # Determine if this table is for suppliers (used to call supplier handlers)
         editing_suppliers = False
         if len(columns) > 0 and str(columns[0]).lower().startswith("supplier"):
             editing_suppliers = True
 
-        for item in data:
-            row_frame = ctk.CTkFrame(table_scroll, fg_color="#252525", corner_radius=5)
-            row_frame.pack(fill="x", padx=5, pady=5)
-
-            status_color_map = {
-                "In Stock": "#00cc88",
-                "Low Stock": "#ffaa00",
-                "Out of Stock": "#ff5555",
-                "Active": "#00cc88",
-                "Inactive": "#ff5555"
-            }
+        status_color_map = {
+            "In Stock": "#00cc88",
+            "Low Stock": "#ffaa00",
+            "Out of Stock": "#ff5555",
+            "Active": "#00cc88",
+            "Inactive": "#ff5555"
+        }
 
+        def row_values(item):
             # Build the values list depending on whether it's inventory or supplier
             if "status" in item and show_status:
                 # Inventory item expected keys: id, name, category, quantity, price, status
@@ -274,100 +395,102 @@ class InventoryDashboard(ctk.CTk):
                     item.get("email", ""),
                     item.get("status", "")
                 ]
+            return [
+                (value, status_color_map.get(value, "#ffffff") if header == "Status" else "#ffffff")
+                for value, header in zip(values, columns)
+            ]
 
-            # zip values with widths and columns (columns is shorter than headers_to_show when editable)
-            for value, width, header in zip(values, widths, columns):
-                if header == "Status":
-                    color = status_color_map.get(value, "#ffffff")
-                    label = ctk.CTkLabel(
-                        row_frame,
-                        text=value,
-                        font=("Arial", 11),
-                        text_color=color,
-                        width=width
-                    )
-                else:
-                    label = ctk.CTkLabel(
-                        row_frame,
-                        text=value,
-                        font=("Arial", 11),
-                        text_color="#ffffff",
-                        width=width
-                    )
-                label.pack(side="left", padx=10, pady=12)
-
-            if editable:
-                # choose appropriate handlers based on table type
-                if editing_suppliers:
-                    edit_cmd = (lambda i=item: self.edit_supplier(i))
-                    del_cmd = (lambda i=item: self.delete_supplier(i))
-                else:
-                    edit_cmd = (lambda i=item: self.edit_item(i))
-                    del_cmd = (lambda i=item: self.delete_item(i))
-
-                edit_btn = ctk.CTkButton(
-                    row_frame,
-                    text="✏️ Edit",
-                    font=("Arial", 10),
-                    width=40,
-                    height=25,
-                    fg_color="#00a8ff",
-                    hover_color="#0088cc",
-                    command=edit_cmd
-                )
-                edit_btn.pack(side="left", padx=5, pady=12)
-
-                del_btn = ctk.CTkButton(
-                    row_frame,
-                    text="🗑️ Delete",
-                    font=("Arial", 10),
-                    width=40,
-                    height=25,
-                    fg_color="#ff5555",
-                    hover_color="#cc4444",
-                    command=del_cmd
-                )
-                del_btn.pack(side="left", padx=5, pady=12)
+        actions = ()
+        if editable:
+            # choose appropriate handlers based on table type
+            if editing_suppliers:
+                edit_cmd, del_cmd = self.edit_supplier, self.delete_supplier
+            else:
+                edit_cmd, del_cmd = self.edit_item, self.delete_item
+            actions = (
+                ("✏️ Edit", "#00a8ff", "#0088cc", edit_cmd),
+                ("🗑️ Delete", "#ff5555", "#cc4444", del_cmd),
+            )
+
+        # only the rows on screen get widgets; they are rebound as the table scrolls
+        table = VirtualTable(parent, widths[:len(columns)], row_values, actions)
+        table.pack(fill="both", expand=True)
+        table.set_data(data)
+        return table
 
     def show_section(self, section):
-        """Show different sections"""
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
+        """Show different sections; each is built once and refreshed only if the data changed"""
+        started = now()
+        phase = "cached"
+        if self.current_section is not None:
+            self.section_frames[self.current_section].pack_forget()
 
         # nice title case
         title_text = section.capitalize() if isinstance(section, str) else str(section)
         self.title_label.configure(text=title_text)
 
+        frame = self.section_frames.get(section)
+        if frame is None:
+            frame = self.section_frames[section] = ctk.CTkFrame(self.content_frame, fg_color="transparent")
+            if section == "dashboard":
+                self.show_dashboard(frame)
+            elif section == "inventory":
+                self.show_inventory(frame)
+            elif section == "reports":
+                self.show_reports(frame)
+            elif section == "suppliers":
+                self.show_suppliers(frame)
+            phase = "build"
+        elif self.section_versions[section] != self.data_version:
+            self.refresh_section(section)
+            phase = "refresh"
+        self.section_versions[section] = self.data_version
+
+        frame.pack(fill="both", expand=True)
+        self.current_section = section
+        record(f"section:{section}", phase, started)
+        first_paint(frame, f"section:{section}", started, shown=phase)
+
+    def refresh_section(self, section):
+        """Bring an already built section up to date with the data"""
         if section == "dashboard":
-            self.show_dashboard()
+            self.update_stats_cards()
+            self.dashboard_table.set_data(self.inventory_data.rows())
         elif section == "inventory":
-            self.show_inventory()
+            self.inventory_pager.load()
         elif section == "reports":
-            self.show_reports()
+            # reports are only rebuilt on request
+            self.report_stale = True
+            if not self.report_worker.running() and not self.report_stream.running():
+                self.show_report_stale()
         elif section == "suppliers":
-            self.show_suppliers()
+            self.suppliers_pager.load()
+
+    def mark_changed(self):
+        """Record a data change so cached sections refresh when next shown"""
+        self.data_version += 1
 
-    def show_dashboard(self):
+    def show_dashboard(self, parent):
         """Display dashboard view"""
-        self.create_stats_cards(self.content_frame)
+        self.create_stats_cards(parent)
 
         section_label = ctk.CTkLabel(
-            self.content_frame,
+            parent,
             text="Inventory Overview",
             font=("Arial", 18, "bold"),
             text_color="#ffffff"
         )
         section_label.pack(anchor="w", pady=(10, 15))
 
-        self.create_inventory_table(
-            self.content_frame,
-            self.inventory_data,
+        self.dashboard_table = self.create_inventory_table(
+            parent,
+            self.inventory_data.rows(),
             ["ID", "Product Name", "Category", "Quantity", "Price", "Status"]
         )
 
-    def show_inventory(self):
+    def show_inventory(self, parent):
         """Display inventory view"""
-        controls_frame = ctk.CTkFrame(self.content_frame, fg_color="transparent")
+        controls_frame = ctk.CTkFrame(parent, fg_color="transparent")
         controls_frame.pack(fill="x", pady=(0, 15))
 
         section_label = ctk.CTkLabel(
@@ -408,45 +531,50 @@ class InventoryDashboard(ctk.CTk):
             width=200
         )
         search_entry.pack(side="left", padx=5)
-        self.search_var.trace("w", self.filter_inventory)
 
-        # container for table, so we can rebuild it when searching
-        self.inventory_table_frame = ctk.CTkFrame(self.content_frame, fg_color="transparent")
-        self.inventory_table_frame.pack(fill="both", expand=True)
-
-        self.create_inventory_table(
-            self.inventory_table_frame,
-            self.inventory_data,
+        # the table shows one page at a time, fetched from storage
+        self.inventory_table = self.create_inventory_table(
+            parent,
+            [],
             ["ID", "Product Name", "Category", "Quantity", "Price", "Status"],
             editable=True
         )
+        self.inventory_pager = Pager(
+            parent,
+            self.inventory_table,
+            lambda *page: self.fetch_page("inventory", *page, text=self.search_var.get()),
+            INVENTORY_SORT_KEYS
+        )
+        self.inventory_pager.pack(side="bottom", fill="x", pady=(10, 0), before=self.inventory_table)
+        self.inventory_pager.load(0)
 
-    def filter_inventory(self, *args):
-        """Filter inventory based on search box"""
-        query = self.search_var.get().strip().lower()
-
-        if not hasattr(self, "all_inventory_data"):
-            self.all_inventory_data = list(self.inventory_data)
+        self.filter_after_id = None
+        self.search_var.trace("w", self.filter_inventory)
 
-        if query == "":
-            filtered = self.all_inventory_data
-        else:
-            filtered = [
-                item for item in self.all_inventory_data
-                if query in str(item.get("id", "")).lower()
-                or query in str(item.get("name", "")).lower()
-            ]
+    def filter_inventory(self, *args):
+        """Filter inventory based on search box, once typing pauses"""
+        if self.filter_after_id is not None:
+            self.after_cancel(self.filter_after_id)
+        self.filter_after_id = self.after(SEARCH_DELAY_MS, self.apply_inventory_filter)
 
-        # clear and rebuild table
-        for widget in self.inventory_table_frame.winfo_children():
-            widget.destroy()
+    def apply_inventory_filter(self):
+        self.filter_after_id = None
+        self.inventory_pager.load(0)
 
-        self.create_inventory_table(
-            self.inventory_table_frame,
-            filtered,
-            ["ID", "Product Name", "Category", "Quantity", "Price", "Status"],
-            editable=True
-        )
+    def fetch_page(self, table, offset, limit, sort_key, descending, text=None):
+        """One page of records from storage, as (rows, total)"""
+        try:
+            rows, total = self.storage.query(table, offset, limit, sort_key, descending, text=text)
+        except Exception as e:
+            messagebox.showerror("Load Error", f"Could not load {table}:\n{e}")
+            return [], 0
+        if self.writer.pending():
+            # show edits still queued for the background writer from our own copy;
+            # poll_pending_writes fetches the page again once they are saved
+            local = self.inventory_data if table == "inventory" else self.suppliers_data
+            rows = [dict(local.get(row["id"])) for row in rows if row["id"] in local]
+            self.requery_after_write = True
+        return rows, total
 
     def add_item_dialog(self):
         dialog = ctk.CTkToplevel(self)
@@ -494,12 +622,16 @@ class InventoryDashboard(ctk.CTk):
                     messagebox.showerror("Error", "ID and Product Name are required!")
                     return
 
+                if new_item["id"] in self.inventory_data:
+                    messagebox.showerror("Error", "A product with this ID already exists!")
+                    return
+
                 self.update_status(new_item)
-                self.inventory_data.append(new_item)
-                self.all_inventory_data = list(self.inventory_data)
-                self.save_data()
+                self.inventory_data.add(new_item)
+                self.writer.submit(("item", new_item["id"]), "save_item", dict(new_item))
                 messagebox.showinfo("Success", "Product added successfully!")
                 dialog.destroy()
+                self.mark_changed()
                 self.show_section("inventory")
             except ValueError:
                 messagebox.showerror("Error", "Quantity must be a number and Price must be a decimal!")
@@ -515,6 +647,8 @@ class InventoryDashboard(ctk.CTk):
         submit_btn.pack(pady=20, padx=20, fill="x")
 
     def edit_item(self, item):
+        # table rows are page copies; edit the dashboard's own record
+        item = self.inventory_data.get(item.get("id"), item)
         dialog = ctk.CTkToplevel(self)
         dialog.title("Edit Product")
         dialog.geometry("450x400")
@@ -547,16 +681,25 @@ class InventoryDashboard(ctk.CTk):
         def submit():
             try:
                 # ID is not editable (kept for reference), but you can allow editing if needed
-                item["name"] = fields["Product Name"].get()
-                item["category"] = fields["Category"].get()
-                item["quantity"] = int(fields["Quantity"].get())
-                item["price"] = float(fields["Price"].get())
-                self.update_status(item)
-                self.save_data()
-                # refresh master copy
-                self.all_inventory_data = list(self.inventory_data)
+                edited = {
+                    "name": fields["Product Name"].get(),
+                    "category": fields["Category"].get(),
+                    "quantity": int(fields["Quantity"].get()),
+                    "price": float(fields["Price"].get()),
+                }
+                # only the fields that changed are sent, and only if the store still has what we showed,
+                # so the edit cannot overwrite a sale made on another terminal meanwhile
+                expected = {field: item.get(field) for field, value in edited.items() if item.get(field) != value}
+                changes = {field: edited[field] for field in expected}
+                if changes:
+                    item.update(changes)
+                    self.update_status(item)
+                    changes["status"] = item["status"]
+                    self.writer.submit(("item", item["id"]), "update_item",
+                                       {"id": item["id"], "changes": changes, "expected": expected})
                 messagebox.showinfo("Success", "Product updated successfully!")
                 dialog.destroy()
+                self.mark_changed()
                 self.show_section("inventory")
             except ValueError:
                 messagebox.showerror("Error", "Invalid input values!")
@@ -573,26 +716,23 @@ class InventoryDashboard(ctk.CTk):
 
     def delete_item(self, item):
         if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete {item.get('name','this item')}?"):
-            try:
-                self.inventory_data.remove(item)
-            except ValueError:
-                # item not present
-                pass
-            self.save_data()
-            self.all_inventory_data = list(self.inventory_data)
+            self.inventory_data.remove(item.get("id"))
+            self.stats.discard(item.get("id"))
+            self.writer.submit(("item", item.get("id")), "delete_item", item.get("id"))
             messagebox.showinfo("Success", "Product deleted successfully!")
+            self.mark_changed()
             self.show_section("inventory")
 
-    def show_reports(self):
+    def show_reports(self, parent):
         section_label = ctk.CTkLabel(
-            self.content_frame,
+            parent,
             text="Reports",
             font=("Arial", 18, "bold"),
             text_color="#ffffff"
         )
         section_label.pack(anchor="w", pady=(0, 15))
 
-        selector_frame = ctk.CTkFrame(self.content_frame, fg_color="#1a1a1a", corner_radius=10)
+        selector_frame = ctk.CTkFrame(parent, fg_color="#1a1a1a", corner_radius=10)
         selector_frame.pack(fill="x", pady=(0, 20))
 
         label = ctk.CTkLabel(
@@ -605,23 +745,94 @@ class InventoryDashboard(ctk.CTk):
 
         self.report_menu = ctk.CTkOptionMenu(
             selector_frame,
-            values=["Inventory Status", "Low Stock Alert", "Out of Stock Items", "Total Inventory Value"],
+            values=list(REPORTS) + list(SALES_REPORTS),
             font=("Arial", 12),
             command=self.generate_report
         )
         self.report_menu.pack(side="left", padx=10, pady=15)
         self.report_menu.set("Inventory Status")
 
-        output_frame = ctk.CTkFrame(self.content_frame, fg_color="transparent")
+        export_frame = ctk.CTkFrame(parent, fg_color="#1a1a1a", corner_radius=10)
+        export_frame.pack(fill="x", pady=(0, 20))
+
+        export_label = ctk.CTkLabel(
+            export_frame,
+            text="Export Data:",
+            font=("Arial", 14),
+            text_color="#ffffff"
+        )
+        export_label.pack(side="left", padx=15, pady=15)
+
+        self.export_menu = ctk.CTkOptionMenu(export_frame, values=list(EXPORTS), font=("Arial", 12))
+        self.export_menu.pack(side="left", padx=10, pady=15)
+        self.export_format_menu = ctk.CTkOptionMenu(export_frame, values=list(FORMATS), width=100, font=("Arial", 12))
+        self.export_format_menu.pack(side="left", padx=10, pady=15)
+
+        self.export_btn = ctk.CTkButton(
+            export_frame,
+            text="⬇ Export",
+            width=100,
+            font=("Arial", 12),
+            command=self.start_export
+        )
+        self.export_btn.pack(side="left", padx=10, pady=15)
+
+        self.export_cancel_btn = ctk.CTkButton(
+            export_frame,
+            text="Cancel",
+            width=80,
+            font=("Arial", 11),
+            fg_color="#ff4444",
+            hover_color="#cc0000",
+            state="disabled",
+            command=self.cancel_export
+        )
+        self.export_cancel_btn.pack(side="right", padx=15, pady=15)
+
+        self.export_status = ctk.CTkLabel(export_frame, text="", font=("Arial", 11), text_color="#808080")
+        self.export_status.pack(side="right", padx=10, pady=15)
+
+        output_frame = ctk.CTkFrame(parent, fg_color="transparent")
         output_frame.pack(fill="both", expand=True)
 
+        output_header = ctk.CTkFrame(output_frame, fg_color="transparent")
+        output_header.pack(fill="x", pady=(0, 10))
+
         output_label = ctk.CTkLabel(
-            output_frame,
+            output_header,
             text="Report Output",
             font=("Arial", 14, "bold"),
             text_color="#ffffff"
         )
-        output_label.pack(anchor="w", pady=(0, 10))
+        output_label.pack(side="left")
+
+        self.report_cancel_btn = ctk.CTkButton(
+            output_header,
+            text="Cancel",
+            width=80,
+            font=("Arial", 11),
+            fg_color="#ff4444",
+            hover_color="#cc0000",
+            state="disabled",
+            command=self.cancel_report
+        )
+        self.report_cancel_btn.pack(side="right", padx=(10, 0))
+
+        regenerate_btn = ctk.CTkButton(
+            output_header,
+            text="↻ Regenerate",
+            width=110,
+            font=("Arial", 11),
+            command=lambda: self.generate_report(self.report_menu.get())
+        )
+        regenerate_btn.pack(side="right", padx=(10, 0))
+
+        self.report_progress = ctk.CTkProgressBar(output_header, width=200)
+        self.report_progress.pack(side="right", padx=10)
+        self.report_progress.set(0)
+
+        self.report_status = ctk.CTkLabel(output_header, text="", font=("Arial", 11), text_color="#808080")
+        self.report_status.pack(side="right", padx=10)
 
         self.report_text = ctk.CTkTextbox(
             output_frame,
@@ -631,87 +842,139 @@ class InventoryDashboard(ctk.CTk):
             height=300
         )
         self.report_text.pack(fill="both", expand=True)
+        self.report_stream = ReportStream(
+            self, self.report_text, lambda fraction, finished: self.show_report_progress(fraction, finished, "Displaying"))
+        self.report_worker = ReportWorker(
+            self, lambda fraction, finished: self.show_report_progress(fraction, finished, "Generating"))
         self.generate_report("Inventory Status")
 
     def generate_report(self, report_type):
+        """Build the report on the worker thread, then stream it into the textbox"""
+        self.report_worker.cancel()
+        self.report_stream.cancel()
         self.report_text.delete("1.0", "end")
-
-        if report_type == "Inventory Status":
-            report = "INVENTORY STATUS REPORT\n\n"
-            for i, item in enumerate(self.inventory_data, start=1):
-                report += f"═══════════════ ITEM #{i} ═══════════════\n"
-                report += f"Name       : {item.get('name','')}\n"
-                report += f"Category   : {item.get('category','')}\n"
-                report += f"Quantity   : {item.get('quantity','')}\n"
-                try:
-                    price_str = f"₱{float(item.get('price',0)):.2f}"
-                except Exception:
-                    price_str = str(item.get('price',''))
-                report += f"Price      : {price_str}\n"
-                report += f"Status     : {item.get('status','')}\n"
-                report += "────────────────────────────────────────────\n\n"
-
-        elif report_type == "Low Stock Alert":
-            low_stock = [item for item in self.inventory_data if item.get('status') == "Low Stock"]
-            report = "LOW STOCK ALERT\n"
-            report += "=" * 50 + "\n\n"
-            if low_stock:
-                for item in low_stock:
-                    report += f"⚠️  {item.get('name','')} (ID: {item.get('id','')})\n"
-                    report += f"Current Quantity: {item.get('quantity','')}\n"
-                    try:
-                        report += f"Price: ₱{float(item.get('price',0)):.2f}\n\n"
-                    except Exception:
-                        report += f"Price: {item.get('price','')}\n\n"
-            else:
-                report += "No low stock items found!"
-
-        elif report_type == "Out of Stock Items":
-            out_of_stock = [item for item in self.inventory_data if item.get('status') == "Out of Stock"]
-            report = "OUT OF STOCK ITEMS\n"
-            report += "=" * 50 + "\n\n"
-            if out_of_stock:
-                for item in out_of_stock:
-                    report += f"❌ {item.get('name','')} (ID: {item.get('id','')})\n"
-                    try:
-                        report += f"Price: ₱{float(item.get('price',0)):.2f}\n"
-                    except Exception:
-                        report += f"Price: {item.get('price','')}\n"
-                    report += f"Category: {item.get('category','')}\n\n"
+        self.report_progress.set(0)
+        self.report_status.configure(text="Generating...", text_color="#808080")
+        self.report_cancel_btn.configure(state="normal")
+        self.report_stale = False
+
+        # an unchanged report is shown straight from the cache; every applied change moves data_version
+        key = (report_type, self.data_version)
+        chunks = self.report_worker.cached(key)
+        if chunks is not None:
+            self.show_report(chunks)
+            return
+
+        progress = None
+        if report_type in SALES_REPORTS:
+            report = SALES_REPORTS[report_type]
+
+            def build():
+                return report(self.storage.sales_rollups())
+        else:
+            report = REPORTS[report_type]
+            # copies, so edits arriving while the worker reads don't disturb it
+            items = Counted(list(self.inventory_data))
+            stats = self.stats.copy()
+
+            def build():
+                return report(items, stats)
+
+            def progress():
+                return items.done / len(items) if len(items) else None
+
+        self.report_worker.submit(key, build, self.show_report, self.report_failed, progress)
+
+    def show_report(self, chunks):
+        sections = Counted(chunks)
+        self.report_stream.start(sections, lambda: sections.done / len(sections) if len(sections) else None)
+
+    def report_failed(self, error):
+        self.report_status.configure(text="Failed")
+        self.report_cancel_btn.configure(state="disabled")
+        messagebox.showerror("Report Error", f"Could not generate the report:\n{error}")
+
+    def show_report_progress(self, fraction, finished, action):
+        if fraction is not None:
+            self.report_progress.set(fraction)
+        if finished:
+            if self.report_stale:
+                self.show_report_stale()
             else:
-                report += "No out of stock items!"
-
-        elif report_type == "Total Inventory Value":
-            total_value = sum((item.get('quantity', 0) or 0) * (item.get('price', 0) or 0) for item in self.inventory_data)
-            report = "TOTAL INVENTORY VALUE REPORT\n"
-            report += "=" * 50 + "\n\n"
-            report += f"Total Products: {len(self.inventory_data)}\n"
-            report += f"Total Units: {sum((item.get('quantity', 0) or 0) for item in self.inventory_data)}\n"
-            try:
-                report += f"Total Inventory Value: ₱{float(total_value):,.2f}\n\n"
-            except Exception:
-                report += f"Total Inventory Value: {total_value}\n\n"
-            report += "BREAKDOWN BY CATEGORY:\n"
-            categories = {}
-            for item in self.inventory_data:
-                cat = item.get('category', 'Uncategorized')
-                categories.setdefault(cat, 0)
-                qty = item.get('quantity', 0) or 0
-                price = item.get('price', 0) or 0
-                try:
-                    categories[cat] += float(qty) * float(price)
-                except Exception:
-                    pass
-            for cat, value in categories.items():
-                try:
-                    report += f"{cat}: ₱{float(value):,.2f}\n"
-                except Exception:
-                    report += f"{cat}: {value}\n"
+                self.report_status.configure(text="Complete")
+            self.report_cancel_btn.configure(state="disabled")
+        elif fraction is not None:
+            self.report_status.configure(text=f"{action}... {fraction:.0%}")
+
+    def show_report_stale(self):
+        self.report_status.configure(text="Data changed - click Regenerate", text_color="#ffaa00")
+
+    def cancel_report(self):
+        building = self.report_worker.cancel()
+        streaming = self.report_stream.cancel()
+        if building or streaming:
+            self.report_text.insert("end", "\n\n[Report cancelled]")
+            self.report_status.configure(text="Cancelled")
+        self.report_cancel_btn.configure(state="disabled")
+
+    def start_export(self):
+        """Ask for a file and stream the chosen data into it on a background thread"""
+        name = self.export_menu.get()
+        fmt = self.export_format_menu.get()
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            title=f"Export {name}",
+            defaultextension=FORMATS[fmt],
+            initialfile=f"{name.lower()}_{datetime.now().strftime('%Y%m%d')}{FORMATS[fmt]}",
+            filetypes=[(fmt, "*" + FORMATS[fmt]), ("All files", "*.*")]
+        )
+        if not path:
+            return
+
+        total = None
+        if name == "Inventory":
+            records = list(self.inventory_data)
+            total = len(records)
+        elif name == "Suppliers":
+            records = list(self.suppliers_data)
+            total = len(records)
+        else:
+            # read from the store as the export goes, never all at once
+            records = self.storage.iter_transactions()
+
+        self.export_job = ExportJob(name, records, path, fmt, total).start()
+        self.export_btn.configure(state="disabled")
+        self.export_cancel_btn.configure(state="normal")
+        self.export_status.configure(text="Exporting...")
+        self.export_after_id = self.after(EXPORT_POLL_MS, self.poll_export)
+
+    def poll_export(self):
+        job = self.export_job
+        if not job.done:
+            of_total = f" of {job.total:,}" if job.total is not None else ""
+            self.export_status.configure(text=f"Exported {job.written:,}{of_total} records...")
+            self.export_after_id = self.after(EXPORT_POLL_MS, self.poll_export)
+            return
+
+        self.export_after_id = None
+        self.export_job = None
+        self.export_btn.configure(state="normal")
+        self.export_cancel_btn.configure(state="disabled")
+        if job.error is not None:
+            self.export_status.configure(text="Export failed")
+            messagebox.showerror("Export Failed", f"Could not export {job.path}:\n{job.error}")
+        elif job.cancelled:
+            self.export_status.configure(text="Export cancelled")
+        else:
+            self.export_status.configure(text=f"Exported {job.written:,} records to {os.path.basename(job.path)}")
 
-        self.report_text.insert("1.0", report)
+    def cancel_export(self):
+        if self.export_job is not None:
+            self.export_job.cancel()
+            self.export_cancel_btn.configure(state="disabled")
 
-    def show_suppliers(self):
-        controls_frame = ctk.CTkFrame(self.content_frame, fg_color="transparent")
+    def show_suppliers(self, parent):
+        controls_frame = ctk.CTkFrame(parent, fg_color="transparent")
         controls_frame.pack(fill="x", pady=(0, 15))
 
         section_label = ctk.CTkLabel(
@@ -732,14 +995,22 @@ class InventoryDashboard(ctk.CTk):
         )
         add_btn.pack(side="right", padx=5)
 
-        # supplier table
-        self.create_inventory_table(
-            self.content_frame,
-            self.suppliers_data,
+        # supplier table, one page at a time
+        self.suppliers_table = self.create_inventory_table(
+            parent,
+            [],
             ["Supplier ID", "Name", "Contact", "Email", "Status"],
             show_status=False,
             editable=True
         )
+        self.suppliers_pager = Pager(
+            parent,
+            self.suppliers_table,
+            lambda *page: self.fetch_page("suppliers", *page),
+            SUPPLIER_SORT_KEYS
+        )
+        self.suppliers_pager.pack(side="bottom", fill="x", pady=(10, 0), before=self.suppliers_table)
+        self.suppliers_pager.load(0)
 
     def add_supplier_dialog(self):
         dialog = ctk.CTkToplevel(self)
@@ -788,10 +1059,15 @@ class InventoryDashboard(ctk.CTk):
                 messagebox.showerror("Error", "ID and Name are required!")
                 return
 
-            self.suppliers_data.append(new_supplier)
-            self.save_data()
+            if new_supplier["id"] in self.suppliers_data:
+                messagebox.showerror("Error", "A supplier with this ID already exists!")
+                return
+
+            self.suppliers_data.add(new_supplier)
+            self.writer.submit(("supplier", new_supplier["id"]), "save_supplier", dict(new_supplier))
             messagebox.showinfo("Success", "Supplier added successfully!")
             dialog.destroy()
+            self.mark_changed()
             self.show_section("suppliers")
 
         submit_btn = ctk.CTkButton(
@@ -805,6 +1081,7 @@ class InventoryDashboard(ctk.CTk):
         submit_btn.pack(pady=20, padx=20, fill="x")
 
     def edit_supplier(self, supplier):
+        supplier = self.suppliers_data.get(supplier.get("id"), supplier)
         dialog = ctk.CTkToplevel(self)
         dialog.title("Edit Supplier")
         dialog.geometry("450x450")
@@ -839,9 +1116,10 @@ class InventoryDashboard(ctk.CTk):
             supplier["email"] = fields["Email"].get()
             supplier["status"] = fields["Status"].get()
 
-            self.save_data()
+            self.writer.submit(("supplier", supplier["id"]), "save_supplier", dict(supplier))
             messagebox.showinfo("Success", "Supplier updated successfully!")
             dialog.destroy()
+            self.mark_changed()
             self.show_section("suppliers")
 
         submit_btn = ctk.CTkButton(
@@ -856,15 +1134,18 @@ class InventoryDashboard(ctk.CTk):
 
     def delete_supplier(self, supplier):
         if messagebox.askyesno("Confirm Delete", f"Delete supplier {supplier.get('name', '')}?"):
-            try:
-                self.suppliers_data.remove(supplier)
-            except ValueError:
-                pass
-            self.save_data()
+            self.suppliers_data.remove(supplier.get("id"))
+            self.writer.submit(("supplier", supplier.get("id")), "delete_supplier", supplier.get("id"))
             messagebox.showinfo("Success", "Supplier deleted successfully!")
+            self.mark_changed()
             self.show_section("suppliers")
 
 
 if __name__ == "__main__":
-    app = InventoryDashboard()
-    app.mainloop()
+    root = ctk.CTk()
+    root.title(InventoryDashboard.window_title)
+    root.geometry(InventoryDashboard.window_size)
+    app = InventoryDashboard(root, on_logout=root.destroy)
+    app.pack(fill="both", expand=True)
+    root.protocol("WM_DELETE_WINDOW", app.logout)
+    root.mainloop()
@@ -0,0 +1,369 @@
+import threading
+import time
+
+# longest a report may hold the event loop per tick before yielding to it
+REPORT_SLICE_MS = 15
+
+# how often the Tk thread checks on a report being built in the background
+REPORT_POLL_MS = 50
+
+# report text is handed to the textbox in pieces of about this many characters
+REPORT_CHUNK_CHARS = 64 * 1024
+
+# finished reports kept for instant re-display, in characters across all of them
+REPORT_CACHE_CHARS = 64 * 1024 * 1024
+
+RULE = "=" * 50 + "\n\n"
+
+
+def _price(item, label):
+    try:
+        return f"{label}₱{float(item.get('price', 0)):.2f}"
+    except Exception:
+        return f"{label}{item.get('price', '')}"
+
+
+def inventory_status(items, stats):
+    yield "INVENTORY STATUS REPORT\n\n"
+    for i, item in enumerate(items, start=1):
+        yield (f"═══════════════ ITEM #{i} ═══════════════\n"
+               f"Name       : {item.get('name', '')}\n"
+               f"Category   : {item.get('category', '')}\n"
+               f"Quantity   : {item.get('quantity', '')}\n"
+               f"{_price(item, 'Price      : ')}\n"
+               f"Status     : {item.get('status', '')}\n"
+               "────────────────────────────────────────────\n\n")
+
+
+def low_stock(items, stats):
+    yield "LOW STOCK ALERT\n" + RULE
+    found = False
+    for item in items:
+        if item.get('status') == "Low Stock":
+            found = True
+            yield (f"⚠️  {item.get('name', '')} (ID: {item.get('id', '')})\n"
+                   f"Current Quantity: {item.get('quantity', '')}\n"
+                   f"{_price(item, 'Price: ')}\n\n")
+    if not found:
+        yield "No low stock items found!"
+
+
+def out_of_stock(items, stats):
+    yield "OUT OF STOCK ITEMS\n" + RULE
+    found = False
+    for item in items:
+        if item.get('status') == "Out of Stock":
+            found = True
+            yield (f"❌ {item.get('name', '')} (ID: {item.get('id', '')})\n"
+                   f"{_price(item, 'Price: ')}\n"
+                   f"Category: {item.get('category', '')}\n\n")
+    if not found:
+        yield "No out of stock items!"
+
+
+def inventory_value(items, stats):
+    # read from the running totals instead of re-scanning the inventory
+    yield ("TOTAL INVENTORY VALUE REPORT\n" + RULE +
+           f"Total Products: {len(stats)}\n"
+           f"Total Units: {stats.units}\n"
+           f"Total Inventory Value: ₱{stats.value:,.2f}\n\n"
+           "BREAKDOWN BY CATEGORY:\n")
+    for cat, (count, value) in stats.categories.items():
+        yield f"{cat}: ₱{value:,.2f}\n"
+
+
+# menu label -> generator of report sections, called as report(items, stats)
+REPORTS = {
+    "Inventory Status": inventory_status,
+    "Low Stock Alert": low_stock,
+    "Out of Stock Items": out_of_stock,
+    "Total Inventory Value": inventory_value,
+}
+
+
+def revenue_by_day(sales):
+    yield "REVENUE BY DAY\n" + RULE
+    yield f"{'Day':<14}{'Sales':>8}{'Units':>10}{'Revenue':>18}\n"
+    # newest first
+    for day in sorted(sales.days, reverse=True):
+        count, revenue, units = sales.days[day]
+        yield f"{day:<14}{count:>8}{units:>10}{'₱' + format(revenue, ',.2f'):>18}\n"
+    if not sales.days:
+        yield "No sales recorded yet."
+
+
+def revenue_by_hour(sales):
+    yield "REVENUE BY HOUR OF DAY\n" + RULE
+    yield f"{'Hour':<14}{'Sales':>8}{'Revenue':>18}\n"
+    for hour in sorted(sales.hours):
+        count, revenue = sales.hours[hour]
+        yield f"{hour + ':00':<14}{count:>8}{'₱' + format(revenue, ',.2f'):>18}\n"
+    if not sales.hours:
+        yield "No sales recorded yet."
+
+
+def revenue_by_method(sales):
+    yield "REVENUE BY PAYMENT METHOD\n" + RULE
+    for method, (count, revenue) in sorted(sales.methods.items(), key=lambda entry: entry[1][1], reverse=True):
+        share = revenue / sales.revenue if sales.revenue else 0
+        yield f"{method}\nSales: {count}\nRevenue: ₱{revenue:,.2f} ({share:.1%})\n\n"
+    if not sales.methods:
+        yield "No sales recorded yet."
+
+
+def top_sellers(sales):
+    yield "TOP SELLERS\n" + RULE
+    if not sales.products:
+        yield "No sales recorded yet."
+        return
+    for title, by in (("BY UNITS SOLD:", "units"), ("BY REVENUE:", "revenue")):
+        yield title + "\n"
+        for rank, (product_id, name, units, revenue) in enumerate(sales.top_products(by), start=1):
+            yield f"{rank:>2}. {name} (ID: {product_id}) - {units} units, ₱{revenue:,.2f}\n"
+        yield "\n"
+
+
+def basket_size(sales):
+    yield "AVERAGE BASKET SIZE\n" + RULE
+    if not sales.transactions:
+        yield "No sales recorded yet."
+        return
+    yield (f"Transactions: {sales.transactions}\n"
+           f"Units Sold: {sales.units}\n"
+           f"Total Revenue: ₱{sales.revenue:,.2f}\n\n"
+           f"Average Units per Sale: {sales.units / sales.transactions:.2f}\n"
+           f"Average Sale Value: ₱{sales.revenue / sales.transactions:,.2f}\n")
+
+
+# menu label -> generator of report sections over the sales rollups, called as report(sales)
+SALES_REPORTS = {
+    "Revenue by Day": revenue_by_day,
+    "Revenue by Hour": revenue_by_hour,
+    "Revenue by Payment Method": revenue_by_method,
+    "Top Sellers": top_sellers,
+    "Average Basket Size": basket_size,
+}
+
+
+class Counted:
+    """Iterates a list while recording how far the consumer has got"""
+
+    def __init__(self, items):
+        self.items = items
+        self.done = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        for item in self.items:
+            self.done += 1
+            yield item
+
+
+class ReportStream:
+    """Writes a report into a textbox a slice at a time on the Tk event loop.
+
+    start() takes an iterator of text sections and appends them in inserts
+    of about REPORT_CHUNK_CHARS for up to REPORT_SLICE_MS per tick,
+    inserts included, then hands the loop back so the window stays
+    responsive. on_progress(fraction, finished) is called after each
+    tick, where fraction comes from progress() (None if unknown).
+    """
+
+    def __init__(self, widget, textbox, on_progress=None):
+        self.widget = widget
+        self.textbox = textbox
+        self.on_progress = on_progress
+        self._sections = None
+        self._progress = None
+        self._after_id = None
+
+    def running(self):
+        return self._sections is not None
+
+    def start(self, sections, progress=None):
+        """Clear the textbox and stream `sections` into it"""
+        self.cancel()
+        self.textbox.delete("1.0", "end")
+        self._sections = iter(sections)
+        self._progress = progress
+        self._step()
+
+    def cancel(self):
+        """Stop writing; returns whether a report was still running"""
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        running = self._sections is not None
+        self._sections = None
+        return running
+
+    def _step(self):
+        self._after_id = None
+        deadline = time.perf_counter() + REPORT_SLICE_MS / 1000
+        finished = False
+        # the clock covers the inserts too, and no insert is much over REPORT_CHUNK_CHARS
+        while not finished and time.perf_counter() < deadline:
+            chunk, size = [], 0
+            while size < REPORT_CHUNK_CHARS and time.perf_counter() < deadline:
+                # batch a few sections per clock check
+                for _ in range(50):
+                    section = next(self._sections, None)
+                    if section is None:
+                        finished = True
+                        break
+                    chunk.append(section)
+                    size += len(section)
+                    if size >= REPORT_CHUNK_CHARS:
+                        break
+                if finished:
+                    break
+            if chunk:
+                self.textbox.insert("end", "".join(chunk))
+
+        fraction = None if self._progress is None else self._progress()
+        if finished:
+            self._sections = None
+            fraction = 1.0
+        else:
+            self._after_id = self.widget.after(1, self._step)
+        if self.on_progress is not None:
+            self.on_progress(fraction, finished)
+
+
+class ReportWorker:
+    """Builds reports on a background thread and caches the finished text.
+
+    submit(key, build, on_done, on_error, progress) runs build() - an
+    iterator of text sections - on the worker thread and collects it into
+    chunks. The Tk thread polls for the result with after() and calls
+    on_done(chunks) or on_error(exception) there, so callbacks can touch
+    widgets. While it waits, on_progress(fraction, False) reports
+    progress() if given.
+
+    Finished results are cached by key (e.g. report type plus data
+    version); check cached() before gathering a report's inputs. A newer
+    submit replaces a job that has not finished.
+    """
+
+    def __init__(self, widget, on_progress=None):
+        self.widget = widget
+        self.on_progress = on_progress
+        self._cache = {}
+        self._cached_chars = 0
+        self._job = None
+        self._result = None
+        self._after_id = None
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self._thread = threading.Thread(target=self._run, name="report-worker", daemon=True)
+        self._thread.start()
+
+    def cached(self, key):
+        """The finished chunks for key, or None"""
+        chunks = self._cache.pop(key, None)
+        if chunks is not None:
+            # most recently used goes last, so eviction takes the oldest
+            self._cache[key] = chunks
+        return chunks
+
+    def running(self):
+        """Whether a job is still being built"""
+        with self._cond:
+            return self._job is not None
+
+    def submit(self, key, build, on_done, on_error, progress=None):
+        self.cancel()
+        job = {"key": key, "build": build, "on_done": on_done, "on_error": on_error,
+               "progress": progress, "cancelled": False}
+        with self._cond:
+            self._job = job
+            self._result = None
+            self._cond.notify_all()
+        self._after_id = self.widget.after(REPORT_POLL_MS, self._poll, job)
+
+    def cancel(self):
+        """Drop the job in progress, if any; returns whether there was one"""
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        with self._cond:
+            job = self._job
+            if job is None:
+                return False
+            job["cancelled"] = True
+            self._job = None
+            self._result = None
+        return True
+
+    def close(self):
+        self.cancel()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _poll(self, job):
+        self._after_id = None
+        with self._cond:
+            result = self._result if self._job is job else None
+            if result is not None:
+                self._job = None
+                self._result = None
+        if result is None:
+            if self.on_progress is not None and job["progress"] is not None:
+                self.on_progress(job["progress"](), False)
+            self._after_id = self.widget.after(REPORT_POLL_MS, self._poll, job)
+            return
+
+        chunks, error = result
+        if error is not None:
+            job["on_error"](error)
+            return
+        self._store(job["key"], chunks)
+        job["on_done"](chunks)
+
+    def _store(self, key, chunks):
+        size = sum(len(chunk) for chunk in chunks)
+        if size > REPORT_CACHE_CHARS:
+            return
+        while self._cache and self._cached_chars + size > REPORT_CACHE_CHARS:
+            oldest = next(iter(self._cache))
+            self._cached_chars -= sum(len(chunk) for chunk in self._cache.pop(oldest))
+        self._cache[key] = chunks
+        self._cached_chars += size
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while (self._job is None or self._result is not None) and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                job = self._job
+
+            try:
+                result = (self._collect(job), None)
+            except Exception as e:
+                result = (None, e)
+
+            with self._cond:
+                # a job cancelled or replaced while it ran has nobody waiting for it
+                if self._job is job:
+                    self._result = result
+
+    @staticmethod
+    def _collect(job):
+        chunks, pending, size = [], [], 0
+        for section in job["build"]():
+            if job["cancelled"]:
+                return []
+            pending.append(section)
+            size += len(section)
+            if size >= REPORT_CHUNK_CHARS:
+                chunks.append("".join(pending))
+                pending, size = [], 0
+        if pending:
+            chunks.append("".join(pending))
+        return chunks
@@ -0,0 +1,246 @@
+# quiet time after the last keystroke before a search runs
+SEARCH_DELAY_MS = 150
+
+# records scanned per event-loop tick, so typing stays responsive on big catalogs
+SEARCH_CHUNK = 5000
+
+# fields covered by the substring index
+INDEX_FIELDS = ("id", "name", "category")
+
+# records indexed per event-loop tick while the index builds in the background
+INDEX_BUILD_CHUNK = 500
+
+
+def match_record(record, query, fields=INDEX_FIELDS):
+    """Whether a lower-cased query occurs in one of the record's searchable fields"""
+    return any(query in str(record.get(field, "")).lower() for field in fields)
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """Inverted index from three-character substrings to record ids.
+
+    Each record's id, name and category are lower-cased once and kept
+    with the record. A query of three or more characters is answered by
+    intersecting the postings of its trigrams and checking only those
+    candidates; shorter queries scan the stored lower-cased text.
+
+    start_build() indexes source() a chunk at a time on the Tk event loop
+    (begin_build() and build_chunk() do the same from any loop or thread);
+    until it finishes `ready` is False and callers should scan instead.
+    add() and remove() keep the index current from the moment the build
+    starts.
+    """
+
+    def __init__(self, source, fields=INDEX_FIELDS):
+        self.source = source
+        self.fields = fields
+        self.ready = False
+        self._built = False
+        self._pending = None
+        self._removed = set()
+        # id -> (insertion order, lower-cased text, record)
+        self._entries = {}
+        self._postings = {}
+        self._next_order = 0
+
+    def _text(self, record):
+        # NUL between fields keeps a match from spanning two of them
+        return "\0".join(str(record.get(field, "")).lower() for field in self.fields)
+
+    def build(self):
+        """Index everything now"""
+        self._reset()
+        for record in self.source():
+            self.add(record)
+        self.ready = True
+
+    def start_build(self, widget, chunk=INDEX_BUILD_CHUNK):
+        """Index source() in after() steps so the window stays responsive"""
+        self.begin_build()
+        self._build_step(widget, chunk, 0)
+
+    def begin_build(self):
+        """Start an incremental build; feed it with build_chunk()"""
+        self._reset()
+        self._pending = list(self.source())
+        # records added while the build runs go after the existing ones
+        self._next_order = len(self._pending)
+
+    def build_chunk(self, start, chunk=INDEX_BUILD_CHUNK):
+        """Index the next `chunk` pending records; returns where to continue, or None once ready"""
+        pending = self._pending
+        for order in range(start, min(start + chunk, len(pending))):
+            record = pending[order]
+            record_id = record.get("id")
+            # records edited or deleted since the build started were handled by add()/remove()
+            if record_id not in self._entries and record_id not in self._removed:
+                self.add(record, order)
+        if start + chunk < len(pending):
+            return start + chunk
+        self._pending = None
+        self._removed = set()
+        self.ready = True
+        return None
+
+    def _reset(self):
+        self._entries = {}
+        self._postings = {}
+        self._next_order = 0
+        self._built = True
+        self.ready = False
+        self._removed = set()
+
+    def _build_step(self, widget, chunk, start):
+        start = self.build_chunk(start, chunk)
+        if start is not None:
+            widget.after(1, self._build_step, widget, chunk, start)
+
+    def add(self, record, order=None):
+        """Index a new record, or re-index one whose fields changed"""
+        if not self._built:
+            return
+        record_id = record.get("id")
+        text = self._text(record)
+        old = self._entries.get(record_id)
+        if old is None:
+            if order is None:
+                order = self._next_order
+                self._next_order += 1
+            old_grams = set()
+        else:
+            order = old[0]
+            old_grams = _trigrams(old[1])
+        new_grams = _trigrams(text)
+        for gram in old_grams - new_grams:
+            self._drop_posting(gram, record_id)
+        for gram in new_grams - old_grams:
+            self._postings.setdefault(gram, set()).add(record_id)
+        self._entries[record_id] = (order, text, record)
+
+    def remove(self, record_id):
+        if not self._built:
+            return
+        if self._pending is not None:
+            self._removed.add(record_id)
+        entry = self._entries.pop(record_id, None)
+        if entry is not None:
+            for gram in _trigrams(entry[1]):
+                self._drop_posting(gram, record_id)
+
+    def _drop_posting(self, gram, record_id):
+        ids = self._postings.get(gram)
+        if ids is not None:
+            ids.discard(record_id)
+            if not ids:
+                del self._postings[gram]
+
+    def search(self, query):
+        """Records containing the lower-cased query, in insertion order"""
+        if not self.ready:
+            self.build()
+        if len(query) < 3:
+            entries = [entry for entry in self._entries.values() if query in entry[1]]
+        else:
+            # rarest trigram first keeps the intersection small
+            postings = sorted((self._postings.get(gram, set()) for gram in _trigrams(query)), key=len)
+            candidates = set(postings[0])
+            for ids in postings[1:]:
+                candidates &= ids
+                if not candidates:
+                    break
+            entries = [self._entries[record_id] for record_id in candidates]
+            entries = [entry for entry in entries if query in entry[1]]
+            entries.sort(key=lambda entry: entry[0])
+        return [entry[2] for entry in entries]
+
+
+class SearchPipeline:
+    """Debounced, incremental substring search over a list of records.
+
+    schedule(query) is meant for every keystroke: the search waits until
+    typing pauses, and a newer query cancels any search still running. When
+    the new query contains the previous one, only the previous results are
+    scanned, since nothing else can match.
+
+    source() returns the records to search, matches(record, query) tests one
+    record against a lower-cased query, and on_results(records) receives the
+    finished result list. With a TrigramIndex, once it is ready, the index
+    answers non-empty queries in one step instead of scanning.
+    """
+
+    def __init__(self, widget, source, matches, on_results, delay_ms=SEARCH_DELAY_MS, index=None):
+        self.widget = widget
+        self.source = source
+        self.matches = matches
+        self.on_results = on_results
+        self.delay_ms = delay_ms
+        self.index = index
+
+        self.query = ""
+        # (query, results) of the last finished search, for narrowing
+        self._last = None
+        self._after_id = None
+        self._generation = 0
+
+    def schedule(self, query):
+        """Run a search for `query` once typing pauses"""
+        self.cancel()
+        self.query = query.strip().lower()
+        self._after_id = self.widget.after(self.delay_ms, self._start)
+
+    def refresh(self):
+        """Re-run the current query now against fresh data"""
+        self.invalidate()
+        self.cancel()
+        self._start()
+
+    def invalidate(self):
+        """Forget the last results; call when the records change"""
+        self._last = None
+
+    def cancel(self):
+        self._generation += 1
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _start(self):
+        self._after_id = None
+        self._generation += 1
+        query = self.query
+        if not query:
+            self._finish(query, list(self.source()))
+            return
+        if self.index is not None and self.index.ready:
+            self._finish(query, self.index.search(query))
+            return
+
+        if self._last is not None and self._last[0] and self._last[0] in query:
+            candidates = self._last[1]
+        else:
+            candidates = self.source()
+            if not isinstance(candidates, list):
+                candidates = list(candidates)
+        self._scan(self._generation, query, candidates, 0, [])
+
+    def _scan(self, generation, query, candidates, start, results):
+        if generation != self._generation:
+            # a newer search has started
+            return
+        end = start + SEARCH_CHUNK
+        matches = self.matches
+        results.extend(record for record in candidates[start:end] if matches(record, query))
+        if end < len(candidates):
+            self._after_id = self.widget.after(
+                1, self._scan, generation, query, candidates, end, results)
+        else:
+            self._after_id = None
+            self._finish(query, results)
+
+    def _finish(self, query, results):
+        self._last = (query, results)
+        self.on_results(results)
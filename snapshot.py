@@ -0,0 +1,278 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Sequence
+
+from catalog import Catalog, stock_status
+
+# 02: quantities are doubles, so fractional stock survives a round trip
+SNAPSHOT_MAGIC = b"HTSNAP02"
+
+# magic, byte order, row count, store version, JSON mtime_ns, JSON size, string blob length, extras length
+HEADER = struct.Struct("<8sBxxxIqqqQQ")
+
+STATUSES = ["In Stock", "Low Stock", "Out of Stock"]
+
+
+def _padded(n):
+    return (n + 7) & ~7
+
+
+def _quantity(value):
+    """A stored quantity as the JSON file had it: whole numbers come back as ints"""
+    return int(value) if value.is_integer() else value
+
+
+def _layout(count):
+    """Byte offsets of each column; every column starts 8-byte aligned"""
+    offsets = {}
+    pos = _padded(HEADER.size)
+    for name, width in (("name", 4), ("category", 4), ("quantity", 8), ("price", 8), ("status", 1)):
+        offsets[name] = pos
+        pos = _padded(pos + width * count)
+    offsets["strings"] = pos
+    return offsets
+
+
+def write_snapshot(path, inventory, suppliers, version, source_stamp, extras=None):
+    """Write a snapshot of `inventory` (iterable of item dicts) atomically.
+
+    Layout: header, one fixed-width column per numeric field, then a
+    NUL-separated string table whose first `count` entries are the ids in
+    row order, followed by the deduplicated names and categories, then a
+    JSON object with the suppliers and any other `extras`.
+    """
+    items = list(inventory)
+    count = len(items)
+
+    strings = [str(item.get("id", "")) for item in items]
+    string_index = {}
+
+    def intern(value):
+        value = str(value if value is not None else "")
+        index = string_index.get(value)
+        if index is None:
+            index = string_index[value] = len(strings)
+            strings.append(value)
+        return index
+
+    names = struct.pack(f"={count}I", *(intern(item.get("name", "")) for item in items))
+    categories = struct.pack(f"={count}I", *(intern(item.get("category", "")) for item in items))
+
+    quantities = []
+    prices = []
+    statuses = bytearray()
+    for item in items:
+        try:
+            quantities.append(float(item.get("quantity", 0) or 0))
+        except (TypeError, ValueError):
+            quantities.append(0.0)
+        try:
+            prices.append(float(item.get("price", 0) or 0))
+        except (TypeError, ValueError):
+            prices.append(0.0)
+        status = item.get("status")
+        statuses.append(STATUSES.index(status) if status in STATUSES else 255)
+
+    blob = "\0".join(s.replace("\0", "") for s in strings).encode("utf-8")
+    extras = json.dumps(dict(extras or {}, suppliers=list(suppliers)), separators=(",", ":")).encode("utf-8")
+
+    mtime_ns, size = source_stamp
+    offsets = _layout(count)
+    byteorder = 0 if sys.byteorder == "little" else 1
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(SNAPSHOT_MAGIC, byteorder, count, version, mtime_ns, size, len(blob), len(extras)))
+        for name, data in (("name", names), ("category", categories),
+                           ("quantity", struct.pack(f"={count}d", *quantities)),
+                           ("price", struct.pack(f"={count}d", *prices)),
+                           ("status", bytes(statuses))):
+            f.seek(offsets[name])
+            f.write(data)
+        f.seek(offsets["strings"])
+        f.write(blob)
+        f.write(extras)
+    os.replace(tmp_path, path)
+
+
+class Snapshot:
+    """Read-only, memory-mapped view of a snapshot file"""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, byteorder, self.count, self.version, mtime_ns, size,
+         blob_len, extras_len) = HEADER.unpack_from(self._mmap, 0)
+        if magic != SNAPSHOT_MAGIC or byteorder != (0 if sys.byteorder == "little" else 1):
+            self.close()
+            raise ValueError(f"{path} is not a usable snapshot")
+        self.source_stamp = (mtime_ns, size)
+
+        offsets = _layout(self.count)
+        view = self._view = memoryview(self._mmap)
+        n = self.count
+        # zero-copy typed views over the mapped columns
+        self.names = view[offsets["name"]:offsets["name"] + 4 * n].cast("I")
+        self.categories = view[offsets["category"]:offsets["category"] + 4 * n].cast("I")
+        self.quantities = view[offsets["quantity"]:offsets["quantity"] + 8 * n].cast("d")
+        self.prices = view[offsets["price"]:offsets["price"] + 8 * n].cast("d")
+        self.statuses = view[offsets["status"]:offsets["status"] + n]
+
+        start = offsets["strings"]
+        self.strings = bytes(view[start:start + blob_len]).decode("utf-8").split("\0")
+        self._extras = (start + blob_len, extras_len)
+
+    def ids(self):
+        return self.strings[:self.count]
+
+    def row(self, i):
+        """Materialize row `i` as an inventory dict"""
+        status = self.statuses[i]
+        quantity = _quantity(self.quantities[i])
+        if status < len(STATUSES):
+            status = STATUSES[status]
+        else:
+            # rows saved without a recognised status
+            status = stock_status(quantity)
+        return {
+            "id": self.strings[i],
+            "name": self.strings[self.names[i]],
+            "category": self.strings[self.categories[i]],
+            "quantity": quantity,
+            "price": self.prices[i],
+            "status": status
+        }
+
+    def extras(self):
+        """The JSON object stored after the string table"""
+        start, length = self._extras
+        return json.loads(bytes(self._mmap[start:start + length]))
+
+    def suppliers(self):
+        return self.extras().get("suppliers", [])
+
+    def close(self):
+        for name in ("names", "categories", "quantities", "prices", "statuses", "_view"):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+        self._mmap.close()
+
+
+class SnapshotCatalog(Catalog):
+    """Catalog over a Snapshot; each row becomes a dict the first time it is used.
+
+    The id -> row map is only built on the first lookup by id, so opening the
+    catalog and walking it in order costs nothing per row up front.
+    """
+
+    def __init__(self, snapshot):
+        self._snapshot = snapshot
+        self._cache = [None] * snapshot.count
+        # id -> row position (or dict once added/replaced); None until needed
+        self._rows = None
+
+    def _row(self, value):
+        if not isinstance(value, int):
+            return value
+        row = self._cache[value]
+        if row is None:
+            row = self._cache[value] = self._snapshot.row(value)
+        return row
+
+    def _index(self):
+        if self._rows is None:
+            self._rows = dict(zip(self._snapshot.ids(), range(self._snapshot.count)))
+        return self._rows
+
+    def __len__(self):
+        return self._snapshot.count if self._rows is None else len(self._rows)
+
+    def __iter__(self):
+        values = range(self._snapshot.count) if self._rows is None else self._rows.values()
+        for value in values:
+            yield self._row(value)
+
+    def __contains__(self, item_id):
+        return item_id in self._index()
+
+    def get(self, item_id, default=None):
+        value = self._index().get(item_id)
+        if value is None:
+            return default
+        return self._row(value)
+
+    def ids(self):
+        return self._index().keys()
+
+    def add(self, row):
+        self._index()[row.get("id")] = row
+
+    def remove(self, item_id):
+        value = self._index().pop(item_id, None)
+        return None if value is None else self._row(value)
+
+    def to_list(self):
+        return list(self)
+
+    def rows(self):
+        return SnapshotRows(self)
+
+    def columns(self):
+        """(ids, statuses, quantities, prices, categories) lists in row order.
+
+        Rows never materialized are read straight from the snapshot columns,
+        so totals over the whole catalog need no dict per row.
+        """
+        snapshot = self._snapshot
+        strings = snapshot.strings
+        column_quantities = snapshot.quantities.tolist()
+        column_prices = snapshot.prices.tolist()
+        column_statuses = snapshot.statuses.tolist()
+        column_categories = snapshot.categories.tolist()
+        cache = self._cache
+
+        ids, statuses, quantities, prices, categories = [], [], [], [], []
+        values = range(snapshot.count) if self._rows is None else self._rows.values()
+        for value in values:
+            row = value if not isinstance(value, int) else cache[value]
+            if row is not None:
+                ids.append(row.get("id"))
+                statuses.append(row.get("status"))
+                quantities.append(row.get("quantity", 0))
+                prices.append(row.get("price", 0))
+                categories.append(row.get("category", "Uncategorized"))
+                continue
+            quantity = _quantity(column_quantities[value])
+            status = column_statuses[value]
+            ids.append(strings[value])
+            statuses.append(STATUSES[status] if status < len(STATUSES) else stock_status(quantity))
+            quantities.append(quantity)
+            prices.append(column_prices[value])
+            categories.append(strings[column_categories[value]])
+        return ids, statuses, quantities, prices, categories
+
+
+class SnapshotRows(Sequence):
+    """Positional view of a SnapshotCatalog's rows at the time it was taken.
+
+    A row becomes a dict only when it is indexed, so a virtual table shows
+    the first screen without materializing the whole catalog.
+    """
+
+    def __init__(self, catalog):
+        self._catalog = catalog
+        count = catalog._snapshot.count
+        self._values = range(count) if catalog._rows is None else list(catalog._rows.values())
+
+    def __len__(self):
+        return len(self._values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._catalog._row(value) for value in self._values[index]]
+        return self._catalog._row(self._values[index])
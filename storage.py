@@ -0,0 +1,1243 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from analytics import SalesRollups, load_rollups, save_rollups
+from catalog import Catalog, query_rows, stock_status
+from journal import TransactionJournal
+from search import INDEX_FIELDS, TrigramIndex, match_record
+from snapshot import Snapshot, SnapshotCatalog, write_snapshot
+
+INVENTORY_FILE = "inventory_data.json"
+DATABASE_FILE = "hardtrack.db"
+
+# how long a terminal waits for another one to finish its commit
+LOCK_TIMEOUT = 10.0
+RETRY_DELAY = 0.02
+
+# deletions remembered for the change feed (JSON backend)
+MAX_TOMBSTONES = 1000
+
+# commits between JSON checkpoints (JSON backend)
+WAL_CHECKPOINT_RECORDS = 500
+
+# default page size for query()
+PAGE_SIZE = 100
+
+# records the JSON backend's search index takes per hold of the store mutex
+INDEX_THREAD_CHUNK = 5000
+
+# columns matched by query(text=...)
+TEXT_COLUMNS = {
+    "inventory": INDEX_FIELDS,
+    "suppliers": ("id", "name", "contact", "email")
+}
+
+
+class StockError(Exception):
+    """A sale asked for more units than the store has left"""
+
+    def __init__(self, shortages):
+        super().__init__("Insufficient stock for: " + ", ".join(shortages))
+        # product id -> units actually available
+        self.shortages = shortages
+
+
+class ConflictError(Exception):
+    """An update_item expected values that another terminal has changed since"""
+
+    def __init__(self, current):
+        super().__init__("Changed on another terminal: " + ", ".join(current))
+        # product id -> the row as it is now (None if it was deleted)
+        self.current = current
+
+
+def updated_item(row, update):
+    """The row with an update_item's changes applied, or None if it no longer has the expected values"""
+    if row is None or any(row.get(field) != value for field, value in update["expected"].items()):
+        return None
+    item = dict(row, **update["changes"])
+    if "quantity" in update["changes"]:
+        item["status"] = stock_status(item["quantity"])
+    return item
+
+
+def sold_quantities(transaction):
+    """Units per product id in a transaction"""
+    sold = {}
+    for line in transaction["items"]:
+        sold[line["id"]] = sold.get(line["id"], 0) + line["qty"]
+    return sold
+
+
+class FileLock:
+    """Exclusive lock shared by every process using the same store.
+
+    Threads of one process queue on an in-process lock before taking the
+    file lock, so the lock can be held by one thread at a time and taken
+    before the store's mutex.
+    """
+
+    def __init__(self, path, timeout=LOCK_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self._file = None
+        self._thread_lock = threading.Lock()
+
+    def _try_lock(self):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+
+    def _unlock(self):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def acquire(self, timeout=None):
+        """Take the lock, waiting at most `timeout` seconds (default self.timeout); raises TimeoutError"""
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        if not self._thread_lock.acquire(timeout=timeout):
+            raise TimeoutError(f"Timed out waiting for {self.path}")
+        try:
+            self._file = open(self.path, 'a+')
+            while True:
+                try:
+                    self._try_lock()
+                    return self
+                except OSError:
+                    if time.monotonic() >= deadline:
+                        self._file.close()
+                        self._file = None
+                        raise TimeoutError(f"Timed out waiting for {self.path}")
+                    time.sleep(RETRY_DELAY)
+        except BaseException:
+            self._thread_lock.release()
+            raise
+
+    def release(self):
+        try:
+            self._unlock()
+        finally:
+            self._file.close()
+            self._file = None
+            self._thread_lock.release()
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def open_storage(backend=None):
+    """Open the configured storage backend (HARDTRACK_STORAGE=json|sqlite)"""
+    backend = (backend or os.environ.get("HARDTRACK_STORAGE", "json")).lower()
+    if backend == "sqlite":
+        return SqliteStorage()
+    if backend == "json":
+        return JsonStorage()
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+class Storage:
+    """Interface shared by the storage backends"""
+
+    def load(self):
+        """Return (inventory, suppliers) as Catalogs of dicts; sets self.version"""
+        raise NotImplementedError
+
+    def changes_since(self, version, timeout=None):
+        """Inventory changes committed after `version`.
+
+        Returns None when nothing changed, else (new_version, changed_rows,
+        deleted_ids). deleted_ids is None when the store can no longer tell
+        what was deleted; changed_rows is then the whole catalog. A row
+        changed only by sales may carry just id, quantity and status.
+
+        Raises TimeoutError if the store stays busy for `timeout` seconds
+        (default LOCK_TIMEOUT); a poll on the Tk thread passes 0.
+        """
+        raise NotImplementedError
+
+    def query(self, table, offset=0, limit=PAGE_SIZE, sort_key=None, descending=False, text=None, status=None):
+        """One page of "inventory" or "suppliers" records and the total that match.
+
+        Returns (rows, total). sort_key is any column of the table, or None
+        for the order records were added in; text is a
+        case-insensitive substring of the searchable columns (TEXT_COLUMNS)
+        and status an exact status. Rows are copies; ties keep store order.
+        """
+        raise NotImplementedError
+
+    def apply_changes(self, changes):
+        """Apply a batch of (op, payload) changes in one commit.
+
+        ops: save_item, delete_item, save_supplier, delete_supplier; the
+        payload is the record for saves and the id for deletes.
+
+        update_item takes {"id", "changes", "expected"}: the changed fields
+        are written only if the row still holds the `expected` values, so an
+        edit cannot undo a sale made meanwhile. Updates that no longer match
+        are skipped, the rest of the batch is committed, and ConflictError
+        then reports the current rows.
+        """
+        raise NotImplementedError
+
+    def save_item(self, item):
+        self.apply_changes([("save_item", item)])
+
+    def delete_item(self, item_id):
+        self.apply_changes([("delete_item", item_id)])
+
+    def save_supplier(self, supplier):
+        self.apply_changes([("save_supplier", supplier)])
+
+    def delete_supplier(self, supplier_id):
+        self.apply_changes([("delete_supplier", supplier_id)])
+
+    def record_sale(self, transaction):
+        """Store a transaction and take its lines out of stock.
+
+        Returns {product id: remaining quantity}; raises StockError without
+        changing anything if another terminal already sold the stock.
+        """
+        raise NotImplementedError
+
+    def sales_rollups(self):
+        """SalesRollups covering every stored transaction.
+
+        The rollups are kept in memory and on disk, and each call only adds
+        the transactions stored since the last one; sales do not update
+        them, so checkout never pays for it. The returned object is live:
+        read it, don't change it.
+        """
+        raise NotImplementedError
+
+    def _save_rollups(self):
+        with self._sales_mutex:
+            if self._sales is not None:
+                save_rollups(self.sales_path, self._sales)
+
+    def iter_transactions(self, start=None, end=None, method=None, product_id=None):
+        """Stream stored transactions, oldest first.
+
+        start/end bound the timestamp and may be prefixes ("2024-05" covers
+        the month); method and product_id keep only matching sales.
+        """
+        raise NotImplementedError
+
+    def sync(self):
+        """Force everything buffered to disk, e.g. at the end of a shift"""
+        self._save_rollups()
+
+    def close(self):
+        pass
+
+
+class JsonStorage(Storage):
+    """The original JSON file as a checkpoint, plus a write-ahead log.
+
+    Every commit is appended and fsynced to the log (inventory_data.wal)
+    under an inter-process file lock before it is applied in memory, so a
+    crash can lose at most a commit that was never acknowledged. Other
+    terminals catch up by replaying only the log records they have not
+    seen. Every WAL_CHECKPOINT_RECORDS commits the full state is written
+    back to the JSON file and the log is cut down to the records after it,
+    so recovery never replays more than one checkpoint interval.
+
+    With HARDTRACK_SNAPSHOT=1 a binary snapshot of the last checkpoint lets
+    load() skip parsing the JSON file.
+    """
+
+    def __init__(self, path=INVENTORY_FILE, journal=None, snapshot_path=None):
+        self.path = path
+        self.wal_path = os.path.splitext(path)[0] + ".wal"
+        self.journal = journal or TransactionJournal()
+        if snapshot_path is None and os.environ.get("HARDTRACK_SNAPSHOT") == "1":
+            snapshot_path = os.path.splitext(path)[0] + ".snap"
+        self.snapshot_path = snapshot_path
+        self._snapshot_stamp = None
+
+        self.lock = FileLock(path + ".lock")
+        # guards the in-memory state against the write-behind and checkpoint threads
+        self._mutex = threading.RLock()
+
+        self.inventory = Catalog()
+        self.suppliers = Catalog()
+        self.version = 0
+        # change feed: product id -> version it last changed / was deleted in
+        self.item_versions = {}
+        self.tombstones = {}
+        self.tombstone_floor = 0
+        self._rows_loaded = False
+        self._text_index = TrigramIndex(lambda: self.inventory)
+
+        # how far into the log the in-memory state has been replayed
+        self._wal_base = None
+        self._wal_offset = 0
+        self._wal_records = 0
+        self._checkpoint_thread = None
+        self._index_thread = None
+        # one checkpoint at a time; taken before the mutex, never while holding it
+        self._checkpoint_mutex = threading.Lock()
+
+        self.sales_path = os.path.splitext(path)[0] + ".rollups.json"
+        # loaded on first use by the reports; checkouts never touch them
+        self._sales = None
+        # catching up can replay the whole journal, so it has its own lock instead of the mutex
+        self._sales_mutex = threading.Lock()
+
+    def _disk_stamp(self, path=None):
+        try:
+            st = os.stat(path or self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    # -- write-ahead log -------------------------------------------------
+
+    def _read_wal_header(self):
+        """(base version, header length) of the log, or (None, 0) if there is none"""
+        try:
+            with open(self.wal_path, 'rb') as f:
+                line = f.readline()
+        except FileNotFoundError:
+            return None, 0
+        if not line.endswith(b"\n"):
+            return None, 0
+        return json.loads(line)["base"], len(line)
+
+    def _wal_records_from(self, offset):
+        """Yield (end offset, lsn, changes) for intact log records after `offset`.
+
+        Stops at the first torn or corrupt record; only a crash mid-append
+        can leave one, and it is always the last thing in the file.
+        """
+        try:
+            f = open(self.wal_path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    return
+                crc, _, body = line.rstrip(b"\n").partition(b" ")
+                try:
+                    if int(crc, 16) != zlib.crc32(body):
+                        return
+                    record = json.loads(body)
+                except ValueError:
+                    return
+                offset += len(line)
+                yield offset, record["lsn"], record["changes"]
+
+    def _write_wal(self, base, records=()):
+        """Start a new log at `base` holding `records` (lsn, changes)"""
+        tmp_path = self.wal_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(json.dumps({"base": base}).encode("utf-8") + b"\n")
+            for lsn, changes in records:
+                f.write(self._encode_record(lsn, changes))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.wal_path)
+
+    @staticmethod
+    def _encode_record(lsn, changes):
+        body = json.dumps({"lsn": lsn, "changes": changes}, separators=(",", ":")).encode("utf-8")
+        return b"%08x %s\n" % (zlib.crc32(body), body)
+
+    def _append_wal(self, lsn, changes):
+        base, _ = self._read_wal_header()
+        if base is None:
+            self._write_wal(self.version)
+            self._wal_base, self._wal_offset = self._read_wal_header()
+        with open(self.wal_path, 'r+b') as f:
+            # drops a torn record left behind by a crash
+            f.truncate(self._wal_offset)
+            f.seek(self._wal_offset)
+            f.write(self._encode_record(lsn, changes))
+            f.flush()
+            os.fsync(f.fileno())
+            self._wal_offset = f.tell()
+        self._wal_records += 1
+
+    # -- in-memory state -------------------------------------------------
+
+    def _parse_checkpoint(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, 'r') as f:
+            return json.load(f)
+
+    def _read_checkpoint(self, data=None):
+        if data is None:
+            data = self._parse_checkpoint()
+        self._install(Catalog(data.get("inventory", [])), Catalog(data.get("suppliers", [])),
+                      data.get("version", 0), data)
+
+    def _install(self, inventory, suppliers, version, feed):
+        """Replace the in-memory state with a checkpoint's (feed holds its change-feed fields)"""
+        self.inventory = inventory
+        self.suppliers = suppliers
+        self.version = version
+        self.item_versions = feed.get("item_versions", {})
+        self.tombstones = feed.get("deleted", {})
+        self.tombstone_floor = feed.get("deleted_floor", 0)
+        self._rows_loaded = True
+        self._wal_base = None
+        # substring index for query(text=...), built in the background after the first such query
+        self._text_index = TrigramIndex(lambda: self.inventory)
+
+    def _catch_up(self):
+        """Bring the in-memory state up to checkpoint + log (caller holds the lock)"""
+        base, header_len = self._read_wal_header()
+        if not self._rows_loaded or (base is not None and self.version < base):
+            self._read_checkpoint()
+        if base != self._wal_base:
+            # the log was started or cut by a checkpoint since we last read it
+            self._wal_base, self._wal_offset, self._wal_records = base, header_len, 0
+        if base is None:
+            return
+        for offset, lsn, changes in self._wal_records_from(self._wal_offset):
+            self._wal_offset = offset
+            self._wal_records += 1
+            if lsn > self.version:
+                self._apply(lsn, changes, self.inventory, self.suppliers, track=True)
+                self.version = lsn
+
+    def _apply(self, lsn, changes, inventory, suppliers, track=False):
+        """Apply one logged commit to a pair of catalogs"""
+        for op, payload in changes:
+            if op == "save_item":
+                row = dict(payload)
+                inventory.add(row)
+                if track:
+                    self._touch_item(payload["id"], lsn)
+                    self._text_index.add(row)
+            elif op == "delete_item":
+                if inventory.remove(payload) is not None and track:
+                    self._forget_item(payload, lsn)
+                    self._text_index.remove(payload)
+            elif op == "save_supplier":
+                suppliers.add(dict(payload))
+            elif op == "delete_supplier":
+                suppliers.remove(payload)
+            elif op == "sale":
+                for item_id, quantity in payload["remaining"].items():
+                    row = inventory.get(item_id)
+                    if row is not None:
+                        row["quantity"] = quantity
+                        row["status"] = stock_status(quantity)
+                        if track:
+                            self._touch_item(item_id, lsn)
+            else:
+                raise ValueError(f"Unknown change: {op}")
+
+    def _touch_item(self, item_id, lsn):
+        self.item_versions[item_id] = lsn
+        self.tombstones.pop(item_id, None)
+
+    def _forget_item(self, item_id, lsn):
+        self.item_versions.pop(item_id, None)
+        self.tombstones[item_id] = lsn
+        if len(self.tombstones) > MAX_TOMBSTONES:
+            oldest = min(self.tombstones, key=self.tombstones.get)
+            self.tombstone_floor = self.tombstones.pop(oldest)
+
+    def _commit(self, build_changes):
+        """Log and apply a commit built against the latest state.
+
+        build_changes() runs under the lock after catching up and returns the
+        list of (op, payload) changes; it may raise to abort the commit.
+        """
+        # the file lock comes first, so waiting for another terminal never holds up query()
+        with self.lock, self._mutex:
+            self._catch_up()
+            changes = build_changes()
+            if not changes:
+                return
+            lsn = self.version + 1
+            self._append_wal(lsn, changes)
+            self._apply(lsn, changes, self.inventory, self.suppliers, track=True)
+            self.version = lsn
+            for op, payload in changes:
+                if op == "sale":
+                    self.journal.append(dict(payload["transaction"], lsn=lsn))
+            if self._wal_records >= WAL_CHECKPOINT_RECORDS:
+                self._start_checkpoint()
+
+    # -- checkpoints -----------------------------------------------------
+
+    def _start_checkpoint(self):
+        if self._checkpoint_thread is not None and self._checkpoint_thread.is_alive():
+            return
+        self._checkpoint_thread = threading.Thread(target=self.checkpoint, name="checkpoint", daemon=True)
+        self._checkpoint_thread.start()
+
+    def _reconcile_journal(self):
+        """Journal any logged sale that did not make it into the journal before a crash"""
+        journaled = self.journal.last_lsn()
+        for _, lsn, changes in self._wal_records_from(self._read_wal_header()[1]):
+            if lsn <= journaled:
+                continue
+            for op, payload in changes:
+                if op == "sale":
+                    self.journal.append(dict(payload["transaction"], lsn=lsn))
+        self.journal.sync()
+
+    def _checkpoint_data(self):
+        """A detached copy of the state to write out (caller holds the mutex)"""
+        return {
+            "version": self.version,
+            "inventory": [dict(row) for row in self.inventory],
+            "suppliers": [dict(row) for row in self.suppliers],
+            "item_versions": dict(self.item_versions),
+            "deleted": dict(self.tombstones),
+            "deleted_floor": self.tombstone_floor
+        }
+
+    def _write_checkpoint_file(self, data):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        return tmp_path
+
+    def checkpoint(self):
+        """Write the full state to the JSON file and cut the log back to what follows it"""
+        with self._checkpoint_mutex:
+            with self.lock, self._mutex:
+                self._catch_up()
+                if self._wal_base is None or self._wal_records == 0:
+                    return
+                self._reconcile_journal()
+                data = self._checkpoint_data()
+            checkpoint_version = data["version"]
+
+            # the slow part runs on the copy, so commits and queries carry on meanwhile
+            tmp_path = self._write_checkpoint_file(data)
+            snapshot_path = self._write_checkpoint_snapshot(data, tmp_path)
+            del data
+
+            with self.lock, self._mutex:
+                base, header_len = self._read_wal_header()
+                if base is not None and base >= checkpoint_version:
+                    # another terminal checkpointed the same or newer state meanwhile
+                    os.remove(tmp_path)
+                    if snapshot_path is not None:
+                        os.remove(snapshot_path)
+                    return
+                stamp = self._disk_stamp(tmp_path)
+                os.replace(tmp_path, self.path)
+                tail = [(lsn, changes) for _, lsn, changes in self._wal_records_from(header_len)
+                        if lsn > checkpoint_version]
+                self._write_wal(checkpoint_version, tail)
+                if snapshot_path is not None:
+                    self._replace_snapshot(snapshot_path, stamp)
+                self._wal_base = None
+                self._catch_up()
+            self._save_rollups()
+
+    def _write_checkpoint_snapshot(self, data, checkpoint_path):
+        """Snapshot a checkpoint file not yet moved into place; returns the snapshot's temporary path"""
+        if not self.snapshot_path:
+            return None
+        # the rename into place keeps the file's mtime and size, so the stamp still matches then
+        path = self.snapshot_path + ".next"
+        feed = {name: data[name] for name in ("item_versions", "deleted", "deleted_floor")}
+        try:
+            write_snapshot(path, data["inventory"], data["suppliers"], data["version"],
+                           self._disk_stamp(checkpoint_path), feed)
+        except OSError:
+            return None
+        return path
+
+    def _replace_snapshot(self, path, stamp):
+        try:
+            os.replace(path, self.snapshot_path)
+            self._snapshot_stamp = stamp
+        except OSError:
+            # e.g. another terminal still has the old snapshot mapped on Windows
+            os.remove(path)
+
+    def _open_snapshot(self):
+        """The snapshot, if there is one and it matches the checkpoint file"""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return None
+        try:
+            snapshot = Snapshot(self.snapshot_path)
+        except (OSError, ValueError):
+            return None
+        if snapshot.source_stamp != self._disk_stamp():
+            snapshot.close()
+            return None
+        return snapshot
+
+    def _checkpoint_version(self):
+        return self.version if self._wal_base is None else self._wal_base
+
+    def _save_snapshot(self, version):
+        """Snapshot the checkpoint file (state must be at the checkpoint version)"""
+        stamp = self._disk_stamp()
+        if not self.snapshot_path or stamp is None or self.version != version:
+            return
+        # the change-feed fields let a later load() take its state from the snapshot alone
+        feed = {"item_versions": self.item_versions, "deleted": self.tombstones,
+                "deleted_floor": self.tombstone_floor}
+        try:
+            write_snapshot(self.snapshot_path, self.inventory, self.suppliers, version, stamp, feed)
+            self._snapshot_stamp = stamp
+        except OSError:
+            # e.g. another terminal still has the old snapshot mapped on Windows
+            pass
+
+    def _warm_up(self):
+        try:
+            # parse without the locks; only installing the result needs them
+            stamp = self._disk_stamp()
+            data = self._parse_checkpoint()
+            with self.lock, self._mutex:
+                # a checkpoint written meanwhile is read again by _catch_up
+                if not self._rows_loaded and self._disk_stamp() == stamp:
+                    self._read_checkpoint(data)
+                self._catch_up()
+        except Exception:
+            # the next commit will try again and report the error
+            pass
+
+    # -- Storage API -----------------------------------------------------
+
+    def load(self):
+        with self.lock, self._mutex:
+            snapshot = self._open_snapshot()
+            if snapshot is not None:
+                extras = snapshot.extras()
+                inventory, suppliers = SnapshotCatalog(snapshot), Catalog(extras.get("suppliers", []))
+                version = snapshot.version
+                # bring the caller's copy forward with the log tail
+                base, header_len = self._read_wal_header()
+                if base is None or base <= version:
+                    for _, lsn, changes in self._wal_records_from(header_len):
+                        if lsn > version:
+                            self._apply(lsn, changes, inventory, suppliers)
+                            version = lsn
+                    self._snapshot_stamp = snapshot.source_stamp
+                    if "item_versions" in extras:
+                        # our own copy comes from the same snapshot, with its own rows
+                        self._install(SnapshotCatalog(snapshot), Catalog(dict(row) for row in extras.get("suppliers", [])),
+                                      snapshot.version, extras)
+                        self._catch_up()
+                    else:
+                        # a snapshot without the change-feed fields; load our copy in the background
+                        self.version = version
+                        threading.Thread(target=self._warm_up, name="warm-up", daemon=True).start()
+                    return inventory, suppliers
+                snapshot.close()
+
+            self._catch_up()
+            if self.snapshot_path and self._disk_stamp() != self._snapshot_stamp:
+                # convert once so the next start can use the snapshot
+                self._save_snapshot(self._checkpoint_version())
+        # callers get their own rows; the store keeps its copy in sync via commits
+        return Catalog(dict(row) for row in self.inventory), Catalog(dict(row) for row in self.suppliers)
+
+    def changes_since(self, version, timeout=None):
+        self.lock.acquire(timeout)
+        try:
+            with self._mutex:
+                return self._changes_since(version)
+        finally:
+            self.lock.release()
+
+    def _changes_since(self, version):
+        base, header_len = self._read_wal_header()
+        if base is not None and version >= base:
+            if self._rows_loaded and base <= self.version:
+                # keeps our copy following other terminals for query(); only reads the new records
+                self._catch_up()
+            return self._changes_from_wal(version, header_len)
+
+        # the caller is older than the last checkpoint: use the full state
+        self._catch_up()
+        if version == self.version:
+            return None
+        if version < self.tombstone_floor:
+            return self.version, [dict(row) for row in self.inventory], None
+        changed = [dict(self.inventory.get(item_id)) for item_id, seq in self.item_versions.items()
+                   if seq > version and item_id in self.inventory]
+        deleted = [item_id for item_id, seq in self.tombstones.items() if seq > version]
+        return self.version, changed, deleted
+
+    def query(self, table, offset=0, limit=PAGE_SIZE, sort_key=None, descending=False, text=None, status=None):
+        """Reads the in-memory state under the mutex only.
+
+        It follows other terminals through commits and changes_since(). The
+        mutex is only ever taken after the file lock and held for in-memory
+        work and local file I/O, so a query never waits on another terminal.
+        """
+        if not self._rows_loaded:
+            # only until the first load has finished
+            with self.lock, self._mutex:
+                self._catch_up()
+        with self._mutex:
+            rows = self.inventory if table == "inventory" else self.suppliers
+            text = text.strip().lower() if text else None
+            if text and table == "inventory":
+                if self._text_index.ready:
+                    # the index narrows to the matching items without scanning the rest
+                    rows, text = self._text_index.search(text), None
+                else:
+                    self._start_index_build()
+
+            if text or status is not None:
+                columns = TEXT_COLUMNS[table]
+                rows = [row for row in rows if (status is None or row.get("status") == status)
+                        and (not text or match_record(row, text, columns))]
+            else:
+                rows = list(rows)
+
+        # sorting and paging work on our own list, outside the mutex
+        page, total = query_rows(rows, offset, limit, sort_key, descending)
+        with self._mutex:
+            return [dict(row) for row in page], total
+
+    def _start_index_build(self):
+        if self._index_thread is not None and self._index_thread.is_alive():
+            return
+        self._index_thread = threading.Thread(target=self._build_index, args=(self._text_index,),
+                                              name="search-index", daemon=True)
+        self._index_thread.start()
+
+    def _build_index(self, index):
+        """Build the search index a chunk at a time, letting commits in between chunks"""
+        start = 0
+        with self._mutex:
+            if index is not self._text_index:
+                return
+            index.begin_build()
+        while start is not None:
+            with self._mutex:
+                # a reload from the checkpoint file replaces the index
+                if index is not self._text_index:
+                    return
+                start = index.build_chunk(start, INDEX_THREAD_CHUNK)
+
+    def _changes_from_wal(self, version, header_len):
+        """Changes since `version`, read straight from the log tail.
+
+        Rows touched only by sales carry just id, quantity and status.
+        """
+        changed = {}
+        deleted = {}
+        latest = version
+        for _, lsn, changes in self._wal_records_from(header_len):
+            if lsn <= version:
+                continue
+            latest = lsn
+            for op, payload in changes:
+                if op == "save_item":
+                    changed[payload["id"]] = dict(payload)
+                    deleted.pop(payload["id"], None)
+                elif op == "delete_item":
+                    changed.pop(payload, None)
+                    deleted[payload] = True
+                elif op == "sale":
+                    for item_id, quantity in payload["remaining"].items():
+                        row = changed.setdefault(item_id, {"id": item_id})
+                        row["quantity"] = quantity
+                        row["status"] = stock_status(quantity)
+        if latest == version:
+            return None
+        return latest, list(changed.values()), list(deleted)
+
+    def apply_changes(self, changes):
+        changes = [[op, dict(payload) if isinstance(payload, dict) else payload] for op, payload in changes]
+        conflicts = {}
+
+        def build_changes():
+            conflicts.clear()
+            resolved = []
+            for op, payload in changes:
+                if op == "update_item":
+                    row = self.inventory.get(payload["id"])
+                    item = updated_item(row, payload)
+                    if item is None:
+                        conflicts[payload["id"]] = dict(row) if row else None
+                        continue
+                    # the log only ever holds whole rows
+                    op, payload = "save_item", item
+                resolved.append([op, payload])
+            return resolved
+
+        self._commit(build_changes)
+        if conflicts:
+            raise ConflictError(conflicts)
+
+    def record_sale(self, transaction):
+        sold = sold_quantities(transaction)
+        remaining = {}
+
+        def build_changes():
+            shortages = {}
+            for item_id, qty in sold.items():
+                row = self.inventory.get(item_id)
+                available = row["quantity"] if row else 0
+                if available < qty:
+                    shortages[item_id] = available
+                else:
+                    remaining[item_id] = available - qty
+            if shortages:
+                raise StockError(shortages)
+            return [["sale", {"transaction": transaction, "remaining": remaining}]]
+
+        self._commit(build_changes)
+        return remaining
+
+    def sales_rollups(self):
+        with self._sales_mutex:
+            if self._sales is None:
+                self._sales = load_rollups(self.sales_path)
+            if self.journal.size() < self._sales.position:
+                # the journal was replaced; rebuild from its start
+                self._sales = SalesRollups()
+            sales = self._sales
+            for offset, record in self.journal.iter_from(sales.position):
+                if record is not None:
+                    sales.add(record)
+                sales.position = offset
+            return sales
+
+    def iter_transactions(self, start=None, end=None, method=None, product_id=None):
+        return self.journal.iter_records(start, end, method, product_id)
+
+    def sync(self):
+        with self._mutex:
+            self.journal.sync()
+        self._save_rollups()
+
+    def close(self):
+        if self._checkpoint_thread is not None:
+            self._checkpoint_thread.join()
+        self.checkpoint()
+        if self.snapshot_path and self._disk_stamp() != self._snapshot_stamp:
+            with self.lock, self._mutex:
+                self._catch_up()
+                self._save_snapshot(self._checkpoint_version())
+        self._save_rollups()
+        self.journal.close()
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', '0');
+
+CREATE TABLE IF NOT EXISTS inventory (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    category TEXT,
+    quantity INTEGER NOT NULL DEFAULT 0,
+    price REAL NOT NULL DEFAULT 0,
+    status TEXT,
+    seq INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_inventory_status ON inventory(status);
+CREATE INDEX IF NOT EXISTS idx_inventory_category ON inventory(category);
+
+CREATE TABLE IF NOT EXISTS deleted_items (
+    id TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS suppliers (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    contact TEXT,
+    email TEXT,
+    status TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_suppliers_status ON suppliers(status);
+
+CREATE TABLE IF NOT EXISTS transactions (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    subtotal REAL,
+    tax REAL,
+    total REAL,
+    method TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_id ON transactions(id);
+CREATE INDEX IF NOT EXISTS idx_transactions_timestamp ON transactions(timestamp);
+
+CREATE TABLE IF NOT EXISTS transaction_lines (
+    transaction_rowid INTEGER NOT NULL REFERENCES transactions(rowid),
+    product_id TEXT NOT NULL,
+    name TEXT,
+    price REAL,
+    qty INTEGER,
+    max_qty INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_lines_transaction ON transaction_lines(transaction_rowid);
+CREATE INDEX IF NOT EXISTS idx_lines_product ON transaction_lines(product_id);
+"""
+
+ITEM_COLUMNS = ("id", "name", "category", "quantity", "price", "status")
+SUPPLIER_COLUMNS = ("id", "name", "contact", "email", "status")
+
+
+class SqliteStorage(Storage):
+    """Row-level storage in a SQLite database"""
+
+    def __init__(self, path=DATABASE_FILE, import_from=INVENTORY_FILE, journal_path="transactions.jsonl"):
+        self.path = path
+        # autocommit mode; _commit() opens explicit write transactions
+        self.conn = sqlite3.connect(path, timeout=LOCK_TIMEOUT, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        # SQLite's own write-ahead log; FULL syncs it on every commit
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=FULL")
+        # the connection is shared with the write-behind thread
+        self._mutex = threading.RLock()
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        self.version = self._read_version()
+        self._next_version = None
+        self._import_legacy(import_from, journal_path)
+
+        self.sales_path = os.path.splitext(path)[0] + ".rollups.json"
+        self._sales = None
+        self._sales_mutex = threading.Lock()
+
+    def _migrate(self):
+        """Bring databases created by older versions up to the current schema"""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(inventory)")}
+        if "seq" not in columns:
+            self.conn.execute("ALTER TABLE inventory ADD COLUMN seq INTEGER NOT NULL DEFAULT 0")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_inventory_seq ON inventory(seq)")
+        self._fts = self._create_text_index()
+
+    def _create_text_index(self):
+        """Trigram full-text index over the searchable item fields, rowids matching inventory.
+
+        Returns False when this SQLite build has no FTS5 trigram tokenizer
+        (before 3.34); query() then falls back to scanning with LIKE.
+        """
+        exists = "SELECT 1 FROM sqlite_master WHERE name = 'inventory_fts'"
+        if self.conn.execute(exists).fetchone():
+            return True
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            # another terminal may have built it while we waited for the lock
+            if not self.conn.execute(exists).fetchone():
+                self.conn.execute(f"CREATE VIRTUAL TABLE inventory_fts USING fts5({', '.join(INDEX_FIELDS)}, "
+                                  "tokenize='trigram')")
+                self.conn.execute(f"INSERT INTO inventory_fts (rowid, {', '.join(INDEX_FIELDS)}) "
+                                  f"SELECT rowid, {', '.join(INDEX_FIELDS)} FROM inventory")
+            self.conn.execute("COMMIT")
+        except sqlite3.OperationalError:
+            self.conn.execute("ROLLBACK")
+            return False
+        return True
+
+    def _read_version(self):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return int(row[0]) if row else 0
+
+    @contextmanager
+    def _commit(self):
+        """Run a write transaction, retrying while another terminal holds the lock"""
+        with self._mutex:
+            deadline = time.monotonic() + LOCK_TIMEOUT
+            while True:
+                try:
+                    self.conn.execute("BEGIN IMMEDIATE")
+                    break
+                except sqlite3.OperationalError as e:
+                    if time.monotonic() >= deadline:
+                        # the same error the JSON store raises, so callers handle one kind of busy
+                        raise TimeoutError(f"Timed out waiting for {self.path}") from e
+                    time.sleep(RETRY_DELAY)
+            try:
+                self._next_version = self._read_version() + 1
+                yield
+                self.conn.execute("UPDATE meta SET value = ? WHERE key = 'version'", (str(self._next_version),))
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.version = self._next_version
+
+    def _import_legacy(self, inventory_path, journal_path):
+        """Seed a fresh database from the JSON files (runs once)"""
+        if self.conn.execute("SELECT 1 FROM meta WHERE key = 'imported'").fetchone():
+            return
+
+        with self._commit():
+            # another terminal may have imported while we waited for the lock
+            if self.conn.execute("SELECT 1 FROM meta WHERE key = 'imported'").fetchone():
+                return
+            if os.path.exists(inventory_path):
+                # goes through the JSON store so commits still in its log are included
+                legacy = JsonStorage(inventory_path, journal=TransactionJournal(journal_path))
+                inventory, suppliers = legacy.load()
+                legacy.close()
+                for item in inventory:
+                    self._save_item_row(item)
+                for supplier in suppliers:
+                    self._upsert_row("suppliers", SUPPLIER_COLUMNS, supplier)
+
+            if os.path.exists(journal_path):
+                for transaction in TransactionJournal(journal_path).iter_records():
+                    self._insert_transaction(transaction)
+
+            self.conn.execute("INSERT INTO meta (key, value) VALUES ('imported', '1')")
+
+    def _upsert_row(self, table, columns, record):
+        placeholders = ", ".join("?" for _ in columns)
+        updates = ", ".join(f"{col} = excluded.{col}" for col in columns[1:])
+        self.conn.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) "
+            f"ON CONFLICT(id) DO UPDATE SET {updates}",
+            [record.get(col) for col in columns]
+        )
+
+    def _save_item_row(self, item):
+        self._upsert_row("inventory", ITEM_COLUMNS + ("seq",), dict(item, seq=self._next_version))
+        self.conn.execute("DELETE FROM deleted_items WHERE id = ?", (item["id"],))
+        if self._fts:
+            rowid = self.conn.execute("SELECT rowid FROM inventory WHERE id = ?", (item["id"],)).fetchone()[0]
+            self.conn.execute("DELETE FROM inventory_fts WHERE rowid = ?", (rowid,))
+            self.conn.execute(f"INSERT INTO inventory_fts (rowid, {', '.join(INDEX_FIELDS)}) "
+                              f"VALUES (?{', ?' * len(INDEX_FIELDS)})", [rowid] + [item.get(f) for f in INDEX_FIELDS])
+
+    def _read_item_row(self, item_id):
+        row = self.conn.execute(f"SELECT {', '.join(ITEM_COLUMNS)} FROM inventory WHERE id = ?",
+                                (item_id,)).fetchone()
+        return dict(row) if row else None
+
+    def _delete_item_row(self, item_id):
+        if self._fts:
+            self.conn.execute("DELETE FROM inventory_fts WHERE rowid = (SELECT rowid FROM inventory WHERE id = ?)",
+                              (item_id,))
+        if self.conn.execute("DELETE FROM inventory WHERE id = ?", (item_id,)).rowcount:
+            self.conn.execute("INSERT OR REPLACE INTO deleted_items (id, seq) VALUES (?, ?)",
+                              (item_id, self._next_version))
+
+    def _insert_transaction(self, transaction):
+        cur = self.conn.execute(
+            "INSERT INTO transactions (id, timestamp, subtotal, tax, total, method) VALUES (?, ?, ?, ?, ?, ?)",
+            (transaction["id"], transaction["timestamp"], transaction.get("subtotal"),
+             transaction.get("tax"), transaction.get("total"), transaction.get("method"))
+        )
+        self.conn.executemany(
+            "INSERT INTO transaction_lines (transaction_rowid, product_id, name, price, qty, max_qty) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(cur.lastrowid, line["id"], line.get("name"), line.get("price"), line.get("qty"), line.get("max_qty"))
+             for line in transaction.get("items", [])]
+        )
+
+    def load(self):
+        with self._mutex:
+            # one read transaction so the rows match the version
+            self.conn.execute("BEGIN")
+            try:
+                self.version = self._read_version()
+                inventory = Catalog(dict(row) for row in self.conn.execute(
+                    f"SELECT {', '.join(ITEM_COLUMNS)} FROM inventory ORDER BY rowid"))
+                suppliers = Catalog(dict(row) for row in self.conn.execute(
+                    f"SELECT {', '.join(SUPPLIER_COLUMNS)} FROM suppliers ORDER BY rowid"))
+            finally:
+                self.conn.execute("COMMIT")
+        return inventory, suppliers
+
+    def changes_since(self, version, timeout=None):
+        if not self._mutex.acquire(timeout=LOCK_TIMEOUT if timeout is None else timeout):
+            raise TimeoutError("The store is busy")
+        try:
+            return self._changes_since(version)
+        finally:
+            self._mutex.release()
+
+    def _changes_since(self, version):
+        if self._read_version() == version:
+            return None
+        self.conn.execute("BEGIN")
+        try:
+            current = self._read_version()
+            changed = [dict(row) for row in self.conn.execute(
+                f"SELECT {', '.join(ITEM_COLUMNS)} FROM inventory WHERE seq > ? ORDER BY rowid", (version,))]
+            deleted = [row[0] for row in self.conn.execute(
+                "SELECT id FROM deleted_items WHERE seq > ?", (version,))]
+        finally:
+            self.conn.execute("COMMIT")
+        return current, changed, deleted
+
+    def apply_changes(self, changes):
+        conflicts = {}
+        with self._commit():
+            for op, payload in changes:
+                if op == "save_item":
+                    self._save_item_row(payload)
+                elif op == "update_item":
+                    row = self._read_item_row(payload["id"])
+                    item = updated_item(row, payload)
+                    if item is None:
+                        conflicts[payload["id"]] = row
+                    else:
+                        self._save_item_row(item)
+                elif op == "delete_item":
+                    self._delete_item_row(payload)
+                elif op == "save_supplier":
+                    self._upsert_row("suppliers", SUPPLIER_COLUMNS, payload)
+                elif op == "delete_supplier":
+                    self.conn.execute("DELETE FROM suppliers WHERE id = ?", (payload,))
+                else:
+                    raise ValueError(f"Unknown change: {op}")
+        if conflicts:
+            raise ConflictError(conflicts)
+
+    def record_sale(self, transaction):
+        sold = sold_quantities(transaction)
+        with self._commit():
+            shortages = {}
+            remaining = {}
+            for item_id, qty in sold.items():
+                cur = self.conn.execute(
+                    "UPDATE inventory SET quantity = quantity - ?, seq = ? WHERE id = ? AND quantity >= ?",
+                    (qty, self._next_version, item_id, qty)
+                )
+                row = self.conn.execute("SELECT quantity FROM inventory WHERE id = ?", (item_id,)).fetchone()
+                if cur.rowcount == 0:
+                    shortages[item_id] = row[0] if row else 0
+                else:
+                    remaining[item_id] = row[0]
+            if shortages:
+                # rolls the whole sale back
+                raise StockError(shortages)
+
+            self.conn.executemany(
+                "UPDATE inventory SET status = ? WHERE id = ?",
+                [(stock_status(qty), item_id) for item_id, qty in remaining.items()]
+            )
+            self._insert_transaction(transaction)
+        return remaining
+
+    def sales_rollups(self):
+        with self._sales_mutex:
+            if self._sales is None:
+                self._sales = load_rollups(self.sales_path)
+            sales = self._sales
+            # a private read connection, so catching up never holds the shared one
+            conn = sqlite3.connect(self.path, timeout=LOCK_TIMEOUT)
+            conn.row_factory = sqlite3.Row
+            try:
+                for rowid, transaction in self._read_transactions(conn, "WHERE rowid > ?", [sales.position]):
+                    sales.add(transaction)
+                    sales.position = rowid
+            finally:
+                conn.close()
+            return sales
+
+    def query(self, table, offset=0, limit=PAGE_SIZE, sort_key=None, descending=False, text=None, status=None):
+        columns = ITEM_COLUMNS if table == "inventory" else SUPPLIER_COLUMNS
+        if sort_key is not None and sort_key not in columns:
+            raise ValueError(f"Unknown sort key: {sort_key}")
+
+        where, params = [], []
+        text = text.strip().lower() if text else None
+        if text and table == "inventory" and self._fts and len(text) >= 3:
+            # the trigram index answers substring queries without reading every row
+            where.append("rowid IN (SELECT rowid FROM inventory_fts WHERE inventory_fts MATCH ?)")
+            params.append('"' + text.replace('"', '""') + '"')
+        elif text:
+            pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            where.append("(" + " OR ".join(f"lower({col}) LIKE ? ESCAPE '\\'" for col in TEXT_COLUMNS[table]) + ")")
+            params += [pattern] * len(TEXT_COLUMNS[table])
+        if status is not None:
+            where.append("status = ?")
+            params.append(status)
+        condition = (" WHERE " + " AND ".join(where)) if where else ""
+
+        order = "rowid DESC" if descending else "rowid"
+        if sort_key is not None:
+            direction = "DESC" if descending else "ASC"
+            collate = "" if sort_key in ("quantity", "price") else " COLLATE NOCASE"
+            order = f"{sort_key}{collate} {direction}, rowid"
+
+        with self._mutex:
+            total = self.conn.execute(f"SELECT COUNT(*) FROM {table}{condition}", params).fetchone()[0]
+            cur = self.conn.execute(
+                f"SELECT {', '.join(columns)} FROM {table}{condition} ORDER BY {order} LIMIT ? OFFSET ?",
+                params + [-1 if limit is None else limit, offset])
+            return [dict(row) for row in cur], total
+
+    def iter_transactions(self, start=None, end=None, method=None, product_id=None):
+        where, params = [], []
+        if start is not None:
+            where.append("timestamp >= ?")
+            params.append(start)
+        if end is not None:
+            # end is inclusive of its prefix, as in the JSON journal
+            where.append("timestamp <= ?")
+            params.append(end + "\uffff")
+        if method is not None:
+            where.append("method = ?")
+            params.append(method)
+        if product_id is not None:
+            where.append("rowid IN (SELECT transaction_rowid FROM transaction_lines WHERE product_id = ?)")
+            params.append(product_id)
+        condition = ("WHERE " + " AND ".join(where)) if where else ""
+
+        # a private read connection, so a long report never holds the shared one
+        conn = sqlite3.connect(self.path, timeout=LOCK_TIMEOUT)
+        conn.row_factory = sqlite3.Row
+        try:
+            for _, transaction in self._read_transactions(conn, condition, params):
+                yield transaction
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _read_transactions(conn, condition, params):
+        """(rowid, transaction) pairs in rowid order, with their lines"""
+        cur = conn.execute(
+            f"SELECT rowid, id, timestamp, subtotal, tax, total, method FROM transactions {condition} ORDER BY rowid",
+            params)
+        for row in cur:
+            transaction = dict(row)
+            rowid = transaction.pop("rowid")
+            transaction["items"] = [
+                {"id": line["product_id"], "name": line["name"], "price": line["price"],
+                 "qty": line["qty"], "max_qty": line["max_qty"]}
+                for line in conn.execute(
+                    "SELECT product_id, name, price, qty, max_qty FROM transaction_lines "
+                    "WHERE transaction_rowid = ?", (rowid,))
+            ]
+            yield rowid, transaction
+
+    def close(self):
+        self._save_rollups()
+        with self._mutex:
+            self.conn.close()
@@ -0,0 +1,280 @@
+import math
+from collections.abc import Sequence
+
+import customtkinter as ctk
+
+# height of one row slot, including the gap between rows
+ROW_HEIGHT = 52
+CARD_HEIGHT = 86
+
+# rows scrolled per mouse wheel notch
+WHEEL_ROWS = 3
+
+# records per page in a Pager
+PAGE_SIZE = 100
+
+
+class VirtualList(ctk.CTkFrame):
+    """Scrollable list that only builds widgets for the rows on screen.
+
+    A fixed pool of row widgets, sized to the viewport, is rebound to
+    whichever records are visible as the list scrolls, so the widget count
+    does not grow with the data. Subclasses build a row in create_row()
+    and show a record in it with bind_row().
+    """
+
+    def __init__(self, parent, row_height, **kwargs):
+        kwargs.setdefault("fg_color", "#1a1a1a")
+        kwargs.setdefault("corner_radius", 10)
+        super().__init__(parent, **kwargs)
+        self.row_height = row_height
+
+        self.data = []
+        self.first = 0
+        self.rows = []
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y", padx=(0, 5), pady=5)
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.pack(side="left", fill="both", expand=True, padx=5, pady=5)
+        self.body.bind("<Configure>", self.on_resize)
+        self.bind_wheel(self.body)
+
+    def set_data(self, data):
+        """Show a new sequence of records, keeping the scroll position if possible.
+
+        A list or other sequence is indexed as given, so only the rows on
+        screen are ever read from it; other iterables are copied to a list.
+        """
+        self.data = data if isinstance(data, Sequence) else list(data)
+        self.scroll_to(self.first)
+
+    def refresh(self):
+        """Rebind the visible rows after records were changed in place"""
+        self.render()
+
+    def visible_rows(self):
+        return max(1, math.ceil(self.body.winfo_height() / self.row_height))
+
+    def scroll_to(self, first):
+        last_first = max(0, len(self.data) - self.visible_rows() + 1)
+        self.first = max(0, min(int(first), last_first))
+        self.render()
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(float(amount) * len(self.data))
+        elif action == "scroll":
+            step = self.visible_rows() if unit == "pages" else 1
+            self.scroll_to(self.first + int(amount) * step)
+
+    def on_wheel(self, event):
+        if event.num == 4:
+            direction = -1
+        elif event.num == 5:
+            direction = 1
+        else:
+            direction = -1 if event.delta > 0 else 1
+        self.scroll_to(self.first + direction * WHEEL_ROWS)
+
+    def bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self.on_wheel)
+        widget.bind("<Button-4>", self.on_wheel)
+        widget.bind("<Button-5>", self.on_wheel)
+
+    def on_resize(self, event):
+        # grow or shrink the pool to fit the viewport
+        needed = self.visible_rows()
+        while len(self.rows) < needed:
+            frame = ctk.CTkFrame(self.body, fg_color="#252525", corner_radius=8)
+            row = {"frame": frame, "record": None, "values": None, "placed": False}
+            self.create_row(row)
+            for widget in [frame] + list(row.get("widgets", ())):
+                self.bind_wheel(widget)
+            self.rows.append(row)
+        while len(self.rows) > needed:
+            self.rows.pop()["frame"].destroy()
+        self.scroll_to(self.first)
+
+    def create_row(self, row):
+        """Add widgets to row["frame"]; list them in row["widgets"] for wheel scrolling"""
+        raise NotImplementedError
+
+    def row_values(self, record):
+        """What the row shows for a record; rows are only rebound when this changes"""
+        raise NotImplementedError
+
+    def bind_row(self, row, values):
+        raise NotImplementedError
+
+    def render(self):
+        for slot, row in enumerate(self.rows):
+            index = self.first + slot
+            if index >= len(self.data):
+                if row["placed"]:
+                    row["frame"].place_forget()
+                    row["placed"] = False
+                row["record"] = None
+                continue
+
+            record = self.data[index]
+            values = self.row_values(record)
+            if row["values"] != values:
+                self.bind_row(row, values)
+                row["values"] = values
+            if not row["placed"]:
+                row["frame"].place(x=0, y=slot * self.row_height, relwidth=1, height=self.row_height - 10)
+                row["placed"] = True
+            row["record"] = record
+
+        total = len(self.data)
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + len(self.rows)) / total))
+        else:
+            self.scrollbar.set(0, 1)
+
+
+class VirtualTable(VirtualList):
+    """Table rows: one label per column plus optional action buttons.
+
+    widths holds one label width per column and row_values(record) returns
+    one (text, color) pair per column. Each action is (text, fg_color,
+    hover_color, callback) and gets a button on every row; the callback
+    receives that row's record.
+    """
+
+    def __init__(self, parent, widths, row_values, actions=(), **kwargs):
+        self.widths = widths
+        self.row_values = row_values
+        self.actions = actions
+        super().__init__(parent, ROW_HEIGHT, **kwargs)
+
+    def create_row(self, row):
+        frame = row["frame"]
+        frame.configure(corner_radius=5)
+        row["labels"] = []
+        for width in self.widths:
+            label = ctk.CTkLabel(frame, text="", font=("Arial", 11), text_color="#ffffff", width=width)
+            label.pack(side="left", padx=10, pady=12)
+            row["labels"].append(label)
+
+        row["widgets"] = list(row["labels"])
+        for text, fg_color, hover_color, callback in self.actions:
+            button = ctk.CTkButton(
+                frame,
+                text=text,
+                font=("Arial", 10),
+                width=40,
+                height=25,
+                fg_color=fg_color,
+                hover_color=hover_color,
+                command=lambda r=row, cb=callback: r["record"] is not None and cb(r["record"])
+            )
+            button.pack(side="left", padx=5, pady=12)
+            row["widgets"].append(button)
+
+    def bind_row(self, row, values):
+        for label, (text, color) in zip(row["labels"], values):
+            label.configure(text=text, text_color=color)
+
+
+class VirtualCards(VirtualList):
+    """Card rows: a bold title, a grey details line and one button.
+
+    title(record) and details(record) give the two lines of text;
+    on_click(record) runs when the card's button is pressed.
+    """
+
+    def __init__(self, parent, title, details, button_text, on_click, **kwargs):
+        self.title = title
+        self.details = details
+        self.button_text = button_text
+        self.on_click = on_click
+        super().__init__(parent, CARD_HEIGHT, **kwargs)
+
+    def create_row(self, row):
+        frame = row["frame"]
+        info_frame = ctk.CTkFrame(frame, fg_color="transparent")
+        info_frame.pack(side="left", fill="both", expand=True, padx=15, pady=12)
+
+        row["title"] = ctk.CTkLabel(info_frame, text="", font=("Arial", 13, "bold"), text_color="#ffffff")
+        row["title"].pack(anchor="w", pady=(0, 5))
+        row["details"] = ctk.CTkLabel(info_frame, text="", font=("Arial", 11), text_color="#808080")
+        row["details"].pack(anchor="w")
+
+        button = ctk.CTkButton(
+            frame,
+            text=self.button_text,
+            font=("Arial", 12, "bold"),
+            width=80,
+            height=35,
+            fg_color="#00a8ff",
+            hover_color="#0088cc",
+            command=lambda: row["record"] is not None and self.on_click(row["record"])
+        )
+        button.pack(side="right", padx=15, pady=12)
+        row["widgets"] = [info_frame, row["title"], row["details"], button]
+
+    def row_values(self, record):
+        return self.title(record), self.details(record)
+
+    def bind_row(self, row, values):
+        row["title"].configure(text=values[0])
+        row["details"].configure(text=values[1])
+
+
+class Pager(ctk.CTkFrame):
+    """Previous/next and sort controls that load one page at a time into a table.
+
+    fetch(offset, limit, sort_key, descending) returns (rows, total), e.g.
+    Storage.query; sort_keys maps menu labels to record fields.
+    """
+
+    def __init__(self, parent, table, fetch, sort_keys, page_size=PAGE_SIZE, **kwargs):
+        kwargs.setdefault("fg_color", "transparent")
+        super().__init__(parent, **kwargs)
+        self.table = table
+        self.fetch = fetch
+        self.sort_keys = sort_keys
+        self.page_size = page_size
+        self.page = 0
+        self.total = 0
+
+        self.prev_btn = ctk.CTkButton(self, text="◀ Prev", width=80, font=("Arial", 11),
+                                      command=lambda: self.load(self.page - 1))
+        self.prev_btn.pack(side="left", padx=(0, 5))
+        self.page_label = ctk.CTkLabel(self, text="", font=("Arial", 11), text_color="#808080")
+        self.page_label.pack(side="left", padx=10)
+        self.next_btn = ctk.CTkButton(self, text="Next ▶", width=80, font=("Arial", 11),
+                                      command=lambda: self.load(self.page + 1))
+        self.next_btn.pack(side="left", padx=5)
+
+        self.order_menu = ctk.CTkOptionMenu(self, values=["Ascending", "Descending"], width=120,
+                                            font=("Arial", 11), command=lambda _: self.load(0))
+        self.order_menu.pack(side="right", padx=5)
+        self.sort_menu = ctk.CTkOptionMenu(self, values=list(sort_keys), width=140,
+                                           font=("Arial", 11), command=lambda _: self.load(0))
+        self.sort_menu.pack(side="right", padx=5)
+        sort_label = ctk.CTkLabel(self, text="Sort by:", font=("Arial", 11), text_color="#ffffff")
+        sort_label.pack(side="right", padx=5)
+
+    def load(self, page=None):
+        """Fetch and show a page (the current one by default)"""
+        if page is not None:
+            self.page = page
+        rows, self.total = self.fetch(self.page * self.page_size, self.page_size,
+                                      self.sort_keys[self.sort_menu.get()],
+                                      self.order_menu.get() == "Descending")
+        pages = max(1, math.ceil(self.total / self.page_size))
+        if self.page >= pages:
+            # the last page emptied out (e.g. after a delete or a narrower search)
+            self.load(pages - 1)
+            return
+
+        self.table.set_data(rows)
+        if page is not None:
+            # a different page (or order) starts at the top; a reload keeps the scroll position
+            self.table.scroll_to(0)
+        self.page_label.configure(text=f"Page {self.page + 1} of {pages}  ({self.total} records)")
+        self.prev_btn.configure(state="normal" if self.page > 0 else "disabled")
+        self.next_btn.configure(state="normal" if self.page + 1 < pages else "disabled")
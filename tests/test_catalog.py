@@ -0,0 +1,64 @@
+from catalog import Catalog, StockStats, query_rows, stock_status
+
+ROWS = [{"id": f"P{i}", "name": name, "price": price}
+        for i, (name, price) in enumerate([("bolt", 5), ("Anchor", 20), ("cable", 5), ("Drill", 1)])]
+
+
+def test_query_rows_pages_and_counts():
+    page, total = query_rows(ROWS, offset=1, limit=2)
+    assert [row["id"] for row in page] == ["P1", "P2"]
+    assert total == 4
+
+
+def test_query_rows_sorts_text_case_insensitively_and_keeps_ties_in_order():
+    page, _ = query_rows(ROWS, sort_key="name")
+    assert [row["name"] for row in page] == ["Anchor", "bolt", "cable", "Drill"]
+    page, _ = query_rows(ROWS, sort_key="price")
+    assert [row["id"] for row in page] == ["P3", "P0", "P2", "P1"]
+
+
+def test_query_rows_descending_without_sort_key_reverses_store_order():
+    page, _ = query_rows(ROWS, limit=2, descending=True)
+    assert [row["id"] for row in page] == ["P3", "P2"]
+
+
+def test_query_rows_predicate_total_counts_matches_only():
+    page, total = query_rows(ROWS, limit=1, predicate=lambda row: row["price"] == 5)
+    assert [row["id"] for row in page] == ["P0"]
+    assert total == 2
+
+
+def test_catalog_keeps_insertion_order_and_replaces_by_id():
+    catalog = Catalog(ROWS)
+    catalog.add({"id": "P1", "name": "Anchor bolt"})
+    assert [row["id"] for row in catalog] == ["P0", "P1", "P2", "P3"]
+    assert catalog.get("P1")["name"] == "Anchor bolt"
+    catalog.remove("P0")
+    assert "P0" not in catalog and len(catalog) == 3
+
+
+def test_stock_stats_follows_updates_and_deletes():
+    items = [{"id": "A", "quantity": 4, "price": 2.5, "category": "Tools", "status": stock_status(4)},
+             {"id": "B", "quantity": 0, "price": 9.0, "category": "Parts", "status": stock_status(0)}]
+    stats = StockStats(items)
+    assert (len(stats), stats.units, stats.value) == (2, 4, 10.0)
+    stats.update({"id": "A", "quantity": 20, "price": 2.5, "category": "Parts", "status": stock_status(20)})
+    stats.discard("B")
+    assert (len(stats), stats.units, stats.value) == (1, 20, 50.0)
+    assert stats.counts["In Stock"] == 1 and stats.counts["Out of Stock"] == 0
+    assert stats.categories == {"Parts": [1, 50.0]}
+
+
+def test_stock_stats_from_columns_matches_rows():
+    items = [{"id": f"P{i}", "quantity": i % 7, "price": 1.5 * i, "category": ("Tools", "Parts")[i % 2],
+              "status": stock_status(i % 7)} for i in range(50)]
+    items.append({"id": "bad", "quantity": "n/a", "price": None, "category": "Parts", "status": None})
+    fields = ("id", "status", "quantity", "price", "category")
+    columns = [[item[field] for item in items] for field in fields]
+
+    stats, expected = StockStats.from_columns(*columns), StockStats(items)
+    assert (len(stats), stats.units, stats.value) == (len(expected), expected.units, expected.value)
+    assert stats.counts == expected.counts and stats.categories == expected.categories
+    stats.discard("P3")
+    expected.discard("P3")
+    assert (stats.units, stats.value, stats.categories) == (expected.units, expected.value, expected.categories)
@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from catalog import StockStats
+
+np = pytest.importorskip("numpy")
+from columns import ColumnarStats  # noqa: E402
+
+
+def totals(stats):
+    return (len(stats), round(stats.units, 6), round(stats.value, 6),
+            {name: count for name, count in stats.counts.items() if count},
+            {name: [count, round(value, 6)] for name, (count, value) in stats.categories.items()})
+
+
+def test_matches_running_totals_through_edits_and_deletes():
+    rng = random.Random(5)
+
+    def make(i):
+        return {"id": str(i), "quantity": rng.choice([0, 3, 12, 2.5, 7.25]), "price": rng.choice([1.5, 10, 0.99]),
+                "category": rng.choice("ABC"), "status": rng.choice(["In Stock", "Low Stock", "Out of Stock"])}
+
+    rows = [make(i) for i in range(60)]
+    columnar, running = ColumnarStats(rows), StockStats(rows)
+    assert totals(columnar) == totals(running)
+    for _ in range(300):
+        if rng.random() < 0.3:
+            item_id = str(rng.randrange(90))
+            columnar.discard(item_id)
+            running.discard(item_id)
+        else:
+            row = make(rng.randrange(90))
+            columnar.update(row)
+            running.update(row)
+        assert totals(columnar) == totals(running)
+
+
+def test_fractional_quantities_are_not_truncated():
+    stats = ColumnarStats([{"id": "A", "quantity": 2.5, "price": 4.0, "status": "Low Stock"}])
+    assert stats.units == 2.5 and stats.value == 10.0
+    stats.update({"id": "B", "quantity": 0.5, "price": 2.0, "status": "Low Stock"})
+    assert stats.units == 3 and stats.value == 11.0
+
+
+def test_copy_is_detached():
+    stats = ColumnarStats([{"id": "A", "quantity": 1, "price": 1.0, "status": "Low Stock"}])
+    copy = stats.copy()
+    stats.update({"id": "A", "quantity": 5, "price": 1.0, "status": "Low Stock"})
+    assert copy.units == 1 and stats.units == 5
@@ -0,0 +1,46 @@
+import csv
+import json
+import os
+
+import export
+from export import ExportJob
+
+
+def run(job):
+    job.start()._thread.join(timeout=10)
+    assert job.done
+    return job
+
+
+def test_transactions_csv_has_one_row_per_line(tmp_path):
+    transactions = [{"id": "T1", "timestamp": "2024-01-01 10:00:00", "method": "Cash", "subtotal": 1,
+                     "tax": 0.12, "total": 1.12,
+                     "items": [{"id": "P1", "name": "a,b", "price": 1.0, "qty": 1},
+                               {"id": "P2", "name": "ñ", "price": 0.5, "qty": 2}]}]
+    path = str(tmp_path / "out.csv")
+    job = run(ExportJob("Transactions", iter(transactions), path, "CSV"))
+    assert job.error is None and job.written == 1
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0][0] == "transaction_id"
+    assert [row[6:8] for row in rows[1:]] == [["P1", "a,b"], ["P2", "ñ"]]
+
+
+def test_jsonl_round_trips_in_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_CHUNK_ROWS", 7)
+    items = [{"id": f"P{i}", "name": "n", "quantity": i} for i in range(50)]
+    path = str(tmp_path / "out.jsonl")
+    job = run(ExportJob("Inventory", items, path, "JSONL", total=len(items)))
+    assert job.written == 50
+    with open(path, encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == items
+
+
+def test_cancelled_export_leaves_no_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_CHUNK_ROWS", 10)
+    path = str(tmp_path / "out.csv")
+    job = ExportJob("Inventory", [{"id": str(i)} for i in range(100)], path, "CSV")
+    job.cancel()
+    run(job)
+    assert job.cancelled and not os.path.exists(path)
+    assert os.listdir(tmp_path) == []
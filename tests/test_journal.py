@@ -0,0 +1,40 @@
+import journal
+from journal import TransactionJournal
+
+
+def make_journal(tmp_path, count):
+    log = TransactionJournal(str(tmp_path / "transactions.jsonl"), str(tmp_path / "transactions.json"))
+    for i in range(count):
+        log.append({"id": str(i), "timestamp": f"2024-{1 + i // 40:02d}-{1 + i % 28:02d} 10:00:00",
+                    "method": "Cash" if i % 3 else "Card",
+                    "items": [{"id": f"P{i % 5}", "qty": 1, "price": 2.0}], "total": 2.0})
+    log.close()
+    return log
+
+
+def test_indexed_range_queries_match_a_full_scan(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal, "INDEX_BLOCK", 8)
+    log = make_journal(tmp_path, 200)
+    everything = list(log.iter_records())
+    assert len(everything) == 200
+
+    for start, end, method, product_id in [("2024-02", "2024-03", None, None),
+                                           ("2024-03-05", None, "Card", None),
+                                           (None, "2024-01-10", None, "P3"),
+                                           ("2025", None, None, None)]:
+        expected = [record for record in everything
+                    if TransactionJournal._matches(record, start, None if end is None else end + "\uffff",
+                                                   method, product_id)]
+        assert list(log.iter_records(start, end, method, product_id)) == expected
+    assert len(log.update_index()) == 200 // 8
+
+
+def test_torn_last_line_is_skipped_and_not_glued_onto(tmp_path):
+    log = make_journal(tmp_path, 3)
+    with open(log.path, "a") as f:
+        f.write('{"id": "torn", "timest')
+    assert [record["id"] for record in log.iter_records()] == ["0", "1", "2"]
+
+    log.append({"id": "3", "timestamp": "2024-05-01 09:00:00", "items": []})
+    log.close()
+    assert [record["id"] for record in log.iter_records()] == ["0", "1", "2", "3"]
@@ -0,0 +1,60 @@
+import time
+
+from reports import REPORT_CHUNK_CHARS, REPORT_SLICE_MS, ReportStream
+
+
+class FakeWidget:
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, callback, *args):
+        self.scheduled.append((callback, args))
+        return len(self.scheduled)
+
+    def after_cancel(self, after_id):
+        pass
+
+    def run(self):
+        ticks = 0
+        while self.scheduled:
+            callback, args = self.scheduled.pop(0)
+            callback(*args)
+            ticks += 1
+        return ticks
+
+
+class SlowTextbox:
+    """Inserts take time in proportion to their size, as in Tk"""
+
+    def __init__(self, seconds_per_char=0):
+        self.inserts = []
+        self.seconds_per_char = seconds_per_char
+
+    def delete(self, start, end):
+        self.inserts = []
+
+    def insert(self, index, text):
+        time.sleep(len(text) * self.seconds_per_char)
+        self.inserts.append(len(text))
+
+
+def test_ready_chunks_are_inserted_one_at_a_time():
+    widget, textbox = FakeWidget(), SlowTextbox()
+    stream = ReportStream(widget, textbox)
+    stream.start(["x" * REPORT_CHUNK_CHARS] * 160)
+    widget.run()
+    assert sum(textbox.inserts) == 160 * REPORT_CHUNK_CHARS
+    assert max(textbox.inserts) == REPORT_CHUNK_CHARS
+
+
+def test_slow_inserts_spread_over_ticks():
+    widget = FakeWidget()
+    # each chunk-sized insert takes about the whole slice
+    textbox = SlowTextbox(REPORT_SLICE_MS / 1000 / REPORT_CHUNK_CHARS)
+    done = []
+    stream = ReportStream(widget, textbox, lambda fraction, finished: done.append(finished))
+    stream.start("line %d\n" % i for i in range(40000))
+    ticks = 1 + widget.run()
+    assert done[-1] and ticks == len(done)
+    assert max(textbox.inserts) < REPORT_CHUNK_CHARS + 100
+    assert ticks >= len(textbox.inserts) // 2
@@ -0,0 +1,41 @@
+import random
+
+from search import TrigramIndex, match_record
+
+
+def make_records(count):
+    rng = random.Random(3)
+    words = ["bolt", "cable", "drill", "hammer", "switch", "anchor"]
+    return [{"id": f"P{i:04d}", "name": f"{rng.choice(words)} {rng.choice(words)} {i}",
+             "category": rng.choice(["Hardware", "Electronics"])} for i in range(count)]
+
+
+def scan(records, query):
+    return [record["id"] for record in records if match_record(record, query)]
+
+
+def test_index_agrees_with_a_scan():
+    records = make_records(500)
+    index = TrigramIndex(lambda: records)
+    index.build()
+    for query in ["bolt", "ll ham", "p0042", "tronic", "dr", "x", "", "zzz"]:
+        assert [record["id"] for record in index.search(query)] == scan(records, query)
+
+
+def test_index_follows_adds_edits_and_removes():
+    records = make_records(50)
+    index = TrigramIndex(lambda: records)
+    index.build()
+    index.add({"id": "NEW", "name": "Torque wrench", "category": "Tools"})
+    index.add(dict(records[0], name="renamed widget"))
+    index.remove(records[1]["id"])
+    assert [record["id"] for record in index.search("wrench")] == ["NEW"]
+    assert [record["id"] for record in index.search("widget")] == [records[0]["id"]]
+    assert records[1]["id"] not in [record["id"] for record in index.search(records[1]["id"].lower())]
+
+
+def test_match_spanning_two_fields_is_not_a_match():
+    records = [{"id": "A1", "name": "abc", "category": "def"}]
+    index = TrigramIndex(lambda: records)
+    index.build()
+    assert index.search("cde") == []
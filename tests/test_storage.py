@@ -0,0 +1,383 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from columns import stock_stats
+from feed import read_changes
+from journal import TransactionJournal
+import storage
+from snapshot import Snapshot, SnapshotCatalog, write_snapshot
+from storage import ConflictError, FileLock, JsonStorage, SqliteStorage, StockError
+
+
+def item(i, **fields):
+    row = {"id": f"P{i:02d}", "name": f"Item {i}", "category": "Hardware" if i % 2 else "Tools",
+           "quantity": 10 + i, "price": float(100 - i), "status": "In Stock"}
+    row.update(fields)
+    return row
+
+
+def json_store(tmp_path):
+    return JsonStorage(str(tmp_path / "inventory_data.json"),
+                       journal=TransactionJournal(str(tmp_path / "transactions.jsonl"),
+                                                  str(tmp_path / "transactions.json")))
+
+
+def sqlite_store(tmp_path):
+    return SqliteStorage(str(tmp_path / "hardtrack.db"), import_from=str(tmp_path / "inventory_data.json"),
+                         journal_path=str(tmp_path / "transactions.jsonl"))
+
+
+@pytest.fixture(params=[json_store, sqlite_store], ids=["json", "sqlite"])
+def open_store(request, tmp_path):
+    stores = []
+
+    def open_store():
+        store = request.param(tmp_path)
+        store.load()
+        stores.append(store)
+        return store
+
+    yield open_store
+    for store in stores:
+        store.close()
+
+
+def sale(item_id, qty):
+    return {"id": "T" + item_id, "timestamp": "2024-05-01 10:00:00", "method": "Cash", "total": 1.0,
+            "items": [{"id": item_id, "name": "x", "price": 1.0, "qty": qty}]}
+
+
+def test_query_pages_sorts_and_filters(open_store):
+    store = open_store()
+    store.apply_changes([("save_item", item(i)) for i in range(25)])
+
+    rows, total = store.query("inventory", offset=10, limit=10)
+    assert total == 25
+    assert [row["id"] for row in rows] == [f"P{i:02d}" for i in range(10, 20)]
+
+    rows, _ = store.query("inventory", limit=3, sort_key="price")
+    assert [row["id"] for row in rows] == ["P24", "P23", "P22"]
+    rows, _ = store.query("inventory", limit=3, sort_key="price", descending=True)
+    assert [row["id"] for row in rows] == ["P00", "P01", "P02"]
+    rows, _ = store.query("inventory", limit=2, descending=True)
+    assert [row["id"] for row in rows] == ["P24", "P23"]
+
+    rows, total = store.query("inventory", text="ITEM 2", sort_key="id")
+    assert total == 6 and rows[0]["id"] == "P02"
+    rows, total = store.query("inventory", text="tools", limit=None)
+    assert total == 13 and all(row["category"] == "Tools" for row in rows)
+
+    # rows are copies
+    rows[0]["name"] = "changed"
+    assert store.query("inventory", text="changed")[1] == 0
+
+
+def test_text_query_scans_until_the_index_is_built_in_the_background(tmp_path):
+    store = json_store(tmp_path)
+    store.load()
+    store.apply_changes([("save_item", item(i)) for i in range(25)])
+
+    scanned = store.query("inventory", text="item 2", sort_key="id")
+    store._index_thread.join(5)
+    assert store._text_index.ready
+    # edits made after the build are indexed too
+    store.apply_changes([("save_item", item(26, name="Item 2b"))])
+    indexed = store.query("inventory", text="item 2", sort_key="id")
+    assert indexed[1] == scanned[1] + 1
+    assert indexed[0][:6] == scanned[0][:6]
+    store.close()
+
+
+def test_sqlite_text_query_follows_edits_through_the_trigram_index(tmp_path):
+    store = sqlite_store(tmp_path)
+    store.apply_changes([("save_item", item(i)) for i in range(25)])
+    store.apply_changes([("save_item", item(3, name="Claw Hammer")), ("delete_item", "P05")])
+    store.record_sale(sale("P03", 1))
+
+    assert [row["id"] for row in store.query("inventory", text="HAMMER")[0]] == ["P03"]
+    assert store.query("inventory", text="item 3")[1] == 0
+    assert store.query("inventory", text="item 5")[1] == 0
+    assert store.query("inventory", text="item 1")[1] == 11
+    # too short for a trigram: scanned instead
+    assert store.query("inventory", text="p0")[1] == 9
+    store.close()
+
+    # a database from before the index gets it built on open
+    conn = sqlite3.connect(str(tmp_path / "hardtrack.db"))
+    conn.execute("DROP TABLE inventory_fts")
+    conn.commit()
+    conn.close()
+    reopened = sqlite_store(tmp_path)
+    assert [row["id"] for row in reopened.query("inventory", text="hammer")[0]] == ["P03"]
+    reopened.close()
+
+
+def test_query_does_not_wait_for_a_commit_blocked_on_another_terminal(tmp_path):
+    store = json_store(tmp_path)
+    store.load()
+    store.apply_changes([("save_item", item(1))])
+    other_terminal = FileLock(store.lock.path)
+    with other_terminal:
+        writer = threading.Thread(target=store.apply_changes, args=([("save_item", item(2))],))
+        writer.start()
+        time.sleep(0.2)
+        started = time.monotonic()
+        assert store.query("inventory")[1] == 1
+        assert time.monotonic() - started < 0.1
+    writer.join(5)
+    assert store.query("inventory")[1] == 2
+    store.close()
+
+
+def test_sqlite_busy_database_raises_timeout(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "LOCK_TIMEOUT", 0.2)
+    store = sqlite_store(tmp_path)
+    other_terminal = sqlite3.connect(store.path, isolation_level=None)
+    other_terminal.execute("BEGIN IMMEDIATE")
+    with pytest.raises(TimeoutError):
+        store.apply_changes([("save_item", item(1))])
+    other_terminal.execute("ROLLBACK")
+    other_terminal.close()
+    store.apply_changes([("save_item", item(1))])
+    store.close()
+
+
+def test_changes_since_keeps_the_query_view_current(tmp_path):
+    admin = json_store(tmp_path)
+    admin.load()
+    cashier = json_store(tmp_path)
+    cashier.load()
+    admin.apply_changes([("save_item", item(1))])
+    cashier.changes_since(cashier.version)
+    admin.apply_changes([("save_item", item(2))])
+    cashier.changes_since(cashier.version)
+    assert cashier.query("inventory")[1] == 2
+    admin.close()
+    cashier.close()
+
+
+def test_poll_does_not_wait_for_another_terminal(tmp_path):
+    store = json_store(tmp_path)
+    store.load()
+    with FileLock(store.lock.path):
+        started = time.monotonic()
+        assert read_changes(store, store.version) is None
+        assert time.monotonic() - started < 0.1
+    store.apply_changes([("save_item", item(1))])
+    assert read_changes(store, 0) is not None
+    store.close()
+
+
+def test_changes_since_across_two_terminals(open_store):
+    admin = open_store()
+    admin.apply_changes([("save_item", item(1)), ("save_item", item(2))])
+    cashier = open_store()
+    version = cashier.version
+    assert cashier.changes_since(version) is None
+
+    admin.apply_changes([("save_item", item(3)), ("delete_item", "P02")])
+    cashier.record_sale(sale("P01", 4))
+
+    latest, changed, deleted = admin.changes_since(version)
+    assert latest > version
+    by_id = {row["id"]: row for row in changed}
+    assert by_id["P01"]["quantity"] == 7
+    assert by_id["P03"]["name"] == "Item 3"
+    assert deleted == ["P02"]
+
+
+def test_sale_beyond_stock_changes_nothing(open_store):
+    store = open_store()
+    store.save_item(item(1, quantity=2))
+    with pytest.raises(StockError) as raised:
+        store.record_sale(sale("P01", 3))
+    assert raised.value.shortages == {"P01": 2}
+    assert [row["quantity"] for row in store.load()[0]] == [2]
+    assert list(store.iter_transactions()) == []
+
+
+def test_update_keeps_sales_and_reports_conflicts(open_store):
+    admin = open_store()
+    admin.apply_changes([("save_item", item(1)), ("save_item", item(2))])
+    cashier = open_store()
+    cashier.record_sale(sale("P01", 4))
+    cashier.record_sale(sale("P02", 1))
+
+    # an edit made from a stale copy only touches the fields it changed
+    admin.apply_changes([("update_item", {"id": "P01", "changes": {"price": 5.0}, "expected": {"price": 99.0}})])
+    # one that changes the quantity sold meanwhile is refused, without holding up the rest of the batch
+    with pytest.raises(ConflictError) as conflict:
+        admin.apply_changes([
+            ("update_item", {"id": "P02", "changes": {"quantity": 0}, "expected": {"quantity": 12}}),
+            ("update_item", {"id": "P03", "changes": {"price": 1.0}, "expected": {"price": 97.0}}),
+            ("save_item", item(4)),
+        ])
+    assert conflict.value.current["P02"]["quantity"] == 11
+    assert conflict.value.current["P03"] is None
+
+    rows = {row["id"]: row for row in open_store().query("inventory", limit=None)[0]}
+    assert (rows["P01"]["quantity"], rows["P01"]["price"]) == (7, 5.0)
+    assert rows["P02"]["quantity"] == 11
+    assert "P04" in rows
+
+
+def test_torn_wal_record_is_dropped_on_replay(tmp_path):
+    store = json_store(tmp_path)
+    store.load()
+    store.apply_changes([("save_item", item(1))])
+    store.apply_changes([("save_item", item(2))])
+    # a crash in the middle of the next append
+    with open(store.wal_path, "ab") as f:
+        f.write(b'1234abcd {"lsn": 3, "chan')
+
+    reopened = json_store(tmp_path)
+    inventory, _ = reopened.load()
+    assert [row["id"] for row in inventory] == ["P01", "P02"]
+
+    # the next commit replaces the torn record instead of following it
+    reopened.apply_changes([("save_item", item(3))])
+    third = json_store(tmp_path)
+    assert [row["id"] for row in third.load()[0]] == ["P01", "P02", "P03"]
+    for s in (store, reopened, third):
+        s.close()
+
+
+def test_checkpoint_cuts_the_log_and_keeps_the_state(tmp_path):
+    store = json_store(tmp_path)
+    store.load()
+    store.apply_changes([("save_item", item(i)) for i in range(5)])
+    store.record_sale(sale("P01", 1))
+    version = store.version
+    store.checkpoint()
+
+    assert store._read_wal_header()[0] == version
+    assert list(store._wal_records_from(store._read_wal_header()[1])) == []
+
+    reopened = json_store(tmp_path)
+    inventory, _ = reopened.load()
+    assert reopened.version == version
+    assert inventory.get("P01")["quantity"] == 10
+    # the sale was journaled before the log was cut
+    assert [t["id"] for t in reopened.iter_transactions()] == ["TP01"]
+    store.close()
+    reopened.close()
+
+
+def test_checkpoint_saves_the_rollups_and_the_snapshot(tmp_path):
+    store = JsonStorage(str(tmp_path / "inventory_data.json"), journal=TransactionJournal(
+        str(tmp_path / "transactions.jsonl"), str(tmp_path / "transactions.json")),
+        snapshot_path=str(tmp_path / "inventory_data.snap"))
+    store.load()
+    store.apply_changes([("save_item", item(1))])
+    store.record_sale(sale("P01", 1))
+    store.sales_rollups()
+    store.checkpoint()
+
+    # written by the checkpoint, not only on a clean close
+    assert (tmp_path / "inventory_data.rollups.json").exists()
+    assert store._snapshot_stamp == store._disk_stamp()
+    assert not list(tmp_path.glob("*.next"))
+    store.close()
+
+
+def test_sync_flushes_the_journal_and_the_rollups(open_store, tmp_path):
+    store = open_store()
+    store.apply_changes([("save_item", item(1))])
+    store.record_sale(sale("P01", 1))
+    store.sales_rollups()
+    store.sync()
+
+    # what a logout leaves on disk, before the store is ever closed
+    assert list(tmp_path.glob("*.rollups.json"))
+    other = open_store()
+    assert len(list(other.iter_transactions())) == 1
+    other.close()
+    store.close()
+
+
+def test_commits_carry_on_while_a_checkpoint_is_written(tmp_path):
+    store = json_store(tmp_path)
+    store.load()
+    store.apply_changes([("save_item", item(i)) for i in range(5)])
+    write = store._write_checkpoint_file
+    committed = threading.Event()
+
+    def write_slowly(data):
+        # a commit from another thread must not wait for the file to be written
+        threading.Thread(target=lambda: (store.apply_changes([("save_item", item(9))]), committed.set())).start()
+        assert committed.wait(5)
+        return write(data)
+
+    store._write_checkpoint_file = write_slowly
+    store.checkpoint()
+    version = store.version
+
+    # the commit made during the write stays in the log after the cut
+    assert [lsn for _, lsn, _ in store._wal_records_from(store._read_wal_header()[1])] == [version]
+    reopened = json_store(tmp_path)
+    inventory, _ = reopened.load()
+    assert "P09" in inventory and reopened.version == version
+    store.close()
+    reopened.close()
+
+
+def test_snapshot_start_needs_no_json_parse(tmp_path, monkeypatch):
+    def snapshot_store():
+        return JsonStorage(str(tmp_path / "inventory_data.json"), journal=TransactionJournal(
+            str(tmp_path / "transactions.jsonl"), str(tmp_path / "transactions.json")),
+            snapshot_path=str(tmp_path / "inventory_data.snap"))
+
+    store = snapshot_store()
+    store.load()
+    store.apply_changes([("save_item", item(i)) for i in range(5)] + [("delete_item", "P04")])
+    store.checkpoint()
+    store.apply_changes([("save_item", item(5))])
+    store.close()
+
+    reopened = snapshot_store()
+    monkeypatch.setattr(reopened, "_parse_checkpoint", lambda: pytest.fail("parsed the JSON checkpoint"))
+    inventory, _ = reopened.load()
+    assert stock_stats(inventory).units == sum(10 + i for i in (0, 1, 2, 3, 5))
+    # the store's own copy is ready for commits and the change feed
+    reopened.record_sale(sale("P01", 1))
+    version, changed, deleted = reopened.changes_since(0)
+    assert deleted == ["P04"] and {row["id"] for row in changed} == {"P00", "P01", "P02", "P03", "P05"}
+    assert inventory.get("P01")["quantity"] == 11
+    monkeypatch.undo()
+    reopened.close()
+
+
+def test_snapshot_rows_keep_fractional_quantities_and_index_lazily(tmp_path):
+    path = str(tmp_path / "inventory_data.snap")
+    write_snapshot(path, [item(1, quantity=2.5), item(2)], [], 1, (0, 0))
+    snapshot = Snapshot(path)
+    catalog = SnapshotCatalog(snapshot)
+
+    rows = catalog.rows()
+    assert len(rows) == 2 and catalog._cache == [None, None]
+    assert rows[1]["quantity"] == 12 and isinstance(rows[1]["quantity"], int)
+    assert catalog._cache[0] is None
+    assert rows[0]["quantity"] == 2.5
+    assert catalog.columns()[2] == [2.5, 12]
+    snapshot.close()
+
+
+def test_sales_rollups_survive_a_restart_and_catch_up(open_store, tmp_path):
+    store = open_store()
+    store.apply_changes([("save_item", item(1)), ("save_item", item(2))])
+    store.record_sale(sale("P01", 2))
+    # a checkout never builds the rollups; the reports do
+    assert not list(tmp_path.glob("*.rollups.json"))
+    assert store.sales_rollups().transactions == 1
+    store.close()
+
+    other = open_store()
+    assert (tmp_path / "inventory_data.rollups.json").exists() or (tmp_path / "hardtrack.rollups.json").exists()
+    other.record_sale(sale("P02", 3))
+    assert other._sales is None
+    sales = other.sales_rollups()
+    assert (sales.transactions, sales.units) == (2, 5)
+    assert sales.top_products("units")[0][0] == "P02"
@@ -0,0 +1,67 @@
+import threading
+
+from writer import WriteBehind
+
+
+class RecordingStorage:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+        self.lock = threading.Lock()
+
+    def apply_changes(self, changes):
+        if self.fail:
+            raise OSError("disk full")
+        with self.lock:
+            self.batches.append(list(changes))
+
+
+def test_burst_is_coalesced_into_one_write():
+    storage = RecordingStorage()
+    writer = WriteBehind(storage, delay=30)
+    writer.submit(("item", "P1"), "save_item", {"id": "P1", "quantity": 1})
+    writer.submit(("item", "P2"), "save_item", {"id": "P2", "quantity": 5})
+    writer.submit(("item", "P1"), "save_item", {"id": "P1", "quantity": 2})
+
+    # flush() writes now instead of waiting out the 30 s delay
+    assert writer.flush(timeout=5)
+    assert writer.pending() == 0
+    assert storage.batches == [[("save_item", {"id": "P2", "quantity": 5}),
+                                ("save_item", {"id": "P1", "quantity": 2})]]
+    writer.close(timeout=5)
+
+
+def test_updates_merge_into_the_queued_change():
+    storage = RecordingStorage()
+    writer = WriteBehind(storage, delay=30)
+    writer.submit(("item", "P1"), "update_item",
+                  {"id": "P1", "changes": {"price": 2.0}, "expected": {"price": 1.0}})
+    writer.submit(("item", "P1"), "update_item",
+                  {"id": "P1", "changes": {"price": 3.0, "name": "b"}, "expected": {"price": 2.0, "name": "a"}})
+    writer.submit(("item", "P2"), "save_item", {"id": "P2", "name": "new", "price": 1.0})
+    writer.submit(("item", "P2"), "update_item",
+                  {"id": "P2", "changes": {"price": 4.0}, "expected": {"price": 1.0}})
+
+    assert writer.flush(timeout=5)
+    assert storage.batches == [[
+        ("update_item", {"id": "P1", "changes": {"price": 3.0, "name": "b"},
+                         "expected": {"price": 1.0, "name": "a"}}),
+        ("save_item", {"id": "P2", "name": "new", "price": 4.0}),
+    ]]
+    writer.close(timeout=5)
+
+
+def test_flush_with_nothing_queued_returns_at_once():
+    writer = WriteBehind(RecordingStorage())
+    assert writer.flush(timeout=1)
+    writer.close(timeout=5)
+
+
+def test_failed_writes_are_reported():
+    writer = WriteBehind(RecordingStorage(fail=True), delay=0)
+    writer.submit(("item", "P1"), "save_item", {"id": "P1"})
+    assert writer.flush(timeout=5)
+    errors = writer.take_errors()
+    assert len(errors) == 1 and isinstance(errors[0], OSError)
+    assert writer.take_errors() == []
+    writer.close(timeout=5)
@@ -0,0 +1,114 @@
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+TIMING_FILE = "timing.jsonl"
+
+# HARDTRACK_TIMING=1 turns the measurements on; they cost nothing otherwise
+ENABLED = os.environ.get("HARDTRACK_TIMING") == "1"
+
+# process start as far as we can see it: timing is the first thing login.py imports
+STARTED = time.perf_counter()
+
+SESSION = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+
+_lock = threading.Lock()
+# (view, phase) -> [count, total ms, max ms]
+_totals = {}
+
+
+def now():
+    return time.perf_counter()
+
+
+def record(view, phase, started, **fields):
+    """Log the time since `started` (a now() value) as one phase of a view.
+
+    view names what was being opened ("login", "admin", "cashier",
+    "section:inventory"); phase is the step ("import", "load", "widgets",
+    "first_paint", ...). Extra fields are logged as they are.
+    """
+    if not ENABLED:
+        return
+    ms = round((time.perf_counter() - started) * 1000, 2)
+    entry = {"session": SESSION, "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+             "view": view, "phase": phase, "ms": ms}
+    entry.update(fields)
+    with _lock:
+        totals = _totals.setdefault((view, phase), [0, 0.0, 0.0])
+        totals[0] += 1
+        totals[1] += ms
+        totals[2] = max(totals[2], ms)
+        _write(entry)
+
+
+@contextmanager
+def span(view, phase, **fields):
+    """Time the body of a with block; see record()"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(view, phase, started, **fields)
+
+
+def first_paint(widget, view, started, **fields):
+    """Log the time from `started` until Tk has drawn what is pending.
+
+    Redraws are idle callbacks, so one queued after them runs once the
+    view is on screen.
+    """
+    if ENABLED:
+        widget.after_idle(lambda: record(view, "first_paint", started, **fields))
+
+
+def _write(entry):
+    with open(TIMING_FILE, 'a') as f:
+        f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+
+def summary():
+    """Per (view, phase) count, total, mean and max milliseconds for this session"""
+    with _lock:
+        return {f"{view}.{phase}": {"count": count, "total_ms": round(total, 2),
+                                    "mean_ms": round(total / count, 2), "max_ms": max_ms}
+                for (view, phase), (count, total, max_ms) in _totals.items()}
+
+
+def _write_summary():
+    phases = summary()
+    if not phases:
+        return
+    with _lock:
+        _write({"session": SESSION, "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "summary": phases, "session_ms": round((time.perf_counter() - STARTED) * 1000, 2)})
+    print_summary(phases, sys.stderr)
+
+
+def print_summary(phases, out=sys.stdout):
+    out.write(f"{'phase':<32}{'count':>7}{'mean ms':>11}{'max ms':>11}\n")
+    for name in sorted(phases):
+        stats = phases[name]
+        out.write(f"{name:<32}{stats['count']:>7}{stats['mean_ms']:>11.1f}{stats['max_ms']:>11.1f}\n")
+
+
+if ENABLED:
+    atexit.register(_write_summary)
+
+
+if __name__ == "__main__":
+    # python timing.py [log]: the per-session summaries, oldest first
+    path = sys.argv[1] if len(sys.argv) > 1 else TIMING_FILE
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if "summary" in entry:
+                print(f"\nsession {entry['session']} ({entry['session_ms'] / 1000:.1f} s)")
+                print_summary(entry["summary"])
@@ -0,0 +1,115 @@
+import threading
+import time
+
+
+def merge_update(queued, update):
+    """Fold an update_item into the change already queued for the same record"""
+    op, payload = queued
+    if op == "save_item":
+        return op, dict(payload, **update["changes"])
+    if op == "update_item":
+        # the first update's expected values are still what the store holds
+        return op, {"id": update["id"],
+                    "changes": dict(payload["changes"], **update["changes"]),
+                    "expected": dict(update["expected"], **payload["expected"])}
+    return "update_item", update
+
+
+class WriteBehind:
+    """Applies storage changes on a background thread.
+
+    Changes are keyed (e.g. ("item", id)); a newer change for the same key
+    replaces the queued one (an update_item is merged into it instead), and
+    everything queued during a burst is written in a single storage commit.
+    """
+
+    def __init__(self, storage, delay=0.3):
+        self.storage = storage
+        self.delay = delay
+
+        self._queue = {}
+        self._in_flight = 0
+        self._first_queued = None
+        self._flush_requested = False
+        self._closed = False
+        self._errors = []
+        self._cond = threading.Condition()
+
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def submit(self, key, op, payload):
+        """Queue a storage change; payload must not be mutated afterwards"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Writer is closed")
+            queued = self._queue.pop(key, None)
+            if op == "update_item" and queued is not None:
+                op, payload = merge_update(queued, payload)
+            self._queue[key] = (op, payload)
+            if self._first_queued is None:
+                self._first_queued = time.monotonic()
+            self._cond.notify_all()
+
+    def pending(self):
+        """Number of changes not yet on disk"""
+        with self._cond:
+            return len(self._queue) + self._in_flight
+
+    def take_errors(self):
+        """Errors raised by background writes since the last call"""
+        with self._cond:
+            errors, self._errors = self._errors, []
+        return errors
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far is written; False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._queue or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout=None):
+        """Flush outstanding writes and stop the thread"""
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+
+                # give a burst of edits time to collapse into one write
+                while not self._flush_requested and not self._closed:
+                    remaining = self._first_queued + self.delay - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                batch = list(self._queue.values())
+                self._queue.clear()
+                self._in_flight = len(batch)
+                self._first_queued = None
+                self._flush_requested = False
+
+            try:
+                self.storage.apply_changes(batch)
+            except Exception as e:
+                with self._cond:
+                    self._errors.append(e)
+            finally:
+                with self._cond:
+                    self._in_flight = 0
+                    self._cond.notify_all()